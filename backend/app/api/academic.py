@@ -1,15 +1,96 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, status
+from datetime import date, timedelta
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, UploadFile, File, status
+from pymongo import ASCENDING, DESCENDING, ReturnDocument
 from typing import List, Optional
-import io
-import pandas as pd
 from app.db import db
 from app.core.auth import get_current_user
-from app.core.notifications import check_academic_risk
+from app.core.notifications import check_academic_risk, check_academic_risk_bulk
 from app.core.audit import log_action
-from app.models.academic import AttendanceCreate, AttendanceRecord, MarksCreate, MarksRecord
+from app.core.cache import invalidate as invalidate_cache
+from app.core.data_versions import bump_data_versions, student_scope
+from app.core.attendance_store import attendance_reads, monthly_attendance, session_date
+from app.core.ingest import (
+    ATTENDANCE_STATUSES, NATURAL_KEYS, natural_key_upsert, run_upload_job, stage_upload, write_records,
+)
+from app.core.jobs import upload_jobs
+from app.core.pagination import MAX_PAGE_SIZE, after_cursor, split_page
+from app.models.academic import AttendanceCreate, AttendanceBulkCreate, AttendanceRecord, MarksCreate, MarksRecord
 
 router = APIRouter(prefix="/api", tags=["Academic"])
 
+# Read orders; each is unique per student and matches an index in app.core.indexes
+ATTENDANCE_SORT = [("date", DESCENDING), ("subject", ASCENDING)]
+MARKS_SORT = [("semester", ASCENDING), ("subject", ASCENDING), ("marks_type", ASCENDING)]
+
+async def _upsert_record(collection: str, record) -> dict:
+    """Writes a record keyed on its natural key, so re-entering the same record updates it."""
+    record_data = record.model_dump()
+    key_filter, update = natural_key_upsert(record_data, NATURAL_KEYS[collection])
+
+    saved = await db[collection].find_one_and_update(
+        key_filter, update, upsert=True, return_document=ReturnDocument.AFTER
+    )
+    saved["mongo_id"] = str(saved.pop("_id"))
+    return saved
+
+async def _page(collection, query: dict, sort: list, limit: int, cursor: Optional[str], response: Response) -> list:
+    """One page of `query` in `sort` order; sets X-Next-Cursor when there are more."""
+    docs = await collection.find(
+        {**query, **after_cursor(sort, cursor)}, {"_id": 0}
+    ).sort(sort).limit(limit + 1).to_list(limit + 1)
+    page, next_cursor = split_page(docs, sort, limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return page
+
+async def _queue_upload(kind: str, file: UploadFile, current_user: dict) -> dict:
+    """Stages the upload on disk and hands it to the ingestion workers."""
+    # Take the job slot first so users at their limit are turned away before the copy
+    upload_jobs.reserve(current_user["id"])
+    try:
+        path = await stage_upload(file.file, file.filename)
+    except BaseException:
+        upload_jobs.release(current_user["id"])
+        raise
+    params = {"kind": kind, "path": str(path), "filename": file.filename}
+    try:
+        job = await upload_jobs.submit("upload", current_user["id"], params, run_upload_job, reserved=True)
+    except BaseException:
+        path.unlink(missing_ok=True)
+        raise
+    return {
+        "message": f"{kind.capitalize()} upload queued",
+        "job_id": job["id"],
+        "status": job["status"],
+        "status_url": f"/api/uploads/{job['id']}",
+    }
+
+# --- Upload Jobs ---
+
+@router.get("/uploads/{job_id}")
+async def get_upload_status(
+    job_id: str, current_user: dict = Depends(get_current_user)
+):
+    """Progress of a queued upload: rows processed / rejected, ETA, and the result once done."""
+    job = await upload_jobs.get(job_id)
+    if (
+        not job or job["type"] != "upload"
+        or (job["owner_id"] != current_user["id"] and current_user["role"] != "admin")
+    ):
+        raise HTTPException(status_code=404, detail="Upload not found")
+
+    return {
+        "job_id": job["id"],
+        "kind": job["params"].get("kind"),
+        "status": job["status"],
+        "progress": job.get("progress", 0.0),
+        "rows_processed": job.get("rows_processed", 0),
+        "rows_rejected": job.get("rows_rejected", 0),
+        "eta_seconds": job.get("eta_seconds"),
+        "result": job.get("result"),
+        "error": job.get("error"),
+    }
+
 # --- Attendance Routes ---
 
 @router.post("/attendance")
@@ -21,80 +102,134 @@ async def create_attendance(
     if current_user["role"] not in ["admin", "mentor"]:
         raise HTTPException(status_code=403, detail="Not authorized")
 
+    status = payload.status.strip().lower()
+    if status not in ATTENDANCE_STATUSES:
+        raise HTTPException(status_code=400, detail="status must be present, absent or leave")
+
     record = AttendanceRecord(
         student_id=payload.student_id,
         subject=payload.subject,
         date=payload.date,
-        status=payload.status,
+        status=status,
         recorded_by=current_user["id"],
     )
 
-    record_data = record.model_dump()
-    record_data["created_at"] = record_data["created_at"].isoformat()
-
-    result = await db.attendance.insert_one(record_data)
-
-    record_data["mongo_id"] = str(result.inserted_id)
-    record_data.pop("_id", None)
+    if monthly_attendance():
+        record_data = record.model_dump()
+        try:
+            session_date(record_data)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="date must be YYYY-MM-DD")
+        await write_records(db, "attendance", [record_data])
+        # Monthly documents do not keep per-class ids; this matches the attendance_sessions view
+        record_data["id"] = f"{record.student_id}:{record.subject}:{record.date}"
+    else:
+        record_data = await _upsert_record("attendance", record)
+    await bump_data_versions([student_scope(payload.student_id)])
 
     await check_academic_risk(str(payload.student_id))
     await log_action(current_user["id"], "CREATE", "attendance", {
         "student_id": payload.student_id, 
         "subject": payload.subject, 
-        "status": payload.status
+        "status": status
     })
 
     return record_data
 
-@router.post("/attendance/upload")
-async def upload_attendance(
-    file: UploadFile = File(...), current_user: dict = Depends(get_current_user)
+@router.post("/attendance/bulk")
+async def create_attendance_bulk(
+    payload: AttendanceBulkCreate,
+    current_user: dict = Depends(get_current_user),
 ):
-    """Uploads attendance records from a CSV or Excel file."""
+    """Records attendance for a whole class (one subject, one date) in a single request (Admin or Mentor)."""
     if current_user["role"] not in ["admin", "mentor"]:
         raise HTTPException(status_code=403, detail="Not authorized")
 
-    contents = await file.read()
-    df = (
-        pd.read_csv(io.BytesIO(contents))
-        if file.filename.endswith(".csv")
-        else pd.read_excel(io.BytesIO(contents))
-    )
+    student_ids = [entry.student_id for entry in payload.records]
+    known = {
+        u["id"] for u in await db.users.find(
+            {"id": {"$in": student_ids}, "role": "student"}, {"_id": 0, "id": 1}
+        ).to_list(None)
+    }
 
+    errors = []
+    seen = set()
+    for index, entry in enumerate(payload.records):
+        if entry.student_id in seen:
+            errors.append({"index": index, "student_id": entry.student_id, "reason": "duplicate student"})
+        elif entry.student_id not in known:
+            errors.append({"index": index, "student_id": entry.student_id, "reason": "unknown student"})
+        elif entry.status.strip().lower() not in ATTENDANCE_STATUSES:
+            errors.append({"index": index, "student_id": entry.student_id, "reason": "status must be present, absent or leave"})
+        seen.add(entry.student_id)
+    if errors:
+        raise HTTPException(status_code=400, detail={"message": "Invalid attendance records", "errors": errors})
+
+    date = payload.date.isoformat()
     records = []
-    for _, row in df.iterrows():
-        student = await db.users.find_one(
-            {"usn": row["student_usn"], "role": "student"}, {"_id": 0}
-        )
-        if student:
-            record = AttendanceRecord(
-                student_id=student["id"],
-                subject=row["subject"],
-                date=str(row["date"]),
-                status=row["status"],
-                recorded_by=current_user["id"],
-            )
-            record_data = record.model_dump()
-            record_data["created_at"] = record_data["created_at"].isoformat()
-            records.append(record_data)
-
-    if records:
-        await db.attendance.insert_many(records)
-        unique_students = set(r["student_id"] for r in records)
-        for sid in unique_students:
-            await check_academic_risk(str(sid))
-            
-    await log_action(current_user["id"], "UPLOAD", "attendance", {"count": len(records)})
-
-    return {"message": f"Uploaded {len(records)} attendance records"}
+    for entry in payload.records:
+        record_data = AttendanceRecord(
+            student_id=entry.student_id,
+            subject=payload.subject,
+            date=date,
+            status=entry.status.strip().lower(),
+            recorded_by=current_user["id"],
+        ).model_dump()
+        records.append(record_data)
+
+    # Upserts on the natural key, so re-submitting the class corrects it instead of duplicating
+    inserted, updated = await write_records(db, "attendance", records)
+    await bump_data_versions(student_scope(sid) for sid in student_ids)
+    await check_academic_risk_bulk(student_ids)
+    await log_action(current_user["id"], "BULK_CREATE", "attendance", {
+        "subject": payload.subject,
+        "date": date,
+        "count": len(records),
+        "present": sum(1 for r in records if r["status"] == "present"),
+    })
+
+    return {
+        "message": f"Recorded attendance for {len(records)} students",
+        "inserted": inserted,
+        "updated": updated,
+    }
+
+@router.post("/attendance/upload", status_code=status.HTTP_202_ACCEPTED)
+async def upload_attendance(
+    file: UploadFile = File(...), current_user: dict = Depends(get_current_user)
+):
+    """Queues a CSV or Excel file of attendance records for background ingestion."""
+    if current_user["role"] not in ["admin", "mentor"]:
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+    return await _queue_upload("attendance", file, current_user)
 
 @router.get("/attendance/student/{student_id}")
 async def get_student_attendance(
-    student_id: str, current_user: dict = Depends(get_current_user)
+    student_id: str,
+    response: Response,
+    from_date: Optional[date] = Query(None, alias="from"),
+    to_date: Optional[date] = Query(None, alias="to"),
+    subject: Optional[str] = None,
+    limit: int = Query(MAX_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    current_user: dict = Depends(get_current_user),
 ):
-    """Gets all attendance records for a specific student."""
-    records = await db.attendance.find({"student_id": student_id}, {"_id": 0}).to_list(1000)
-    return records
+    """
+    Gets a student's attendance, newest first. `from`/`to` are inclusive dates;
+    when more records match, X-Next-Cursor holds the cursor for the next page.
+    """
+    query = {"student_id": student_id}
+    if from_date or to_date:
+        # Dates are stored as YYYY-MM-DD strings, which order like the dates themselves
+        query["date"] = {}
+        if from_date:
+            query["date"]["$gte"] = from_date.isoformat()
+        if to_date:
+            query["date"]["$lt"] = (to_date + timedelta(days=1)).isoformat()
+    if subject:
+        query["subject"] = subject
+    return await _page(attendance_reads(db), query, ATTENDANCE_SORT, limit, cursor, response)
 
 # --- Marks Routes ---
 
@@ -117,13 +252,9 @@ async def create_marks(
         recorded_by=current_user["id"],
     )
 
-    record_data = record.model_dump()
-    record_data["created_at"] = record_data["created_at"].isoformat()
-
-    result = await db.marks.insert_one(record_data)
-
-    record_data["mongo_id"] = str(result.inserted_id)
-    record_data.pop("_id", None)
+    record_data = await _upsert_record("marks", record)
+    invalidate_cache("marks")
+    await bump_data_versions([student_scope(payload.student_id)])
 
     await check_academic_risk(str(payload.student_id))
     await log_action(current_user["id"], "CREATE", "marks", {
@@ -134,55 +265,34 @@ async def create_marks(
 
     return record_data
 
-@router.post("/marks/upload")
+@router.post("/marks/upload", status_code=status.HTTP_202_ACCEPTED)
 async def upload_marks(
     file: UploadFile = File(...),
     current_user: dict = Depends(get_current_user),
 ):
-    """Uploads marks records from a CSV or Excel file."""
+    """Queues a CSV or Excel file of marks records for background ingestion."""
     if current_user["role"] not in ["admin", "mentor"]:
         raise HTTPException(status_code=403, detail="Not authorized")
 
-    contents = await file.read()
-    df = (
-        pd.read_csv(io.BytesIO(contents))
-        if file.filename.endswith(".csv")
-        else pd.read_excel(io.BytesIO(contents))
-    )
-
-    records: List[dict] = []
-    for _, row in df.iterrows():
-        student = await db.users.find_one(
-            {"usn": row["student_usn"], "role": "student"}, {"_id": 0}
-        )
-        if student:
-            record = MarksRecord(
-                student_id=student["id"],
-                subject=row["subject"],
-                semester=int(row["semester"]),
-                marks_type=row["marks_type"],
-                marks_obtained=float(row["marks_obtained"]),
-                max_marks=float(row["max_marks"]),
-                recorded_by=current_user["id"],
-            )
-            record_data = record.model_dump()
-            record_data["created_at"] = record_data["created_at"].isoformat()
-            records.append(record_data)
-
-    if records:
-        await db.marks.insert_many(records)
-        unique_students = set(r["student_id"] for r in records)
-        for sid in unique_students:
-            await check_academic_risk(str(sid))
-            
-    await log_action(current_user["id"], "UPLOAD", "marks", {"count": len(records)})
-
-    return {"message": f"Uploaded {len(records)} marks records"}
+    return await _queue_upload("marks", file, current_user)
 
 @router.get("/marks/student/{student_id}")
 async def get_student_marks(
-    student_id: str, current_user: dict = Depends(get_current_user)
+    student_id: str,
+    response: Response,
+    semester: Optional[int] = None,
+    subject: Optional[str] = None,
+    limit: int = Query(MAX_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    current_user: dict = Depends(get_current_user),
 ):
-    """Gets all marks records for a specific student."""
-    records = await db.marks.find({"student_id": student_id}, {"_id": 0}).to_list(1000)
-    return records
+    """
+    Gets a student's marks by semester and subject. When more records match,
+    X-Next-Cursor holds the cursor for the next page.
+    """
+    query = {"student_id": student_id}
+    if semester is not None:
+        query["semester"] = semester
+    if subject:
+        query["subject"] = subject
+    return await _page(db.marks, query, MARKS_SORT, limit, cursor, response)
@@ -3,6 +3,7 @@ from typing import List, Optional, Any
 from datetime import datetime, timezone
 from app.db import db
 from app.core.auth import get_current_user
+from app.core.dates import as_datetime
 
 router = APIRouter(prefix="/api/activity", tags=["activity"])
 
@@ -91,15 +92,9 @@ async def get_recent_activity(
             })
 
     # Sort combined list by time descending
-    # Handle string ISO dates
+    # Handles native dates and not-yet-migrated ISO strings
     def parse_time(item):
-        t = item.get("sort_time")
-        if isinstance(t, str):
-            try:
-                return datetime.fromisoformat(t.replace('Z', '+00:00'))
-            except:
-                return datetime.min.replace(tzinfo=timezone.utc)
-        return t or datetime.min.replace(tzinfo=timezone.utc)
+        return as_datetime(item.get("sort_time")) or datetime.min.replace(tzinfo=timezone.utc)
 
     activities.sort(key=parse_time, reverse=True)
     
@@ -4,7 +4,7 @@ from app.db import db
 from app.core.auth import get_current_user
 from app.core.audit import log_action
 import uuid
-from datetime import datetime
+from app.core.dates import utc_now
 
 router = APIRouter(prefix="/api/appointments", tags=["Appointments"])
 
@@ -40,7 +40,7 @@ async def create_appointment(
         "date": date,
         "reason": reason,
         "status": "pending",
-        "created_at": datetime.utcnow().isoformat()
+        "created_at": utc_now()
     }
     
     await db.appointments.insert_one(appointment)
@@ -55,7 +55,7 @@ async def create_appointment(
         "message": f"{current_user['full_name']} requested an appointment on {date}",
         "type": "info",
         "read": False,
-        "created_at": datetime.utcnow().isoformat()
+        "created_at": utc_now()
     }
     await db.notifications.insert_one(notif)
     
@@ -94,7 +94,7 @@ async def update_appointment_status(
     if not app:
         raise HTTPException(status_code=404, detail="Appointment not found")
         
-    await db.appointments.update_one({"id": app_id}, {"$set": {"status": new_status, "updated_at": datetime.utcnow().isoformat()}})
+    await db.appointments.update_one({"id": app_id}, {"$set": {"status": new_status, "updated_at": utc_now()}})
     
     # Notify Student
     notif = {
@@ -104,7 +104,7 @@ async def update_appointment_status(
         "message": f"Your appointment on {app['date']} was {new_status}",
         "type": "info" if new_status == "approved" else "warning",
         "read": False,
-        "created_at": datetime.utcnow().isoformat()
+        "created_at": utc_now()
     }
     await db.notifications.insert_one(notif)
     
@@ -2,8 +2,10 @@ from fastapi import APIRouter, Depends, HTTPException
 from app.db import db
 from app.core.auth import get_current_user
 from app.core.audit import log_action
+from app.core.cache import invalidate as invalidate_cache
+from app.core.data_versions import bump_data_versions
 from app.models.user import MentorAssignment, AssignmentPayload
-from datetime import datetime, timezone
+from app.core.dates import utc_now
 
 router = APIRouter(prefix="/api/assignments", tags=["assignments"])
 
@@ -38,7 +40,7 @@ async def create_assignment(
     existing = await db.assignments.find_one({"mentor_id": mentor_id})
     
     if existing:
-        updated_at = datetime.now(timezone.utc)
+        updated_at = utc_now()
         await db.assignments.update_one(
             {"mentor_id": mentor_id},
             {"$set": {"student_ids": student_ids, "updated_at": updated_at}}
@@ -46,17 +48,9 @@ async def create_assignment(
         # Prepare response safely
         assignment_data = {**existing, "student_ids": student_ids, "updated_at": updated_at}
         assignment_data.pop("_id", None)
-        # Ensure dates are strings for consistent API response
-        if isinstance(assignment_data.get("created_at"), datetime):
-            assignment_data["created_at"] = assignment_data["created_at"].isoformat()
-        if isinstance(assignment_data.get("updated_at"), datetime):
-            assignment_data["updated_at"] = assignment_data["updated_at"].isoformat()
     else:
         assignment = MentorAssignment(mentor_id=mentor_id, student_ids=student_ids)
         assignment_data = assignment.model_dump()
-        # Convert dates to ISO strings for the DB and response
-        if isinstance(assignment_data.get("created_at"), datetime):
-            assignment_data["created_at"] = assignment_data["created_at"].isoformat()
         
         res = await db.assignments.insert_one(assignment_data)
         assignment_data["mongo_id"] = str(res.inserted_id)
@@ -64,6 +58,8 @@ async def create_assignment(
 
     # 3. Cleanup: Remove any assignments that are now empty (optional)
     await db.assignments.delete_many({"student_ids": {"$size": 0}})
+    invalidate_cache("assignments")
+    await bump_data_versions(["assignments"])
 
     await log_action(current_user["id"], "UPDATE_ASSIGNMENT", "assignment", {"mentor_id": mentor_id, "student_count": len(student_ids)})
 
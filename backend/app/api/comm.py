@@ -8,6 +8,8 @@ from app.db import db
 from app.core.auth import get_current_user
 from app.core.notifications import create_notification, create_broadcast_notification
 from app.core.audit import log_action
+from app.core.cache import invalidate as invalidate_cache
+from app.core.data_versions import bump_data_versions, student_scope
 from app.models.user import Feedback, FeedbackCreate, Rating
 from app.models.communication import Circular, Message
 from app.sio_instance import sio
@@ -32,9 +34,9 @@ async def create_feedback(
     )
 
     feedback_data = feedback.model_dump()
-    feedback_data["created_at"] = feedback_data["created_at"].isoformat()
 
     result = await db.feedback.insert_one(feedback_data)
+    await bump_data_versions([student_scope(payload.student_id)])
 
     feedback_data["mongo_id"] = str(result.inserted_id)
     feedback_data.pop("_id", None)
@@ -159,9 +161,9 @@ async def create_circular(
     )
 
     data = circular.model_dump()
-    data["created_at"] = data["created_at"].isoformat()
 
     result = await db.circulars.insert_one(data)
+    invalidate_cache("circulars")
 
     data.pop("_id", None)
     data["mongo_id"] = str(result.inserted_id)
@@ -213,7 +215,6 @@ async def create_rating(rating: Rating, current_user: dict = Depends(get_current
 
     rating.mentor_id = current_user["id"]
     rating_data = rating.model_dump()
-    rating_data["created_at"] = rating_data["created_at"].isoformat()
 
     # Clear existing rating for this student-mentor pair for idempotency
     await db.ratings.delete_many(
@@ -12,8 +12,8 @@ from app.models.portfolio import (
 )
 from app.core.employability import calculate_student_analysis, calculate_peer_stats
 from app.core.audit import log_action
+from app.core.data_versions import bump_data_versions, student_scope
 from pydantic import BaseModel
-from datetime import datetime, timezone
 
 router = APIRouter(prefix="/api/portfolio", tags=["Portfolio"])
 
@@ -32,9 +32,9 @@ async def add_certification(
     )
     
     cert_data = new_cert.dict()
-    cert_data["created_at"] = cert_data["created_at"].isoformat()
     
     await db.certifications.insert_one(cert_data)
+    await bump_data_versions([student_scope(current_user["id"])])
     
     await log_action(current_user["id"], "CREATE", "certification", {"cert_name": cert.certificate_name})
     
@@ -62,13 +62,15 @@ async def verify_certification(
     if current_user["role"] not in ["mentor", "admin"]:
         raise HTTPException(status_code=403, detail="Not authorized")
         
-    result = await db.certifications.update_one(
+    cert = await db.certifications.find_one_and_update(
         {"id": cert_id},
-        {"$set": {"is_verified": True, "verified_by": current_user["full_name"]}}
+        {"$set": {"is_verified": True, "verified_by": current_user["full_name"]}},
+        projection={"_id": 0, "student_id": 1}
     )
     
-    if result.matched_count == 0:
+    if cert is None:
         raise HTTPException(status_code=404, detail="Certification not found")
+    await bump_data_versions([student_scope(cert["student_id"])])
         
     await log_action(current_user["id"], "VERIFY", "certification", {"cert_id": cert_id})
         
@@ -89,7 +91,6 @@ async def add_project(
     )
     
     proj_data = new_project.dict()
-    proj_data["created_at"] = proj_data["created_at"].isoformat()
     
     await db.projects.insert_one(proj_data)
     
@@ -151,10 +152,9 @@ async def submit_letter(
     )
     
     letter_data = new_letter.dict()
-    letter_data["created_at"] = letter_data["created_at"].isoformat()
-    letter_data["submitted_date"] = letter_data["submitted_date"].isoformat()
     
     await db.letters.insert_one(letter_data)
+    await bump_data_versions([student_scope(current_user["id"])])
     
     await log_action(current_user["id"], "CREATE", "letter", {"type": letter.letter_type})
     
@@ -187,16 +187,18 @@ async def reply_letter(
     if current_user["role"] not in ["mentor", "admin"]:
         raise HTTPException(status_code=403, detail="Not authorized")
         
-    result = await db.letters.update_one(
+    letter = await db.letters.find_one_and_update(
         {"id": letter_id},
         {"$set": {
             "mentor_response": reply.response,
             "status": reply.status
-        }}
+        }},
+        projection={"_id": 0, "student_id": 1}
     )
     
-    if result.matched_count == 0:
+    if letter is None:
         raise HTTPException(status_code=404, detail="Letter not found")
+    await bump_data_versions([student_scope(letter["student_id"])])
         
     await log_action(current_user["id"], "REPLY", "letter", {"letter_id": letter_id, "status": reply.status})
         
@@ -217,7 +219,6 @@ async def add_sports(
     )
     
     sport_data = new_sport.dict()
-    sport_data["created_at"] = sport_data["created_at"].isoformat()
     
     await db.sports.insert_one(sport_data)
     
@@ -252,7 +253,6 @@ async def add_cultural(
     )
     
     act_data = new_activity.dict()
-    act_data["created_at"] = act_data["created_at"].isoformat()
     
     await db.cultural.insert_one(act_data)
     
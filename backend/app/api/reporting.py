@@ -1,30 +1,118 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.responses import StreamingResponse
+from fastapi.responses import Response, StreamingResponse, FileResponse
 import io
+import os
 from typing import Optional
+from app.db import db
 from app.core.auth import get_current_user
+from app.core.jobs import report_jobs
+from app.core.data_versions import get_data_version, student_scope
+from app.core.report_cache import report_cache
+from app.models.jobs import ReportJobCreate, AnalyticsExportCreate
+from app.core.parquet_export import COLLECTION_SCHEMAS, PARTITION_COLUMNS, require_pyarrow, run_parquet_export_job
 from app.core.reports import (
+    EXCEL_MEDIA_TYPE,
+    CSV_MEDIA_TYPE,
+    NDJSON_MEDIA_TYPE,
+    ATTENDANCE_COLUMNS,
+    MARKS_COLUMNS,
+    attendance_cursor,
+    marks_cursor,
+    open_row_stream,
+    iter_csv,
+    iter_ndjson,
+    export_attendance_excel,
+    export_marks_excel,
+    iter_file_chunks,
+    spool_size,
     generate_attendance_report, 
     generate_marks_report, 
     generate_mentor_summary_report,
     generate_transcript_report,
-    generate_certificate_report
+    generate_certificate_report,
+    run_report_job,
+    BULK_DOCUMENT_KINDS,
+    bulk_students_cursor,
+    iter_bulk_documents_zip,
+    REPORT_JOB_TYPES,
+    REPORT_JOB_FORMATS,
 )
 
 router = APIRouter(prefix="/api/reports", tags=["Reporting"])
 
+async def _text_download(cursor, format: str, columns: list, basename: str, not_found: str) -> StreamingResponse:
+    """Streams rows as CSV or NDJSON straight from the cursor, in constant memory."""
+    rows = await open_row_stream(cursor)
+    if rows is None:
+        raise HTTPException(status_code=404, detail=not_found)
+
+    if format == "csv":
+        body, media_type = iter_csv(rows, columns), CSV_MEDIA_TYPE
+    else:
+        body, media_type = iter_ndjson(rows), NDJSON_MEDIA_TYPE
+
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename={basename}.{format}"}
+    )
+
+async def _cached_report(report_type: str, subject_id: str, format: str, scopes: list,
+                         generate, media_type: str, filename: str, not_found: str) -> Response:
+    """
+    Serves a rendered report from the disk cache, rendering and storing it on a miss.
+    The data version is read before rendering, so a concurrent write can only
+    cause an extra re-render later, never a stale hit. Hits stream from a handle
+    opened during the lookup, so a concurrent eviction cannot pull the file away.
+    """
+    headers = {"Content-Disposition": f"attachment; filename={filename}"}
+    version = await get_data_version(*scopes)
+    cached = await report_cache.open(report_type, subject_id, format, version)
+    if cached is not None:
+        headers["Content-Length"] = str(os.fstat(cached.fileno()).st_size)
+        return StreamingResponse(iter_file_chunks(cached), media_type=media_type, headers=headers)
+
+    file_content = await generate()
+    if not file_content:
+        raise HTTPException(status_code=404, detail=not_found)
+    await report_cache.put(report_type, subject_id, format, version, file_content)
+    return Response(content=file_content, media_type=media_type, headers=headers)
+
+def _excel_download(spool, filename: str) -> StreamingResponse:
+    """Streams a spooled workbook to the client in chunks."""
+    return StreamingResponse(
+        iter_file_chunks(spool),
+        media_type=EXCEL_MEDIA_TYPE,
+        headers={
+            "Content-Disposition": f"attachment; filename={filename}",
+            "Content-Length": str(spool_size(spool)),
+        }
+    )
+
 @router.get("/attendance")
 async def download_attendance(
     format: str,
     student_id: Optional[str] = None,
     current_user: dict = Depends(get_current_user)
 ):
-    """Download attendance report (PDF/Excel)."""
+    """Download attendance report (PDF/Excel/CSV/NDJSON)."""
     if current_user["role"] == "student":
         student_id = current_user["id"]
     elif current_user["role"] not in ["admin", "mentor"]:
          raise HTTPException(status_code=403, detail="Not authorized")
-         
+
+    if format in ("csv", "ndjson"):
+        return await _text_download(
+            attendance_cursor(student_id), format, ATTENDANCE_COLUMNS,
+            "attendance_report", "No attendance data found",
+        )
+
+    if format == "excel":
+        spool = await export_attendance_excel(student_id)
+        if spool is None:
+            raise HTTPException(status_code=404, detail="No attendance data found")
+        return _excel_download(spool, "attendance_report.xlsx")
+
     file_content = await generate_attendance_report(format, student_id)
     
     if not file_content:
@@ -32,9 +120,6 @@ async def download_attendance(
 
     media_type = "application/pdf" if format == "pdf" else "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
     ext = "pdf" if format == "pdf" else "xlsx"
-    filename = f"attendance_report_{datetime.now().strftime('%Y%m%d')}.{ext}" if format == "pdf" else f"attendance_report.{ext}"
-    
-    # Simple static filename for now
     filename = f"attendance_report.{ext}"
 
     return StreamingResponse(
@@ -49,12 +134,24 @@ async def download_marks(
     student_id: Optional[str] = None,
     current_user: dict = Depends(get_current_user)
 ):
-    """Download marks report (PDF/Excel)."""
+    """Download marks report (PDF/Excel/CSV/NDJSON)."""
     if current_user["role"] == "student":
         student_id = current_user["id"]
     elif current_user["role"] not in ["admin", "mentor"]:
          raise HTTPException(status_code=403, detail="Not authorized")
-         
+
+    if format in ("csv", "ndjson"):
+        return await _text_download(
+            marks_cursor(student_id), format, MARKS_COLUMNS,
+            "marks_report", "No marks data found",
+        )
+
+    if format == "excel":
+        spool = await export_marks_excel(student_id)
+        if spool is None:
+            raise HTTPException(status_code=404, detail="No marks data found")
+        return _excel_download(spool, "marks_report.xlsx")
+
     file_content = await generate_marks_report(format, student_id)
     
     if not file_content:
@@ -78,20 +175,18 @@ async def download_mentor_summary(
     """(Mentor) Download summary of assigned mentees."""
     if current_user["role"] != "mentor":
         raise HTTPException(status_code=403, detail="Not authorized")
-        
-    file_content = await generate_mentor_summary_report(format, current_user["id"])
-    
-    if not file_content:
-        raise HTTPException(status_code=404, detail="No mentee data found")
 
     media_type = "application/pdf" if format == "pdf" else "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
     ext = "pdf" if format == "pdf" else "xlsx"
     filename = f"mentor_summary.{ext}"
 
-    return StreamingResponse(
-        io.BytesIO(file_content),
-        media_type=media_type,
-        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    # Depends on the mentee list, the mentees' profiles and each mentee's records
+    assignment = await db.assignments.find_one({"mentor_id": current_user["id"]}, {"_id": 0, "student_ids": 1})
+    scopes = ["assignments", "users"] + [student_scope(sid) for sid in (assignment or {}).get("student_ids", [])]
+    return await _cached_report(
+        "mentor-summary", current_user["id"], format, scopes,
+        lambda: generate_mentor_summary_report(format, current_user["id"]),
+        media_type, filename, "No mentee data found",
     )
 
 @router.get("/transcript")
@@ -103,15 +198,22 @@ async def download_transcript(
     """Download student transcript (marks report alias)."""
     if current_user["role"] == "student":
         student_id = current_user["id"]
-         
-    file_content = await generate_transcript_report(format, student_id)
-    
-    if not file_content:
-        raise HTTPException(status_code=404, detail="No transcript data found")
 
     media_type = "application/pdf" if format == "pdf" else "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
     filename = f"transcript.{format}"
 
+    if student_id:
+        return await _cached_report(
+            "transcript", student_id, format, [student_scope(student_id)],
+            lambda: generate_transcript_report(format, student_id),
+            media_type, filename, "No transcript data found",
+        )
+
+    file_content = await generate_transcript_report(format, student_id)
+
+    if not file_content:
+        raise HTTPException(status_code=404, detail="No transcript data found")
+
     return StreamingResponse(
         io.BytesIO(file_content),
         media_type=media_type,
@@ -138,3 +240,124 @@ async def download_certificate(
         media_type="application/pdf",
         headers={"Content-Disposition": "attachment; filename=certificate.pdf"}
     )
+
+
+@router.get("/bulk/{kind}")
+async def download_bulk_documents(
+    kind: str,
+    department: str,
+    semester: Optional[int] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """(Admin) Download transcripts or certificates for a whole department/semester as a ZIP."""
+    if current_user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Not authorized")
+    if kind not in BULK_DOCUMENT_KINDS:
+        raise HTTPException(status_code=400, detail=f"Unknown document type: {kind}")
+
+    students = await open_row_stream(bulk_students_cursor(kind, department, semester))
+    if students is None:
+        raise HTTPException(status_code=404, detail="No students found")
+
+    scope = f"{department}_sem{semester}" if semester is not None else department
+    filename = "".join(ch if ch.isalnum() or ch in "-_" else "_" for ch in f"{kind}s_{scope}") + ".zip"
+    return StreamingResponse(
+        iter_bulk_documents_zip(kind, students),
+        media_type="application/zip",
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
+# ---- Background report jobs ----
+
+def _report_job_params(payload: ReportJobCreate, current_user: dict) -> dict:
+    """Validates a job request and applies the same access rules as the direct download endpoints."""
+    if payload.type not in REPORT_JOB_TYPES:
+        raise HTTPException(status_code=400, detail=f"Unknown report type: {payload.type}")
+    if payload.format not in REPORT_JOB_FORMATS[payload.type]:
+        raise HTTPException(status_code=400, detail=f"Format {payload.format} is not available for {payload.type} reports")
+
+    params = {"type": payload.type, "format": payload.format}
+    role = current_user["role"]
+
+    if payload.type == "mentor-summary":
+        if role != "mentor":
+            raise HTTPException(status_code=403, detail="Not authorized")
+        params["mentor_id"] = current_user["id"]
+        return params
+
+    student_id = payload.filters.get("student_id")
+    if role == "student":
+        student_id = current_user["id"]
+    elif role not in ["admin", "mentor"]:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    elif payload.type in ("transcript", "certificate") and not student_id:
+        raise HTTPException(status_code=400, detail="filters.student_id is required")
+
+    params["student_id"] = student_id
+    return params
+
+async def _get_own_job(job_id: str, current_user: dict) -> dict:
+    job = await report_jobs.get(job_id)
+    if not job or (job["owner_id"] != current_user["id"] and current_user["role"] != "admin"):
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@router.post("/jobs", status_code=status.HTTP_202_ACCEPTED)
+async def create_report_job(
+    payload: ReportJobCreate,
+    current_user: dict = Depends(get_current_user)
+):
+    """Queue a report for background generation. Poll the returned job id for status."""
+    params = _report_job_params(payload, current_user)
+    job = await report_jobs.submit("report", current_user["id"], params, run_report_job)
+    return {"job_id": job["id"], "status": job["status"]}
+
+@router.post("/analytics-export", status_code=status.HTTP_202_ACCEPTED)
+async def create_analytics_export(
+    payload: AnalyticsExportCreate,
+    current_user: dict = Depends(get_current_user)
+):
+    """(Admin) Queue a partitioned Parquet export of academic and portfolio data, delivered as a ZIP job."""
+    if current_user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+    collections = payload.collections or sorted(COLLECTION_SCHEMAS)
+    unknown = [c for c in collections if c not in COLLECTION_SCHEMAS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unsupported collections: {', '.join(unknown)}")
+    if payload.partition_by is not None and payload.partition_by not in PARTITION_COLUMNS:
+        raise HTTPException(status_code=400, detail="partition_by must be department, semester or null")
+    try:
+        require_pyarrow()
+    except RuntimeError as exc:
+        raise HTTPException(status_code=503, detail=str(exc))
+
+    params = {"collections": collections, "partition_by": payload.partition_by}
+    job = await report_jobs.submit("analytics-export", current_user["id"], params, run_parquet_export_job)
+    return {"job_id": job["id"], "status": job["status"]}
+
+@router.get("/jobs/{job_id}")
+async def get_report_job(
+    job_id: str,
+    current_user: dict = Depends(get_current_user)
+):
+    """Status and progress (0-1) of a report job."""
+    job = await _get_own_job(job_id, current_user)
+    job.pop("result_path", None)
+    if job["status"] == "completed":
+        job["download_url"] = f"/api/reports/jobs/{job_id}/download"
+    return job
+
+@router.get("/jobs/{job_id}/download")
+async def download_report_job(
+    job_id: str,
+    current_user: dict = Depends(get_current_user)
+):
+    """Download the file produced by a completed report job."""
+    job = await _get_own_job(job_id, current_user)
+    if job["status"] != "completed":
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}")
+    if not job.get("result_path") or not os.path.exists(job["result_path"]):
+        raise HTTPException(status_code=410, detail="Report file is no longer available")
+
+    return FileResponse(job["result_path"], media_type=job["media_type"], filename=job["filename"])
@@ -1,16 +1,17 @@
 from fastapi import APIRouter, Depends, HTTPException
 from app.db import db
 from app.core.auth import get_current_user
-from app.core.analytics import get_department_performance, get_system_risk_distribution
+from app.core.attendance_store import attendance_reads, attendance_totals, attendance_totals_fields
+from app.core.analytics import get_department_performance, get_system_risk_distribution, mentee_risk_level
+from app.core.cache import cached
+from app.core.config import settings
+from app.core.dates import month_start, time_range, utc_now
 from typing import List, Dict, Any
 
 router = APIRouter(prefix="/api/stats", tags=["Stats"])
 
-@router.get("/admin")
-async def get_admin_overview(current_user: dict = Depends(get_current_user)):
-    if current_user["role"] != "admin":
-        raise HTTPException(status_code=403, detail="Not authorized")
-    
+@cached(ttl=settings.STATS_CACHE_TTL_SECONDS, maxsize=1, tags=("users", "assignments", "circulars"))
+async def _admin_overview() -> Dict[str, int]:
     total_students = await db.users.count_documents({"role": "student"})
     
     # Active Mentors (those who have assignments)
@@ -29,11 +30,15 @@ async def get_admin_overview(current_user: dict = Depends(get_current_user)):
         "total_assignments": total_assignments
     }
 
-@router.get("/admin/mentor-load")
-async def get_mentor_load(current_user: dict = Depends(get_current_user)):
+@router.get("/admin")
+async def get_admin_overview(current_user: dict = Depends(get_current_user)):
     if current_user["role"] != "admin":
         raise HTTPException(status_code=403, detail="Not authorized")
+    
+    return await _admin_overview()
 
+@cached(ttl=settings.STATS_CACHE_TTL_SECONDS, maxsize=1, tags=("users", "assignments"))
+async def _mentor_load() -> List[Dict[str, Any]]:
     # Aggregate students per mentor
     pipeline = [
         {"$project": {"mentor_id": 1, "student_count": {"$size": "$student_ids"}}},
@@ -51,14 +56,17 @@ async def get_mentor_load(current_user: dict = Depends(get_current_user)):
         }}
     ]
     
-    load = await db.assignments.aggregate(pipeline).to_list(100)
-    return load
+    return await db.assignments.aggregate(pipeline).to_list(100)
 
-@router.get("/admin/students-by-department")
-async def get_students_by_dept(current_user: dict = Depends(get_current_user)):
+@router.get("/admin/mentor-load")
+async def get_mentor_load(current_user: dict = Depends(get_current_user)):
     if current_user["role"] != "admin":
         raise HTTPException(status_code=403, detail="Not authorized")
-        
+
+    return await _mentor_load()
+
+@cached(ttl=settings.STATS_CACHE_TTL_SECONDS, maxsize=1, tags=("users",))
+async def _students_by_dept() -> List[Dict[str, Any]]:
     pipeline = [
         {"$match": {"role": "student"}},
         {"$group": {"_id": "$department", "count": {"$sum": 1}}},
@@ -73,18 +81,19 @@ async def get_students_by_dept(current_user: dict = Depends(get_current_user)):
             
     return stats
 
-@router.get("/admin/user-growth")
-async def get_user_growth(current_user: dict = Depends(get_current_user)):
+@router.get("/admin/students-by-department")
+async def get_students_by_dept(current_user: dict = Depends(get_current_user)):
     if current_user["role"] != "admin":
         raise HTTPException(status_code=403, detail="Not authorized")
-    
-    # Group by month (YYYY-MM)
+        
+    return await _students_by_dept()
+
+@cached(ttl=settings.STATS_CACHE_TTL_SECONDS, maxsize=1, tags=("users",))
+async def _user_growth() -> List[Dict[str, Any]]:
+    # Group by month (YYYY-MM); $toDate also accepts legacy ISO-string values.
+    # The window is the current month and the 11 before it, so at most 12 groups
     pipeline = [
-        {
-            "$match": {
-                "created_at": {"$exists": True}
-            }
-        },
+        {"$match": time_range("created_at", month_start(utc_now(), 11))},
         {
             "$group": {
                 "_id": {
@@ -99,8 +108,7 @@ async def get_user_growth(current_user: dict = Depends(get_current_user)):
                 }
             }
         },
-        {"$sort": {"_id.year": 1, "_id.month": 1}},
-        {"$limit": 12}  # Last 12 months
+        {"$sort": {"_id.year": 1, "_id.month": 1}}
     ]
     
     growth = await db.users.aggregate(pipeline).to_list(12)
@@ -120,6 +128,13 @@ async def get_user_growth(current_user: dict = Depends(get_current_user)):
         
     return result
 
+@router.get("/admin/user-growth")
+async def get_user_growth(current_user: dict = Depends(get_current_user)):
+    if current_user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Not authorized")
+    
+    return await _user_growth()
+
 @router.get("/mentor")
 async def get_mentor_stats(current_user: dict = Depends(get_current_user)):
     if current_user["role"] != "mentor":
@@ -155,13 +170,9 @@ async def get_mentor_stats(current_user: dict = Depends(get_current_user)):
         # Aggregate Attendance
         att_pipeline = [
             {"$match": {"student_id": {"$in": student_ids}}},
-            {"$group": {
-                "_id": None, 
-                "total_classes": {"$sum": 1},
-                "present_classes": {"$sum": {"$cond": [{"$eq": ["$status", "present"]}, 1, 0]}}
-            }}
+            _attendance_totals_stage(None)
         ]
-        att_agg = await db.attendance.aggregate(att_pipeline).to_list(1)
+        att_agg = await attendance_totals(db).aggregate(att_pipeline).to_list(1)
         if att_agg:
             total_classes = att_agg[0]["total_classes"]
             present_classes = att_agg[0]["present_classes"]
@@ -191,6 +202,31 @@ async def get_mentor_stats(current_user: dict = Depends(get_current_user)):
         "avg_marks": round(avg_marks, 1)
     }
 
+def _attendance_totals_stage(group_key) -> dict:
+    """$group stage counting total and present classes per `group_key`."""
+    return {"$group": {"_id": group_key, **attendance_totals_fields("total_classes", "present_classes")}}
+
+def _marks_totals_stage(group_key) -> dict:
+    """$group stage summing obtained and maximum marks per `group_key`."""
+    return {
+        "$group": {
+            "_id": group_key,
+            "total_obtained": {"$sum": "$marks_obtained"},
+            "total_max": {"$sum": "$max_marks"}
+        }
+    }
+
+def _student_percentages(att_rows: List[Dict[str, Any]], marks_rows: List[Dict[str, Any]]) -> Dict[str, Dict[str, float]]:
+    """Folds per-student attendance/marks totals into {student_id: {attendance, marks}} percentages."""
+    result: Dict[str, Dict[str, float]] = {}
+    for a in att_rows:
+        att_pct = (a["present_classes"] / a["total_classes"] * 100) if a["total_classes"] > 0 else 0
+        result.setdefault(a["_id"], {"attendance": 0, "marks": 0})["attendance"] = att_pct
+    for m in marks_rows:
+        marks_pct = (m["total_obtained"] / m["total_max"] * 100) if m["total_max"] else 0
+        result.setdefault(m["_id"], {"attendance": 0, "marks": 0})["marks"] = marks_pct
+    return result
+
 @router.get("/mentor/mentees-performance")
 async def get_mentor_mentees_performance(current_user: dict = Depends(get_current_user)):
     if current_user["role"] != "mentor":
@@ -206,29 +242,25 @@ async def get_mentor_mentees_performance(current_user: dict = Depends(get_curren
         {"_id": 0, "password_hash": 0}
     ).to_list(100)
     
+    # One grouped aggregation per collection instead of one query per mentee
+    att_rows = await attendance_totals(db).aggregate([
+        {"$match": {"student_id": {"$in": student_ids}}},
+        _attendance_totals_stage("$student_id")
+    ]).to_list(None)
+    marks_rows = await db.marks.aggregate([
+        {"$match": {"student_id": {"$in": student_ids}}},
+        _marks_totals_stage("$student_id")
+    ]).to_list(None)
+    percentages = _student_percentages(att_rows, marks_rows)
+    
     performance_data = []
     
     for s in students:
         sid = s["id"]
+        pct = percentages.get(sid, {"attendance": 0, "marks": 0})
+        att_pct = pct["attendance"]
+        marks_pct = pct["marks"]
         
-        # Attendance
-        total_att = await db.attendance.count_documents({"student_id": sid})
-        present_att = await db.attendance.count_documents({"student_id": sid, "status": "present"})
-        att_pct = (present_att / total_att * 100) if total_att > 0 else 0
-        
-        # Marks
-        marks = await db.marks.find({"student_id": sid}).to_list(None)
-        total_obtained = sum(m["marks_obtained"] for m in marks)
-        total_max = sum(m["max_marks"] for m in marks)
-        marks_pct = (total_obtained / total_max * 100) if total_max > 0 else 0
-        
-        # Risk Level
-        risk = "low"
-        if att_pct < 75 or marks_pct < 50:
-            risk = "medium"
-        if att_pct < 60 or marks_pct < 35:
-            risk = "high"
-            
         performance_data.append({
             "student_id": sid,
             "full_name": s["full_name"],
@@ -237,7 +269,7 @@ async def get_mentor_mentees_performance(current_user: dict = Depends(get_curren
             "semester": s.get("semester", 1),
             "attendance_percentage": round(att_pct, 1),
             "average_marks_percentage": round(marks_pct, 1),
-            "risk_level": risk
+            "risk_level": mentee_risk_level(att_pct, marks_pct)
         })
         
     return performance_data
@@ -265,41 +297,42 @@ async def get_mentor_dashboard_overview(current_user: dict = Depends(get_current
 
     student_ids = assignment["student_ids"]
     
-    # 1. Subject-wise Performance (Aggregated across all mentees)
-    # Marks Aggregation
-    subject_marks_pipeline = [
+    # 1. Subject-wise and per-student performance (aggregated across all mentees).
+    # Each collection is scanned once; $facet splits the subject and student views.
+    marks_facets = await db.marks.aggregate([
         {"$match": {"student_id": {"$in": student_ids}}},
-        {
-            "$group": {
-                "_id": "$subject",
-                "avg_marks": {
-                    "$avg": {
-                        "$cond": [
-                            {"$gt": ["$max_marks", 0]},
-                            {"$multiply": [{"$divide": ["$marks_obtained", "$max_marks"]}, 100]},
-                            0
-                        ]
+        {"$facet": {
+            "by_subject": [{
+                "$group": {
+                    "_id": "$subject",
+                    "avg_marks": {
+                        "$avg": {
+                            "$cond": [
+                                {"$gt": ["$max_marks", 0]},
+                                {"$multiply": [{"$divide": ["$marks_obtained", "$max_marks"]}, 100]},
+                                0
+                            ]
+                        }
                     }
                 }
-            }
-        }
-    ]
-    subject_marks = await db.marks.aggregate(subject_marks_pipeline).to_list(100)
+            }],
+            "by_student": [_marks_totals_stage("$student_id")]
+        }}
+    ]).to_list(1)
+    marks_facets = marks_facets[0] if marks_facets else {}
+    subject_marks = marks_facets.get("by_subject", [])
     
-    # Attendance Aggregation
-    subject_att_pipeline = [
+    att_facets = await attendance_totals(db).aggregate([
         {"$match": {"student_id": {"$in": student_ids}}},
-        {
-            "$group": {
-                "_id": "$subject",
-                "total_classes": {"$sum": 1},
-                "present_classes": {
-                    "$sum": {"$cond": [{"$eq": ["$status", "present"]}, 1, 0]}
-                }
-            }
-        }
-    ]
-    subject_attendance = await db.attendance.aggregate(subject_att_pipeline).to_list(100)
+        {"$facet": {
+            "by_subject": [_attendance_totals_stage("$subject")],
+            "by_student": [_attendance_totals_stage("$student_id")]
+        }}
+    ]).to_list(1)
+    att_facets = att_facets[0] if att_facets else {}
+    subject_attendance = att_facets.get("by_subject", [])
+    
+    percentages = _student_percentages(att_facets.get("by_student", []), marks_facets.get("by_student", []))
     
     # Combine Subject Data
     subject_map = {}
@@ -330,11 +363,7 @@ async def get_mentor_dashboard_overview(current_user: dict = Depends(get_current
             
     subject_performance = list(subject_map.values())
     
-    # 2. Risk Distribution
-    # We can reuse the logic from get_mentor_mentees_performance roughly, 
-    # but we need to do it efficiently.
-    # For now, let's fetch basic stats for each student to determine risk.
-    
+    # 2. Risk Distribution and Top Performers (from the per-student totals above)
     risk_counts = {"High Risk": 0, "Medium Risk": 0, "Low Risk": 0}
     
     students = await db.users.find(
@@ -344,27 +373,14 @@ async def get_mentor_dashboard_overview(current_user: dict = Depends(get_current
     
     active_students_count = 0 # Placeholder for "Active" status logic if we had it
     
+    # Top Performer = Marks > 80% AND Attendance > 85%
+    top_performers_count = 0
+    
     for s in students:
-        sid = s["id"]
         active_students_count += 1
-        
-        # Quick aggregation for this student
-        # Note: In a real large-scale system, we'd want to batch this or use a more complex single pipeline.
-        # Given the likely small number of mentees (e.g. < 20), this loop is acceptable.
-        
-        # Attendance
-        total_att = await db.attendance.count_documents({"student_id": sid})
-        present_att = await db.attendance.count_documents({"student_id": sid, "status": "present"})
-        att_pct = (present_att / total_att * 100) if total_att > 0 else 0
-        
-        # Marks
-        marks = await db.marks.find({"student_id": sid}).to_list(None)
-        if marks:
-            total_obtained = sum(m["marks_obtained"] for m in marks)
-            total_max = sum(m["max_marks"] for m in marks)
-            marks_pct = (total_obtained / total_max * 100) if total_max > 0 else 0
-        else:
-            marks_pct = 0
+        pct = percentages.get(s["id"], {"attendance": 0, "marks": 0})
+        att_pct = pct["attendance"]
+        marks_pct = pct["marks"]
             
         # Risk Logic
         if att_pct < 60 or marks_pct < 35:
@@ -374,6 +390,9 @@ async def get_mentor_dashboard_overview(current_user: dict = Depends(get_current
         else:
             risk_counts["Low Risk"] += 1
             
+        if att_pct > 85 and marks_pct > 80:
+            top_performers_count += 1
+            
     risk_distribution = [
         {"name": "High Risk", "value": risk_counts["High Risk"], "color": "#ef4444"},
         {"name": "Medium Risk", "value": risk_counts["Medium Risk"], "color": "#f59e0b"},
@@ -381,71 +400,9 @@ async def get_mentor_dashboard_overview(current_user: dict = Depends(get_current
     ]
     
     # 3. Insights & Action Cards Data
-    
-    # High Risk Count (already calculated)
     high_risk_count = risk_counts["High Risk"]
     
-    # Top Performers (Low Risk + Good Marks/Attendance)
-    # Let's say Top Performer = Marks > 80% AND Attendance > 85%
-    top_performers_count = 0
-    
-    # Attendance Pending (Students with no attendance record for today)
-    # This requires checking if an attendance record exists for the current date.
-    # For simplicity in this demo, let's say "Attendance Pending" = Total Students - Present Students Today
-    # But we don't have "Today's Attendance" easily without a new query.
-    # Alternative: Students with < 75% attendance are "Pending Improvement"? 
-    # Or just use a random logic based on data present? 
-    # Let's try to query for today's attendance if possible, or just default to 0 if too complex.
-    # Actually, let's stick to "Students with < 60% Attendance" as "Critical Attendance"?
-    # The prompt says "Attendance Pending" value "3 students". 
-    # Let's interpret "Attendance Pending" as "Students who haven't been marked present today".
-    # Since we can't easily check "today" without date context, let's use "Students with < 50% attendance" as a proxy for "Needs Attention"?
-    # No, let's look at the UI label: "Attendance Pending" -> "Mark Now".
-    # This implies marking attendance for the day.
-    # Let's check how many students have NO attendance records at all, or just return a placeholder 
-    # or implement a check for "Last Attendance Date != Today".
-    
-    import datetime
-    today = datetime.datetime.now().strftime("%Y-%m-%d")
-    # This is rough, as attendance dates might be stored differently. 
-    # Let's assume we can't easily check this perfectly without more context on date storage.
-    # So we will return a count of students with Low Attendance (< 75%) as "Attendance Focus Needed"
-    # transforming the card slightly? 
-    # Or better: "Attendance Pending" = Total Students (if we haven't marked today).
-    # Let's return 0 for now and user can implement the "Today" logic later, 
-    # OR we count students with < 75% attendance as detailed "Attention Needed".
-    
-    # Let's actually implement a "Top Performers" count.
-    
-    for s in students:
-        sid = s["id"]
-        
-        # Re-fetch or use cached data if we had it. iterating again is fine for small N.
-        # We need per-student stats.
-        
-        # Attendance
-        total_att = await db.attendance.count_documents({"student_id": sid})
-        present_att = await db.attendance.count_documents({"student_id": sid, "status": "present"})
-        att_pct = (present_att / total_att * 100) if total_att > 0 else 0
-        
-        # Marks
-        marks = await db.marks.find({"student_id": sid}).to_list(None)
-        if marks:
-            total_obtained = sum(m["marks_obtained"] for m in marks)
-            total_max = sum(m["max_marks"] for m in marks)
-            marks_pct = (total_obtained / total_max * 100) if total_max > 0 else 0
-        else:
-            marks_pct = 0
-            
-        if att_pct > 85 and marks_pct > 80:
-            top_performers_count += 1
-            
-    # Feedback Due
-    # Count students with pending letters or who haven't received feedback in > 30 days?
-    # Simpler: Count students with 0 feedback records? 
-    # Or use the "pending_reviews" we calculated in get_mentor_stats?
-    # Let's use `pending_reviews` logic but per student?
-    # Let's just re-use the aggregation from get_mentor_stats
+    # Feedback Due: pending certification reviews + pending letters (same as get_mentor_stats)
     pending_certs = await db.certifications.count_documents({
         "student_id": {"$in": student_ids},
         "is_verified": False
@@ -457,10 +414,6 @@ async def get_mentor_dashboard_overview(current_user: dict = Depends(get_current
     })
     
     feedback_due_count = pending_certs + pending_letters
-
-    attendance_pending_count = len(student_ids) # Mock logic: Assume need to mark for all
-    # Refinement: If we successfully query today's attendance, we could subtract.
-    # For now, simplistic approach is better than breaking.
     
     insights = {
         "total_students": len(student_ids),
@@ -484,7 +437,7 @@ async def get_student_stats(current_user: dict = Depends(get_current_user)):
         raise HTTPException(status_code=403, detail="Not authorized")
         
     # Calculate attendance
-    attendance_records = await db.attendance.find({"student_id": current_user["id"]}).to_list(1000)
+    attendance_records = await attendance_reads(db).find({"student_id": current_user["id"]}).to_list(1000)
     total_classes = len(attendance_records)
     present_classes = sum(1 for r in attendance_records if r["status"] == "present")
     attendance_pct = (present_classes / total_classes * 100) if total_classes > 0 else 0
@@ -566,7 +519,7 @@ async def get_student_performance(current_user: dict = Depends(get_current_user)
         },
         {"$sort": {"_id.year": 1, "_id.month": 1}}
     ]
-    monthly_attendance = await db.attendance.aggregate(attendance_pipeline).to_list(12)
+    monthly_attendance = await attendance_reads(db).aggregate(attendance_pipeline).to_list(12)
     
     # Combine monthly data
     trend_map = {}
@@ -620,17 +573,9 @@ async def get_student_performance(current_user: dict = Depends(get_current_user)
     
     subject_att_pipeline = [
         {"$match": {"student_id": student_id}},
-        {
-            "$group": {
-                "_id": "$subject",
-                "total_classes": {"$sum": 1},
-                "present_classes": {
-                    "$sum": {"$cond": [{"$eq": ["$status", "present"]}, 1, 0]}
-                }
-            }
-        }
+        _attendance_totals_stage("$subject")
     ]
-    subject_attendance = await db.attendance.aggregate(subject_att_pipeline).to_list(20)
+    subject_attendance = await attendance_totals(db).aggregate(subject_att_pipeline).to_list(20)
     
     subject_map = {}
     
@@ -659,8 +604,8 @@ async def get_student_performance(current_user: dict = Depends(get_current_user)
     subject_distribution = list(subject_map.values())
     
     # 3. Academic Summary
-    total_classes = await db.attendance.count_documents({"student_id": student_id})
-    present_days = await db.attendance.count_documents({"student_id": student_id, "status": "present"})
+    total_classes = await attendance_reads(db).count_documents({"student_id": student_id})
+    present_days = await attendance_reads(db).count_documents({"student_id": student_id, "status": "present"})
     tests_taken = await db.marks.count_documents({"student_id": student_id}) 
     assignments_submitted = await db.assignments.count_documents({"student_ids": student_id}) # Very rough approx
     
@@ -1,6 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from typing import List, Optional
-from datetime import datetime, timezone
 import uuid
 
 from app.db import db
@@ -62,7 +61,6 @@ async def create_subject(
     )
     
     subject_data = subject.model_dump()
-    subject_data["created_at"] = subject_data["created_at"].isoformat()
     
     await db.subjects.insert_one(subject_data)
     
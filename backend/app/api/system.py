@@ -1,20 +1,30 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import PlainTextResponse
 from app.db import db
+from app.core.metrics import (
+    REGISTRY,
+    CONTENT_TYPE_LATEST,
+    PROCESS_START_TIME,
+    event_loop_lag,
+    http_requests_in_flight,
+)
 from datetime import datetime, timezone
 import time
 
 router = APIRouter(prefix="/api/system", tags=["System"])
 
+# Event-loop delay above which the worker is reported as degraded (seconds)
+LOOP_LAG_DEGRADED = 0.25
+
 @router.get("/health")
 async def system_health():
     """
-    Returns the real-time health of the core systems: API, Database.
+    Returns the real-time health of the core systems: API, Database, Event Loop.
     """
     statuses = [
-        {"name": "API Server", "status": "operational", "latency": 0},
+        {"name": "API Server", "status": "operational", "latency": 0,
+         "in_flight": int(http_requests_in_flight.value())},
         {"name": "Database Connection", "status": "checking", "latency": 0},
-        {"name": "Third-party Services", "status": "operational", "latency": 0},
-        {"name": "Job Scheduler", "status": "operational", "latency": 0},
     ]
 
     # Check Database Health
@@ -29,8 +39,21 @@ async def system_health():
         statuses[1]["status"] = "degraded"
         statuses[1]["latency"] = -1
 
+    # Event loop responsiveness, as sampled by the background lag monitor
+    lag = event_loop_lag.value()
+    statuses.append({
+        "name": "Event Loop",
+        "status": "operational" if lag < LOOP_LAG_DEGRADED else "degraded",
+        "latency": round(lag * 1000),
+    })
+
     return {
         "timestamp": datetime.now(timezone.utc).isoformat(),
-        "uptime_percent": 99.99,
+        "uptime_seconds": round(time.time() - PROCESS_START_TIME),
         "services": statuses
     }
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Exposes process metrics in the Prometheus text format."""
+    return PlainTextResponse(REGISTRY.render(), media_type=CONTENT_TYPE_LATEST)
@@ -1,16 +1,24 @@
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
 from typing import List, Optional, Dict, Any
 from app.db import db
-from app.core.auth import get_current_user, get_password_hash
+from app.core.auth import get_current_user, invalidate_user
+from app.core.hashing import hash_passwords
 from app.core.audit import log_action
+from app.core.cache import invalidate as invalidate_cache
+from app.core.data_versions import bump_data_versions
 import csv
 import json
 import uuid
-from datetime import datetime
+from datetime import datetime, timezone
+from app.core.dates import as_datetime, utc_now
 from io import StringIO
+from pymongo.errors import BulkWriteError
 
 router = APIRouter(prefix="/api/users", tags=["User Management"])
 
+# Users per insert_many in bulk imports
+IMPORT_BATCH_SIZE = 500
+
 @router.get("/me")
 async def get_my_profile(current_user: dict = Depends(get_current_user)):
     """Returns the profile of the currently authenticated user."""
@@ -44,48 +52,70 @@ async def bulk_import_users(
     if not users_to_insert:
         raise HTTPException(status_code=400, detail="No users found in file")
         
-    inserted_count = 0
     errors = []
-    
+    rows = []
+    seen = set()
     for user_data in users_to_insert:
+        email = user_data.get("email")
+        if not email or not user_data.get("full_name"):
+            errors.append(f"Missing email or full_name for row: {user_data}")
+            continue
+        if email in seen:
+            errors.append(f"User with email {email} appears more than once in the file")
+            continue
         try:
-            # Required fields
-            email = user_data.get("email")
-            full_name = user_data.get("full_name")
-            role = user_data.get("role", "student")
-            password = user_data.get("password", "password123")
-            
-            if not email or not full_name:
-                errors.append(f"Missing email or full_name for row: {user_data}")
-                continue
-                
-            # Check existing
-            existing = await db.users.find_one({"email": email})
-            if existing:
-                errors.append(f"User with email {email} already exists")
-                continue
-                
-            user_id = str(uuid.uuid4())
-            new_user = {
-                "id": user_id,
-                "email": email,
-                "full_name": full_name,
-                "role": role,
-                "password_hash": get_password_hash(password),
-                "created_at": datetime.utcnow().isoformat(),
-                "phone": user_data.get("phone", ""),
-                "department": user_data.get("department", ""),
-                "semester": int(user_data.get("semester", 1)) if user_data.get("semester") else None,
-                "usn": user_data.get("usn", ""),
-                "settings": {}
-            }
-            
-            await db.users.insert_one(new_user)
-            inserted_count += 1
-            
-        except Exception as e:
-            errors.append(f"Error processing {user_data.get('email', 'unknown')}: {str(e)}")
-            
+            semester = int(user_data.get("semester", 1)) if user_data.get("semester") else None
+        except (TypeError, ValueError) as e:
+            errors.append(f"Error processing {email}: {str(e)}")
+            continue
+        password = user_data.get("password", "password123")
+        if not isinstance(password, str) or not password:
+            errors.append(f"Error processing {email}: password must be a non-empty string")
+            continue
+        seen.add(email)
+        rows.append((user_data, semester))
+
+    # One lookup for every email in the file instead of one find_one per row
+    existing = {
+        u["email"]
+        for u in await db.users.find({"email": {"$in": list(seen)}}, {"_id": 0, "email": 1}).to_list(None)
+    } if seen else set()
+    errors.extend(f"User with email {email} already exists" for email in sorted(existing))
+    rows = [(user_data, semester) for user_data, semester in rows if user_data["email"] not in existing]
+
+    # pbkdf2 is CPU-bound; hash in worker processes so the API keeps serving requests
+    hashes = await hash_passwords([user_data.get("password", "password123") for user_data, _ in rows])
+
+    new_users = []
+    for (user_data, semester), password_hash in zip(rows, hashes):
+        new_users.append({
+            "id": str(uuid.uuid4()),
+            "email": user_data["email"],
+            "full_name": user_data["full_name"],
+            "role": user_data.get("role", "student"),
+            "password_hash": password_hash,
+            "created_at": utc_now(),
+            "phone": user_data.get("phone", ""),
+            "department": user_data.get("department", ""),
+            "semester": semester,
+            "usn": user_data.get("usn", ""),
+            "settings": {}
+        })
+
+    inserted_count = 0
+    for start in range(0, len(new_users), IMPORT_BATCH_SIZE):
+        batch = new_users[start:start + IMPORT_BATCH_SIZE]
+        try:
+            result = await db.users.insert_many(batch, ordered=False)
+            inserted_count += len(result.inserted_ids)
+        except BulkWriteError as e:
+            inserted_count += e.details.get("nInserted", 0)
+            for write_error in e.details.get("writeErrors", []):
+                email = batch[write_error["index"]]["email"]
+                errors.append(f"Error processing {email}: {write_error.get('errmsg', 'write failed')}")
+
+    if inserted_count:
+        invalidate_cache("users")
     await log_action(current_user["id"], "IMPORT", "users", {"inserted": inserted_count, "errors": len(errors)})
     
     return {
@@ -107,6 +137,7 @@ async def update_my_settings(
         {"id": current_user["id"]},
         {"$set": {"settings": updated_settings}}
     )
+    invalidate_user(current_user["id"])
     
     await log_action(current_user["id"], "UPDATE", "settings", {"changes": settings})
     
@@ -164,6 +195,9 @@ async def update_user_profile(
             raise HTTPException(status_code=400, detail="Semester must be an integer")
 
     await db.users.update_one({"id": user_id}, {"$set": update_fields})
+    invalidate_user(user_id)
+    invalidate_cache("users")
+    await bump_data_versions(["users"])
     
     updated_user = await db.users.find_one({"id": user_id}, {"_id": 0, "password_hash": 0})
     
@@ -181,6 +215,9 @@ async def delete_user(
         raise HTTPException(status_code=403, detail="Not authorized")
 
     await db.users.delete_one({"id": user_id})
+    invalidate_user(user_id)
+    invalidate_cache("users")
+    await bump_data_versions(["users"])
     await log_action(current_user["id"], "DELETE", "user", {"target_id": user_id})
     
     return {"message": "User deleted successfully"}
@@ -219,5 +256,6 @@ async def get_student_timeline(current_user: dict = Depends(get_current_user)):
             "meta": {"from": f.get("mentor_id")}
         })
         
-    timeline.sort(key=lambda x: x["timestamp"], reverse=True)
+    # Old entries may still hold ISO strings; compare everything as datetimes
+    timeline.sort(key=lambda x: as_datetime(x["timestamp"]) or datetime.min.replace(tzinfo=timezone.utc), reverse=True)
     return timeline[:50]
@@ -6,13 +6,20 @@ from app.core.auth import (
     create_access_token, 
     get_current_user,
     get_password_hash,
-    verify_password
 )
+from app.core.config import settings
+from app.core.hashing import login_backlog, verify_password_async
+from app.core.metrics import REGISTRY
 from app.models.user import UserCreate, User
 from app.core.audit import log_action
+from app.core.cache import invalidate as invalidate_cache
 
 router = APIRouter(prefix="/api/auth", tags=["Authentication"])
 
+logins_rejected = REGISTRY.counter(
+    "login_rejected_total", "Logins turned away because too many password checks were queued."
+)
+
 @router.post("/register")
 async def register(payload: UserCreate):
     """Registers a new user."""
@@ -27,9 +34,9 @@ async def register(payload: UserCreate):
     # Create the User object to generate UUID and timestamp
     new_user = User(**user_data)
     user_dict = new_user.model_dump()
-    user_dict["created_at"] = user_dict["created_at"].isoformat()
 
     await db.users.insert_one(user_dict)
+    invalidate_cache("users")
     
     # Remove sensitive and non-serializable fields before returning
     user_dict.pop("password_hash", None)
@@ -64,7 +71,15 @@ async def login(
     # Check for both password_hash and legacy fields
     password_hash = user.get("password_hash") or user.get("password") or user.get("hashed_password")
     
-    if not password_hash or not verify_password(password, password_hash):
+    if not password_hash:
+        raise HTTPException(status_code=401, detail="Incorrect email or password")
+    if login_backlog() >= settings.LOGIN_MAX_PENDING:
+        # Shed load instead of queueing logins that would time out anyway
+        logins_rejected.inc()
+        raise HTTPException(
+            status_code=503, detail="Too many logins in progress, try again shortly", headers={"Retry-After": "1"}
+        )
+    if not await verify_password_async(password, password_hash):
         raise HTTPException(status_code=401, detail="Incorrect email or password")
 
     # Create access token
@@ -2,6 +2,9 @@ from datetime import datetime, timezone
 import statistics
 from typing import List, Dict, Any
 from app.db import db
+from app.core.attendance_store import attendance_reads, attendance_totals_fields, attendance_totals_name
+from app.core.cache import cached
+from app.core.config import settings
 
 async def get_system_risk_distribution() -> Dict[str, int]:
     """
@@ -13,7 +16,7 @@ async def get_system_risk_distribution() -> Dict[str, int]:
     risk_counts = {"high": 0, "medium": 0, "low": 0}
     
     # Pre-fetch all data to minimize queries (optimization)
-    all_attendance = await db.attendance.find({}, {"student_id": 1, "status": 1, "_id": 0}).to_list(100000)
+    all_attendance = await attendance_reads(db).find({}, {"student_id": 1, "status": 1, "_id": 0}).to_list(100000)
     all_marks = await db.marks.find({}, {"student_id": 1, "marks_obtained": 1, "max_marks": 1, "_id": 0}).to_list(100000)
     
     # Process in memory
@@ -55,6 +58,7 @@ async def get_system_risk_distribution() -> Dict[str, int]:
             
     return risk_counts
 
+@cached(ttl=settings.STATS_CACHE_TTL_SECONDS, maxsize=1, tags=("users", "marks"))
 async def get_department_performance() -> List[Dict[str, Any]]:
     """
     Returns average marks percentage per department.
@@ -134,3 +138,74 @@ async def predict_student_outcome(student_id: str) -> Dict[str, Any]:
         "confidence": confidence,
         "projected_percentage": round(current_avg, 2)
     }
+
+def mentee_risk_level(attendance_pct: float, marks_pct: float) -> str:
+    """Risk band used on mentor views: high below 60% attendance / 35% marks, medium below 75% / 50%."""
+    if attendance_pct < 60 or marks_pct < 35:
+        return "high"
+    if attendance_pct < 75 or marks_pct < 50:
+        return "medium"
+    return "low"
+
+def _lookup_summary(collection: str, group: dict, match: dict = None, as_: str = None) -> dict:
+    """$lookup stage that folds a student's documents in `collection` into one summary row (field `as_`)."""
+    pipeline = [{"$match": match}] if match else []
+    pipeline.append({"$group": {"_id": None, **group}})
+    return {"$lookup": {
+        "from": collection,
+        "localField": "id",
+        "foreignField": "student_id",
+        "pipeline": pipeline,
+        "as": as_ or collection,
+    }}
+
+async def get_mentee_metrics(student_ids: List[str]) -> List[Dict[str, Any]]:
+    """
+    Per-mentee attendance %, marks %, risk level, pending reviews and latest
+    feedback date, from a single aggregation over `users`. Each $lookup groups
+    on the server, so one summary row per mentee and collection comes back.
+    Pending reviews are unverified certifications plus letters awaiting a reply.
+    """
+    if not student_ids:
+        return []
+
+    pipeline = [
+        {"$match": {"id": {"$in": list(student_ids)}}},
+        {"$project": {"_id": 0, "id": 1, "full_name": 1, "usn": 1, "department": 1, "semester": 1}},
+        _lookup_summary(attendance_totals_name(), attendance_totals_fields(), as_="attendance"),
+        _lookup_summary("marks", {
+            "obtained": {"$sum": "$marks_obtained"},
+            "max": {"$sum": "$max_marks"},
+        }),
+        _lookup_summary("certifications", {"count": {"$sum": 1}}, {"is_verified": False}),
+        _lookup_summary("letters", {"count": {"$sum": 1}}, {"status": "pending"}),
+        _lookup_summary("feedback", {"latest": {"$max": "$created_at"}}),
+        {"$sort": {"usn": 1}},
+    ]
+    rows = await db.users.aggregate(pipeline).to_list(None)
+
+    def summary(row, collection):
+        return row[collection][0] if row.get(collection) else {}
+
+    metrics = []
+    for row in rows:
+        att = summary(row, "attendance")
+        marks = summary(row, "marks")
+        att_pct = (att["present"] / att["total"] * 100) if att.get("total") else 0
+        marks_pct = (marks["obtained"] / marks["max"] * 100) if marks.get("max") else 0
+        latest = summary(row, "feedback").get("latest")
+        if isinstance(latest, datetime):
+            latest = latest.isoformat()
+        metrics.append({
+            "student_id": row["id"],
+            "full_name": row.get("full_name", ""),
+            "usn": row.get("usn", "N/A"),
+            "department": row.get("department", "N/A"),
+            "semester": row.get("semester", 1),
+            "attendance_percentage": round(att_pct, 1),
+            "average_marks_percentage": round(marks_pct, 1),
+            "risk_level": mentee_risk_level(att_pct, marks_pct),
+            "pending_reviews": summary(row, "certifications").get("count", 0) + summary(row, "letters").get("count", 0),
+            "latest_feedback": latest[:10] if latest else None,
+        })
+    return metrics
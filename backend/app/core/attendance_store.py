@@ -0,0 +1,217 @@
+"""
+Attendance storage modes.
+
+settings.ATTENDANCE_STORAGE selects how attendance is kept:
+
+- "documents" (default): one `attendance` document per student, subject and date.
+- "monthly": one `attendance_monthly` document per student, subject and month:
+
+      {"student_id": "...", "subject": "Math", "month": "2024-03",
+       "days": "PPA-L--P...",            # one character per day of the month
+       "present": 3, "absent": 1, "leave": 1, "total": 5,
+       "recorded_by": "...", "created_at": ..., "updated_at": ...}
+
+  A month of classes is one ~200-byte document instead of up to 31 full
+  records, and per-student totals are read from the counters without
+  touching the days at all.
+
+Readers do not need to know which mode is active:
+
+    attendance_reads(db).find({"student_id": sid})     # per-session documents
+    attendance_totals(db).aggregate([
+        {"$match": {"student_id": {"$in": ids}}},
+        {"$group": {"_id": "$student_id", **attendance_totals_fields()}},
+    ])
+
+In monthly mode attendance_reads() is the `attendance_sessions` view, which
+expands each month back into {student_id, subject, date, status, ...}
+documents, so existing find / aggregate / count queries keep working; totals
+queries go to the monthly documents and sum the counters. Writes go through
+`app.core.ingest.write_records`. `python migrate_attendance_monthly.py`
+copies existing records into the monthly collection.
+"""
+import calendar
+from datetime import date
+from typing import Dict, List, Tuple
+
+from pymongo import UpdateOne
+from pymongo.errors import OperationFailure
+
+from app.db import db
+from app.core.config import settings
+from app.core.dates import utc_now
+
+MONTHLY_COLLECTION = "attendance_monthly"
+SESSIONS_VIEW = "attendance_sessions"
+MONTH_KEY = ("student_id", "subject", "month")
+
+STATUS_CODES = {"present": "P", "absent": "A", "leave": "L"}
+NO_CLASS = "-"
+DAYS_IN_MONTH = 31
+EMPTY_MONTH = NO_CLASS * DAYS_IN_MONTH
+WRITE_BATCH_SIZE = 1000
+
+
+def monthly_attendance() -> bool:
+    return settings.ATTENDANCE_STORAGE == "monthly"
+
+
+def attendance_reads(database):
+    """Collection (or view) holding one document per attendance session."""
+    return database[SESSIONS_VIEW] if monthly_attendance() else database.attendance
+
+
+def attendance_reads_name() -> str:
+    """Name of attendance_reads(), for $lookup stages."""
+    return SESSIONS_VIEW if monthly_attendance() else "attendance"
+
+
+def attendance_totals(database):
+    """Collection to sum attendance_totals_fields() over; match on student_id / subject only."""
+    return database[MONTHLY_COLLECTION] if monthly_attendance() else database.attendance
+
+
+def attendance_totals_name() -> str:
+    return MONTHLY_COLLECTION if monthly_attendance() else "attendance"
+
+
+def attendance_totals_fields(total: str = "total", present: str = "present") -> dict:
+    """$group accumulators counting classes and classes attended."""
+    if monthly_attendance():
+        return {total: {"$sum": "$total"}, present: {"$sum": "$present"}}
+    return {
+        total: {"$sum": 1},
+        present: {"$sum": {"$cond": [{"$eq": ["$status", "present"]}, 1, 0]}},
+    }
+
+
+def session_date(record: dict) -> date:
+    """The record's class date; ValueError unless it is YYYY-MM-DD."""
+    return date.fromisoformat(str(record["date"])[:10])
+
+
+def month_update(record: dict) -> Tuple[dict, list]:
+    """
+    (filter, update pipeline) setting one day of a monthly document and
+    adjusting its counters by the difference from the day's previous status.
+    """
+    day = session_date(record).day - 1
+    code = STATUS_CODES[record["status"]]
+    days = {"$ifNull": ["$days", EMPTY_MONTH]}
+    counters = {
+        status: {"$add": [
+            {"$ifNull": [f"${status}", 0]},
+            1 if other == code else 0,
+            {"$cond": [{"$eq": ["$_previous", other]}, -1, 0]},
+        ]}
+        for status, other in STATUS_CODES.items()
+    }
+    pipeline = [
+        {"$set": {
+            "_previous": {"$substrCP": [days, day, 1]},
+            "days": {"$concat": [
+                {"$substrCP": [days, 0, day]}, code, {"$substrCP": [days, day + 1, DAYS_IN_MONTH]},
+            ]},
+            "recorded_by": {"$literal": record.get("recorded_by")},
+            "created_at": {"$ifNull": ["$created_at", {"$literal": record.get("created_at") or utc_now()}]},
+            "updated_at": {"$literal": utc_now()},
+        }},
+        {"$set": counters},
+        {"$set": {"total": {"$add": [f"${status}" for status in STATUS_CODES]}}},
+        {"$unset": "_previous"},
+    ]
+    key = {"student_id": record["student_id"], "subject": record["subject"], "month": str(record["date"])[:7]}
+    return key, pipeline
+
+
+async def upsert_months(collection, records: List[dict]) -> Tuple[int, int]:
+    """
+    Writes attendance records into monthly documents in WRITE_BATCH_SIZE
+    slices; returns (inserted, updated) counted per session, as the
+    per-document mode does.
+    """
+    inserted = updated = 0
+    for start in range(0, len(records), WRITE_BATCH_SIZE):
+        batch = records[start:start + WRITE_BATCH_SIZE]
+        updates = [month_update(r) for r in batch]
+        # Days already marked decide inserted vs updated: one read per batch
+        existing: Dict[tuple, str] = {}
+        cursor = collection.find(
+            {
+                "student_id": {"$in": list({k["student_id"] for k, _ in updates})},
+                "month": {"$in": list({k["month"] for k, _ in updates})},
+            },
+            {"_id": 0, "student_id": 1, "subject": 1, "month": 1, "days": 1},
+        )
+        for doc in await cursor.to_list(None):
+            existing[tuple(doc[k] for k in MONTH_KEY)] = doc.get("days") or EMPTY_MONTH
+        for record, (key, _) in zip(batch, updates):
+            days = existing.get(tuple(key[k] for k in MONTH_KEY), EMPTY_MONTH)
+            if days[session_date(record).day - 1] == NO_CLASS:
+                inserted += 1
+            else:
+                updated += 1
+
+        await collection.bulk_write([UpdateOne(key, pipeline, upsert=True) for key, pipeline in updates], ordered=False)
+    return inserted, updated
+
+
+def expand_month(doc: dict) -> List[dict]:
+    """The per-session documents a monthly document stands for (what the view returns)."""
+    year, month = (int(part) for part in doc["month"].split("-"))
+    statuses = {code: status for status, code in STATUS_CODES.items()}
+    sessions = []
+    for day, code in enumerate(doc.get("days", "")[:calendar.monthrange(year, month)[1]], start=1):
+        if code == NO_CLASS:
+            continue
+        session_day = f"{doc['month']}-{day:02d}"
+        sessions.append({
+            "id": f"{doc['student_id']}:{doc['subject']}:{session_day}",
+            "student_id": doc["student_id"],
+            "subject": doc["subject"],
+            "date": session_day,
+            "status": statuses.get(code, "unknown"),
+            "recorded_by": doc.get("recorded_by"),
+            "created_at": doc.get("created_at"),
+        })
+    return sessions
+
+
+def sessions_view_pipeline() -> list:
+    """Aggregation behind the attendance_sessions view; mirrors expand_month."""
+    day_of_month = {"$add": ["$day", 1]}
+    session_day = {"$concat": [
+        "$month", "-",
+        {"$cond": [{"$lt": [day_of_month, 10]}, "0", ""]},
+        {"$toString": day_of_month},
+    ]}
+    return [
+        {"$project": {
+            "_id": 0, "student_id": 1, "subject": 1, "month": 1, "days": 1, "recorded_by": 1, "created_at": 1,
+            "day": {"$range": [0, {"$strLenCP": "$days"}]},
+        }},
+        {"$unwind": "$day"},
+        {"$set": {"code": {"$substrCP": ["$days", "$day", 1]}}},
+        {"$match": {"code": {"$ne": NO_CLASS}}},
+        {"$set": {"date": session_day}},
+        {"$project": {
+            "id": {"$concat": ["$student_id", ":", "$subject", ":", "$date"]},
+            "student_id": 1, "subject": 1, "date": 1, "recorded_by": 1, "created_at": 1,
+            "status": {"$switch": {
+                "branches": [{"case": {"$eq": ["$code", code]}, "then": status} for status, code in STATUS_CODES.items()],
+                "default": "unknown",
+            }},
+        }},
+    ]
+
+
+async def ensure_sessions_view():
+    """Creates (or updates) the attendance_sessions view when monthly storage is on."""
+    if not monthly_attendance():
+        return
+    try:
+        await db.command({"create": SESSIONS_VIEW, "viewOn": MONTHLY_COLLECTION, "pipeline": sessions_view_pipeline()})
+    except OperationFailure as exc:
+        if exc.code != 48:  # NamespaceExists
+            raise
+        await db.command({"collMod": SESSIONS_VIEW, "viewOn": MONTHLY_COLLECTION, "pipeline": sessions_view_pipeline()})
@@ -1,22 +1,23 @@
+import copy
 import os
 from datetime import datetime, timezone, timedelta
 from typing import Optional, Dict, Any
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from app.db import db
+from app.core.cache import cached
 from app.core.config import settings
+from app.core.hashing import pwd_context
 
 # Security Constants
 SECRET_KEY = settings.JWT_SECRET_KEY or settings.SECRET_KEY
 ALGORITHM = settings.ALGORITHM
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
 
-# Password Hashing
-pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
 security = HTTPBearer()
 
+# Password Hashing (pwd_context lives in app.core.hashing, shared with bulk imports)
 def verify_password(plain_password, hashed_password):
     """Verifies a plain password against a hashed one."""
     return pwd_context.verify(plain_password, hashed_password)
@@ -33,6 +34,17 @@ def create_access_token(data: dict):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+# Everything get_current_user hands to handlers, minus ObjectId and credentials
+USER_PROJECTION = {"_id": 0, "password_hash": 0, "password": 0, "hashed_password": 0}
+
+@cached(ttl=settings.USER_CACHE_TTL_SECONDS, maxsize=settings.USER_CACHE_MAX_ENTRIES, name="current_user")
+async def _load_user(user_id: str) -> Optional[dict]:
+    return await db.users.find_one({"id": user_id}, USER_PROJECTION)
+
+def invalidate_user(user_id: str):
+    """Drops a user from the get_current_user cache; call after writing to that user."""
+    _load_user.invalidate(user_id)
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
 ):
@@ -51,11 +63,8 @@ async def get_current_user(
     except JWTError as exc:
         raise credentials_exception from exc
 
-    user = await db.users.find_one({"id": user_id})
+    user = await _load_user(user_id)
     if user is None:
         raise credentials_exception
-
-    # Remove MongoDB ObjectId
-    if "_id" in user:
-        del user["_id"]
-    return user
+    # The cached document is shared; handlers may modify what they get
+    return copy.deepcopy(user)
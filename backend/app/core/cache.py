@@ -0,0 +1,146 @@
+"""
+In-process async result cache with TTL, LRU eviction and single-flight.
+
+    @cached(ttl=60, maxsize=32, tags=("users",))
+    async def expensive_aggregate(department: str): ...
+
+Concurrent calls with the same arguments share one computation. Write
+endpoints call `invalidate("users")` to drop every cache tagged "users".
+Cached values are shared between callers and must be treated as read-only.
+"""
+import asyncio
+import functools
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Optional
+
+from app.core.metrics import REGISTRY
+
+cache_requests_total = REGISTRY.counter(
+    "cache_requests_total", "Cache lookups, by cache and result (hit, miss, coalesced).", ("cache", "result")
+)
+cache_entries = REGISTRY.gauge("cache_entries", "Entries currently held, by cache.", ("cache",))
+
+# tag -> caches that should be cleared when that kind of data changes
+_TAGGED: Dict[str, List["AsyncTTLCache"]] = {}
+
+
+class AsyncTTLCache:
+    """Bounded LRU mapping whose entries expire after `ttl` seconds."""
+
+    def __init__(self, name: str, ttl: float, maxsize: int = 128):
+        self.name = name
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()  # key -> (expires_at, value)
+        # Invalidation drops the key's computation from here, so a result read
+        # before the write is not stored and later callers do not coalesce on it
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _get_fresh(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return False, None
+        self._entries.move_to_end(key)
+        return True, value
+
+    def _store(self, key, value):
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        cache_entries.set(len(self._entries), cache=self.name)
+
+    async def get_or_compute(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+        while True:
+            found, value = self._get_fresh(key)
+            if found:
+                cache_requests_total.inc(cache=self.name, result="hit")
+                return value
+
+            inflight = self._inflight.get(key)
+            if inflight is None:
+                break
+            cache_requests_total.inc(cache=self.name, result="coalesced")
+            try:
+                # shield: a cancelled waiter must not cancel the shared computation
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                # Only the caller that started the computation was cancelled: compute again
+                if not inflight.cancelled() or asyncio.current_task().cancelling():
+                    raise
+
+        cache_requests_total.inc(cache=self.name, result="miss")
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await compute()
+        except Exception as exc:
+            future.set_exception(exc)
+            # Retrieve it so an exception with no other waiters is not reported as unhandled
+            future.exception()
+            raise
+        except BaseException:
+            # Cancellation belongs to this caller, not to the waiters sharing its result
+            future.cancel()
+            raise
+        else:
+            if self._inflight.get(key) is future:
+                self._store(key, value)
+            future.set_result(value)
+            return value
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def invalidate(self, key: Optional[Hashable] = None):
+        """Drops one key, or every entry when `key` is None."""
+        if key is None:
+            self._entries.clear()
+            self._inflight.clear()
+        else:
+            self._entries.pop(key, None)
+            self._inflight.pop(key, None)
+        cache_entries.set(len(self._entries), cache=self.name)
+
+
+def _make_key(args: tuple, kwargs: dict) -> Hashable:
+    return (args, tuple(sorted(kwargs.items()))) if kwargs else args
+
+
+def cached(ttl: float, maxsize: int = 128, tags: Iterable[str] = (), name: Optional[str] = None):
+    """
+    Decorates an async function so results are cached per argument tuple.
+    The wrapper exposes `.cache` (the AsyncTTLCache) and `.invalidate(*args, **kwargs)`.
+    """
+    def decorator(fn):
+        cache = AsyncTTLCache(name or f"{fn.__module__}.{fn.__qualname__}", ttl, maxsize)
+        for tag in tags:
+            _TAGGED.setdefault(tag, []).append(cache)
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            return await cache.get_or_compute(_make_key(args, kwargs), lambda: fn(*args, **kwargs))
+
+        def invalidate_entry(*args, **kwargs):
+            cache.invalidate(_make_key(args, kwargs) if (args or kwargs) else None)
+
+        wrapper.cache = cache
+        wrapper.invalidate = invalidate_entry
+        return wrapper
+
+    return decorator
+
+
+def invalidate(*tags: str):
+    """Clears every cache registered under any of `tags`. Call after writes."""
+    for tag in tags:
+        for cache in _TAGGED.get(tag, []):
+            cache.invalidate()
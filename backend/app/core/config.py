@@ -20,6 +20,51 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 43200  # Default to 30 days
 
+    # Admin dashboard aggregates are cached in-process for this long (seconds)
+    STATS_CACHE_TTL_SECONDS: int = 60
+
+    # Streamed Excel exports stay in memory up to this size, then spill to a temp file
+    REPORT_SPOOL_MAX_BYTES: int = 8 * 1024 * 1024
+
+    # Worker processes for PDF rendering; also the number of PDFs rendered at once
+    PDF_RENDER_WORKERS: int = 2
+
+    # Worker processes hashing passwords for bulk user imports
+    PASSWORD_HASH_WORKERS: int = 2
+
+    # get_current_user caches user documents per process. Writes through the API
+    # invalidate immediately; other workers see a change within the TTL.
+    USER_CACHE_TTL_SECONDS: int = 30
+    USER_CACHE_MAX_ENTRIES: int = 10_000
+
+    # Threads verifying login passwords (pbkdf2 releases the GIL), and how many logins
+    # may wait for one before new ones are turned away with 503
+    PASSWORD_VERIFY_WORKERS: int = 4
+    LOGIN_MAX_PENDING: int = 64
+
+    # Table PDFs stop at this many rows (with a note); the streamed formats have no cap
+    REPORT_PDF_MAX_ROWS: int = 100_000
+
+    # Background report jobs: concurrent jobs per API process, queued-or-running jobs per user,
+    # and where finished files are written (relative paths are under backend/)
+    REPORT_JOB_WORKERS: int = 2
+    REPORT_JOBS_PER_USER: int = 2
+    JOB_RESULTS_DIR: str = "job_results"
+    # Result files and job documents are removed this long after they were written / finished
+    JOB_RESULT_RETENTION_HOURS: int = 24
+
+    # Attendance / marks upload ingestion jobs (files are staged under JOB_RESULTS_DIR)
+    UPLOAD_JOB_WORKERS: int = 2
+    UPLOAD_JOBS_PER_USER: int = 3
+
+    # "documents" (one record per class) or "monthly" (one document per student, subject
+    # and month; see app/core/attendance_store.py)
+    ATTENDANCE_STORAGE: str = "documents"
+
+    # Rendered mentor-summary / transcript files, reused until their data version changes
+    REPORT_CACHE_DIR: str = "report_cache"
+    REPORT_CACHE_MAX_BYTES: int = 512 * 1024 * 1024
+
     model_config = SettingsConfigDict(
         env_file=".env", 
         env_file_encoding="utf-8",
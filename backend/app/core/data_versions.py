@@ -0,0 +1,42 @@
+"""
+Monotonic data version counters, used to key caches of derived files.
+
+Scopes are plain strings:
+    "student:<id>"  attendance, marks, certifications, letters or feedback
+                    for one student changed
+    "assignments"   any mentor assignment changed
+    "users"         any user profile changed
+
+Writers call `bump_data_versions(...)` after committing; readers call
+`get_data_version(...)` *before* reading the data, so a write that lands
+mid-render can only make a cached file look older than it is, never newer.
+"""
+from typing import Iterable
+
+from pymongo import UpdateOne
+
+from app.db import db
+
+
+def student_scope(student_id: str) -> str:
+    return f"student:{student_id}"
+
+
+async def bump_data_versions(scopes: Iterable[str]):
+    """Increments every scope in a single round trip."""
+    scopes = sorted(set(scopes))
+    if not scopes:
+        return
+    await db.data_versions.bulk_write(
+        [UpdateOne({"scope": scope}, {"$inc": {"version": 1}}, upsert=True) for scope in scopes],
+        ordered=False,
+    )
+
+
+async def get_data_version(*scopes: str) -> str:
+    """Combined version string for the given scopes, e.g. "assignments=3;users=12"."""
+    docs = await db.data_versions.find(
+        {"scope": {"$in": list(scopes)}}, {"_id": 0, "scope": 1, "version": 1}
+    ).to_list(len(scopes))
+    versions = {doc["scope"]: doc.get("version", 0) for doc in docs}
+    return ";".join(f"{scope}={versions.get(scope, 0)}" for scope in sorted(scopes))
@@ -0,0 +1,67 @@
+"""
+Timestamps are stored as native BSON dates (UTC). Older documents hold ISO-8601
+strings until `python migrate_datetimes.py` has converted them, so readers go
+through the helpers here, which accept both forms:
+
+    as_datetime(doc.get("created_at"))                  # datetime or None
+    db.users.find(time_range("created_at", since)) # matches dates and strings
+
+BSON orders every string before every date, so sorting on a half-migrated
+field stays chronological: the remaining strings are all older than the new
+native values.
+"""
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from fastapi.encoders import jsonable_encoder
+
+
+def utc_now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def as_datetime(value: Any) -> Optional[datetime]:
+    """A timezone-aware UTC datetime from a BSON date or an ISO string; None if neither."""
+    if isinstance(value, datetime):
+        return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+    if isinstance(value, str) and value:
+        try:
+            parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+        return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+    return None
+
+
+def month_start(moment: datetime, months_back: int = 0) -> datetime:
+    """Midnight UTC on the first day of the month `months_back` months before `moment`'s."""
+    index = moment.year * 12 + moment.month - 1 - months_back
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def time_range(field: str, start: Optional[datetime] = None, end: Optional[datetime] = None) -> dict:
+    """
+    Query for `start <= field < end` that matches both native dates and legacy
+    ISO strings. Each branch is a plain range on `field`, so an index on it is used.
+    """
+    def bounds(convert):
+        clause = {}
+        if start is not None:
+            clause["$gte"] = convert(start)
+        if end is not None:
+            clause["$lt"] = convert(end)
+        return clause
+
+    if start is None and end is None:
+        return {field: {"$exists": True}}
+    # Range operators only match values of the bound's BSON type, so each branch
+    # sees one representation
+    return {"$or": [
+        {field: bounds(as_datetime)},
+        {field: bounds(lambda dt: as_datetime(dt).isoformat())},
+    ]}
+
+
+def to_json(data: Any) -> Any:
+    """Converts datetimes in a document to ISO strings for Socket.IO payloads."""
+    return jsonable_encoder(data)
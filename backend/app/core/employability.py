@@ -1,10 +1,11 @@
 from app.db import db
+from app.core.attendance_store import attendance_reads
 from app.models.portfolio import PlacementPrediction, PeerComparisonStats
 from typing import List
 
 async def calculate_student_analysis(student_id: str) -> PlacementPrediction:
     # 1. Attendance (15%)
-    att_records = await db.attendance.find({"student_id": student_id}).to_list(1000)
+    att_records = await attendance_reads(db).find({"student_id": student_id}).to_list(1000)
     total_classes = len(att_records)
     present_classes = sum(1 for r in att_records if r["status"] == "present")
     att_pct = (present_classes / total_classes * 100) if total_classes > 0 else 0
@@ -191,12 +192,12 @@ async def calculate_student_analysis(student_id: str) -> PlacementPrediction:
 async def calculate_peer_stats(student_id: str) -> List[PeerComparisonStats]:
     # --- 1. Attendance Stats ---
     # Student
-    s_att = await db.attendance.find({"student_id": student_id, "status": "present"}).to_list(1000)
-    s_total = await db.attendance.count_documents({"student_id": student_id})
+    s_att = await attendance_reads(db).find({"student_id": student_id, "status": "present"}).to_list(1000)
+    s_total = await attendance_reads(db).count_documents({"student_id": student_id})
     student_att_pct = (len(s_att) / s_total * 100) if s_total > 0 else 0
     
     # Class
-    all_att = await db.attendance.find({}).to_list(10000)
+    all_att = await attendance_reads(db).find({}).to_list(10000)
     student_attendance_map = {}
     for r in all_att:
         sid = r["student_id"]
@@ -0,0 +1,124 @@
+"""
+Bounded worker pools for CPU-bound work that must stay off the event loop.
+
+    pdf_executor = BoundedExecutor("pdf", kind="process", max_workers=2)
+    pdf_bytes = await pdf_executor.run(render_table_pdf, title, columns, rows, style)
+
+At most `max_workers` tasks are submitted to the pool at once; the rest wait
+on a semaphore and are reported as queue depth. Pools are created on first
+use and closed by `shutdown_executors()` on application shutdown.
+"""
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, List, Optional
+
+from app.core.config import settings
+from app.core.metrics import REGISTRY
+
+executor_queue_depth = REGISTRY.gauge(
+    "executor_queue_depth", "Tasks waiting for a free worker, by executor.", ("executor",)
+)
+executor_active = REGISTRY.gauge(
+    "executor_active_tasks", "Tasks currently running in a worker, by executor.", ("executor",)
+)
+executor_task_duration = REGISTRY.histogram(
+    "executor_task_duration_seconds", "Worker task run time, by executor.", ("executor",)
+)
+executor_wait_duration = REGISTRY.histogram(
+    "executor_wait_duration_seconds", "Time tasks spent queued before a worker picked them up.", ("executor",)
+)
+
+_EXECUTORS: List["BoundedExecutor"] = []
+
+
+class BoundedExecutor:
+    """A thread or process pool behind an asyncio semaphore."""
+
+    def __init__(self, name: str, kind: str = "thread", max_workers: int = 2):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown executor kind: {kind}")
+        self.name = name
+        self.kind = kind
+        self.max_workers = max(1, max_workers)
+        self._pool: Optional[Executor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop = None
+        self._waiting = 0
+        _EXECUTORS.append(self)
+
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            if self.kind == "process":
+                # spawn, not fork: the API process holds Motor threads and sockets
+                # that must not be copied into workers
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            else:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=self.name)
+        return self._pool
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # One semaphore per event loop; asyncio primitives cannot be shared across loops
+        loop = asyncio.get_running_loop()
+        if self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_workers)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    @property
+    def queue_depth(self) -> int:
+        return self._waiting
+
+    async def run(self, fn: Callable[..., Any], *args) -> Any:
+        """Runs fn(*args) in the pool; process pools need picklable, module-level fn and args."""
+        semaphore = self._get_semaphore()
+        queued_at = time.perf_counter()
+        self._waiting += 1
+        executor_queue_depth.set(self._waiting, executor=self.name)
+        try:
+            await semaphore.acquire()
+        finally:
+            self._waiting -= 1
+            executor_queue_depth.set(self._waiting, executor=self.name)
+
+        executor_wait_duration.observe(time.perf_counter() - queued_at, executor=self.name)
+        executor_active.inc(executor=self.name)
+        started = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_pool(), fn, *args)
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM-killed); start a fresh pool for the next task
+            self._discard_pool()
+            raise
+        finally:
+            executor_task_duration.observe(time.perf_counter() - started, executor=self.name)
+            executor_active.dec(executor=self.name)
+            semaphore.release()
+
+    def _discard_pool(self):
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self, wait: bool = True):
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait, cancel_futures=True)
+
+
+def shutdown_executors(wait: bool = True):
+    for executor in _EXECUTORS:
+        executor.shutdown(wait=wait)
+
+
+pdf_executor = BoundedExecutor("pdf", kind="process", max_workers=settings.PDF_RENDER_WORKERS)
+password_hash_executor = BoundedExecutor("password_hash", kind="process", max_workers=settings.PASSWORD_HASH_WORKERS)
+# Threads, not processes: hashlib.pbkdf2_hmac releases the GIL, and login needs no pickling round-trip
+password_verify_executor = BoundedExecutor(
+    "password_verify", kind="thread", max_workers=settings.PASSWORD_VERIFY_WORKERS
+)
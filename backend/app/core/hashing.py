@@ -0,0 +1,48 @@
+"""
+Password hashing and verification off the event loop.
+
+    hashes = await hash_passwords(["pw1", "pw2", ...])     # bulk imports
+    ok = await verify_password_async(password, stored_hash)  # login
+
+pbkdf2_sha256 is deliberately slow (tens of milliseconds per hash), so
+thousands of hashes on the event loop stall every other request. Passwords
+are hashed in chunks of HASH_CHUNK_SIZE on `password_hash_executor`, which
+amortizes the pickling round-trip and keeps the number of busy processes at
+PASSWORD_HASH_WORKERS. Like pdf_render, this module must not import app.db:
+spawned workers import it to find `hash_batch`.
+
+Login verification runs on `password_verify_executor` threads instead, at
+most PASSWORD_VERIFY_WORKERS at a time; callers can check `login_backlog()`
+to turn requests away before the queue grows without bound.
+"""
+import asyncio
+from typing import List
+
+from passlib.context import CryptContext
+
+from app.core.executors import password_hash_executor, password_verify_executor
+
+# Shared with app.core.auth, so imported users verify like any other
+pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
+
+HASH_CHUNK_SIZE = 50
+
+
+def hash_batch(passwords: List[str]) -> List[str]:
+    return [pwd_context.hash(password) for password in passwords]
+
+
+async def hash_passwords(passwords: List[str]) -> List[str]:
+    """Hashes passwords in worker processes; results are in input order."""
+    chunks = [passwords[i:i + HASH_CHUNK_SIZE] for i in range(0, len(passwords), HASH_CHUNK_SIZE)]
+    hashed = await asyncio.gather(*(password_hash_executor.run(hash_batch, chunk) for chunk in chunks))
+    return [h for chunk in hashed for h in chunk]
+
+
+async def verify_password_async(password: str, password_hash: str) -> bool:
+    return await password_verify_executor.run(pwd_context.verify, password, password_hash)
+
+
+def login_backlog() -> int:
+    """Password verifications waiting for a free thread."""
+    return password_verify_executor.queue_depth
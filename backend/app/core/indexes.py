@@ -0,0 +1,66 @@
+"""
+Indexes the application relies on, created at startup.
+
+    await ensure_indexes()
+
+create_index is a no-op when an identical index already exists, so this is
+safe to run on every boot. A unique index cannot be built over existing
+duplicates; in that case the error is logged and the app keeps running
+(upserts still work, just without the guarantee) until
+`python dedupe_academic_records.py` has been run.
+"""
+import logging
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+from app.db import db
+from app.core.attendance_store import MONTHLY_COLLECTION, MONTH_KEY
+from app.core.ingest import NATURAL_KEYS
+from app.core.jobs import result_retention_seconds
+
+logger = logging.getLogger(__name__)
+
+
+def _natural_key_index(collection: str) -> IndexModel:
+    key = NATURAL_KEYS[collection]
+    return IndexModel([(field, ASCENDING) for field in key], unique=True, name=f"{collection}_natural_key")
+
+
+INDEXES = {
+    "attendance": [
+        _natural_key_index("attendance"),
+        # A student's records by date range, in the order the API pages them
+        IndexModel(
+            [("student_id", ASCENDING), ("date", DESCENDING), ("subject", ASCENDING)],
+            name="attendance_student_date",
+        ),
+    ],
+    "marks": [
+        _natural_key_index("marks"),
+        IndexModel(
+            [("student_id", ASCENDING), ("semester", ASCENDING), ("subject", ASCENDING), ("marks_type", ASCENDING)],
+            name="marks_student_semester_subject",
+        ),
+    ],
+    # Monthly attendance storage (app.core.attendance_store); empty unless that mode is on
+    MONTHLY_COLLECTION: [IndexModel([(f, ASCENDING) for f in MONTH_KEY], unique=True, name="attendance_monthly_key")],
+    # Status polls and progress updates filter on id; finished jobs expire with their result files
+    "jobs": [
+        IndexModel([("id", ASCENDING)], unique=True, name="jobs_id"),
+        IndexModel([("finished_at", ASCENDING)], expireAfterSeconds=result_retention_seconds(), name="jobs_finished_ttl"),
+    ],
+    # Time-range reads (user growth, notification feeds) on native dates
+    "users": [IndexModel([("created_at", ASCENDING)], name="users_created_at")],
+    "notifications": [
+        IndexModel([("user_id", ASCENDING), ("created_at", DESCENDING)], name="notifications_user_created_at"),
+    ],
+}
+
+
+async def ensure_indexes():
+    for collection, indexes in INDEXES.items():
+        try:
+            await db[collection].create_indexes(indexes)
+        except OperationFailure as exc:
+            logger.error("Could not create indexes on %s: %s", collection, exc)
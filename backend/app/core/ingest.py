@@ -0,0 +1,445 @@
+"""
+Bulk ingestion of attendance and marks uploads (CSV / Excel).
+
+    result = IngestResult()
+    await ingest_upload("marks", upload.file, upload.filename, recorded_by=user_id, result=result)
+
+Files are read in chunks of INGEST_CHUNK_ROWS rows (pandas `read_csv(chunksize=)`
+for CSV, openpyxl read-only row iteration for Excel), and each chunk is
+validated, resolved and written before the next one is parsed, so peak memory
+does not depend on the file size.
+
+Within a chunk, columns are validated and coerced in pandas, every distinct
+USN is resolved with one `$in` query, and the surviving rows are upserted on
+their natural key (NATURAL_KEYS) with unordered `bulk_write` batches, so
+uploading the same sheet again updates records instead of duplicating them.
+Rows that fail are reported back as
+{"row", "reason"} using spreadsheet row numbers (header = row 1).
+pandas and openpyxl are imported only when an upload is processed.
+
+Uploads from the API are staged to disk (`stage_upload`) and ingested by
+`run_upload_job` on the `upload_jobs` JobManager, which reports rows
+processed / rejected and an ETA on the job document and as Socket.IO
+`upload_progress` events to the uploader.
+"""
+import asyncio
+import logging
+import shutil
+import time
+import uuid
+from pathlib import Path
+from typing import Awaitable, BinaryIO, Callable, Dict, Iterator, List, Optional, Set
+
+from pymongo import UpdateOne
+
+from app.db import db
+from app.core.attendance_store import MONTHLY_COLLECTION, monthly_attendance, upsert_months
+from app.core.audit import log_action
+from app.core.cache import invalidate as invalidate_cache
+from app.core.data_versions import bump_data_versions, student_scope
+from app.core.dates import utc_now
+from app.core.jobs import results_dir
+from app.core.notifications import check_academic_risk_bulk
+from app.sio_instance import sio, connected_users
+
+logger = logging.getLogger(__name__)
+
+INGEST_CHUNK_ROWS = 20_000
+WRITE_BATCH_SIZE = 1000
+# Rejections echoed back to the client; the total is always reported
+MAX_REPORTED_REJECTIONS = 500
+
+ATTENDANCE_COLUMNS = ["student_usn", "subject", "date", "status"]
+ATTENDANCE_STATUSES = {"present", "absent", "leave"}
+MARKS_COLUMNS = ["student_usn", "subject", "semester", "marks_type", "marks_obtained", "max_marks"]
+
+# One record per key; backed by unique indexes (app.core.indexes)
+NATURAL_KEYS = {
+    "attendance": ("student_id", "subject", "date"),
+    "marks": ("student_id", "subject", "semester", "marks_type"),
+}
+
+
+class IngestError(ValueError):
+    """The upload as a whole cannot be ingested (e.g. a required column is missing)."""
+
+
+class IngestResult:
+    """Running totals for one upload, accumulated across frames."""
+
+    def __init__(self):
+        self.inserted = 0
+        self.updated = 0
+        self.rejected = 0
+        self.rejections: List[dict] = []
+        self.student_ids: Set[str] = set()
+
+    def reject(self, rows: List[int], reasons: List[str]):
+        self.rejected += len(rows)
+        room = MAX_REPORTED_REJECTIONS - len(self.rejections)
+        if room > 0:
+            self.rejections.extend(
+                {"row": row, "reason": reason} for row, reason in zip(rows[:room], reasons[:room])
+            )
+
+    @property
+    def written(self) -> int:
+        return self.inserted + self.updated
+
+    def summary(self) -> dict:
+        return {
+            "inserted": self.inserted,
+            "updated": self.updated,
+            "rejected": self.rejected,
+            "rejections": self.rejections,
+            "rejections_truncated": self.rejected > len(self.rejections),
+        }
+
+
+def _require_columns(df, columns: List[str]):
+    missing = [c for c in columns if c not in df.columns]
+    if missing:
+        raise IngestError(f"Missing required column(s): {', '.join(missing)}")
+
+
+def _text(series):
+    """Strips a column to text; blanks and NaN become <NA>."""
+    text = series.astype("string").str.strip()
+    return text.mask(text == "")
+
+
+def _first_failure(df, checks):
+    """Series of the first failing check's message per row (<NA> where all pass)."""
+    import pandas as pd
+
+    reason = pd.Series(pd.NA, index=df.index, dtype="string")
+    for mask, message in checks:
+        reason = reason.mask(reason.isna() & mask.fillna(True).astype(bool), message)
+    return reason
+
+
+def _numbers(series):
+    """Coerces a column to float; unparseable cells become NaN."""
+    import pandas as pd
+
+    return pd.to_numeric(series.astype("string").str.strip(), errors="coerce")
+
+
+def _dates(series):
+    """Parses a date column to "YYYY-MM-DD" text; unparseable cells become <NA>."""
+    import pandas as pd
+
+    # Fast vectorized ISO parse first; only the leftovers go through the slow per-cell parser
+    parsed = pd.to_datetime(series, errors="coerce", format="ISO8601")
+    leftover = parsed.isna() & series.notna()
+    if leftover.any():
+        parsed[leftover] = pd.to_datetime(series[leftover], errors="coerce", format="mixed")
+    return parsed.dt.strftime("%Y-%m-%d").astype("string")
+
+
+async def resolve_usns(usns) -> Dict[str, str]:
+    """USN -> student id for every distinct USN, in one query."""
+    distinct = sorted({u for u in usns if u})
+    if not distinct:
+        return {}
+    students = await db.users.find(
+        {"usn": {"$in": distinct}, "role": "student"}, {"_id": 0, "id": 1, "usn": 1}
+    ).to_list(None)
+    return {s["usn"]: s["id"] for s in students}
+
+
+def natural_key_upsert(record: dict, key: tuple) -> tuple:
+    """(filter, update) upserting on the natural key; an existing record keeps its id and created_at."""
+    fields = {k: v for k, v in record.items() if k not in key and k not in ("id", "created_at")}
+    return (
+        {k: record[k] for k in key},
+        {"$set": fields, "$setOnInsert": {"id": record["id"], "created_at": record["created_at"]}},
+    )
+
+
+async def upsert_in_batches(collection, records: List[dict], key: tuple) -> tuple:
+    """Unordered bulk_write upserts in WRITE_BATCH_SIZE slices; returns (inserted, updated)."""
+    inserted = updated = 0
+    for start in range(0, len(records), WRITE_BATCH_SIZE):
+        ops = [UpdateOne(*natural_key_upsert(r, key), upsert=True) for r in records[start:start + WRITE_BATCH_SIZE]]
+        result = await collection.bulk_write(ops, ordered=False)
+        inserted += result.upserted_count
+        updated += result.matched_count
+    return inserted, updated
+
+
+async def write_records(database, kind: str, records: List[dict]) -> tuple:
+    """Upserts attendance or marks records in the configured storage; returns (inserted, updated)."""
+    if kind == "attendance" and monthly_attendance():
+        return await upsert_months(database[MONTHLY_COLLECTION], records)
+    return await upsert_in_batches(database[kind], records, NATURAL_KEYS[kind])
+
+
+async def _finish_frame(df, reason, kind: str, fields: List[str], recorded_by: str, result: IngestResult):
+    """Resolves USNs for the rows that passed validation, rejects unknown ones and upserts the rest."""
+    students = await resolve_usns(df.loc[reason.isna(), "student_usn"].unique())
+    student_id = df["student_usn"].map(students)
+    reason = reason.mask(reason.isna() & student_id.isna(), "unknown student USN")
+
+    bad = reason.notna()
+    if bad.any():
+        # +2: one for the header row, one because spreadsheet rows start at 1
+        result.reject([int(i) + 2 for i in df.index[bad]], reason[bad].tolist())
+
+    good = df.loc[~bad, fields].copy()
+    if good.empty:
+        return
+    good.insert(0, "student_id", student_id[~bad])
+    key = NATURAL_KEYS[kind]
+    # A key repeated within the sheet: the last row wins, as it would on re-upload
+    good = good.drop_duplicates(subset=list(key), keep="last")
+    good.insert(0, "id", [str(uuid.uuid4()) for _ in range(len(good))])
+    good["recorded_by"] = recorded_by
+
+    records = good.astype(object).where(good.notna(), None).to_dict("records")
+    created_at = utc_now()
+    for record in records:
+        record["created_at"] = created_at
+    # Recorded before writing: a write that fails part-way may still have changed these students
+    result.student_ids.update(good["student_id"].unique())
+    inserted, updated = await write_records(db, kind, records)
+    result.inserted += inserted
+    result.updated += updated
+
+
+async def ingest_attendance_frame(df, recorded_by: str, result: IngestResult):
+    """Validates, resolves and inserts one frame of attendance rows into `result`."""
+    import pandas as pd
+
+    _require_columns(df, ATTENDANCE_COLUMNS)
+    df = pd.DataFrame({
+        "student_usn": _text(df["student_usn"]),
+        "subject": _text(df["subject"]),
+        "status": _text(df["status"]).str.lower(),
+        "date": _dates(df["date"]),
+    }, index=df.index)
+
+    reason = _first_failure(df, [
+        (df["student_usn"].isna(), "missing student_usn"),
+        (df["subject"].isna(), "missing subject"),
+        (df["date"].isna(), "invalid date"),
+        (~df["status"].isin(ATTENDANCE_STATUSES), "status must be present, absent or leave"),
+    ])
+    await _finish_frame(df, reason, "attendance", ["subject", "date", "status"], recorded_by, result)
+
+
+async def ingest_marks_frame(df, recorded_by: str, result: IngestResult):
+    """Validates, resolves and inserts one frame of marks rows into `result`."""
+    import pandas as pd
+
+    _require_columns(df, MARKS_COLUMNS)
+    semester = _numbers(df["semester"])
+    df = pd.DataFrame({
+        "student_usn": _text(df["student_usn"]),
+        "subject": _text(df["subject"]),
+        "semester": semester,
+        "marks_type": _text(df["marks_type"]),
+        "marks_obtained": _numbers(df["marks_obtained"]),
+        "max_marks": _numbers(df["max_marks"]),
+    }, index=df.index)
+
+    reason = _first_failure(df, [
+        (df["student_usn"].isna(), "missing student_usn"),
+        (df["subject"].isna(), "missing subject"),
+        (df["marks_type"].isna(), "missing marks_type"),
+        (~(semester.notna() & (semester % 1 == 0) & (semester >= 1)), "semester must be a positive whole number"),
+        (~(df["max_marks"] > 0), "max_marks must be a positive number"),
+        (~((df["marks_obtained"] >= 0) & (df["marks_obtained"] <= df["max_marks"])),
+         "marks_obtained must be between 0 and max_marks"),
+    ])
+    # Nullable ints so rejected rows (NaN semester) do not block the cast
+    df["semester"] = semester.round().astype("Int64")
+    await _finish_frame(
+        df, reason, "marks",
+        ["subject", "semester", "marks_type", "marks_obtained", "max_marks"], recorded_by, result,
+    )
+
+
+INGESTERS = {
+    "attendance": ingest_attendance_frame,
+    "marks": ingest_marks_frame,
+}
+
+
+def _excel_frames(fileobj: BinaryIO, chunk_rows: int) -> Iterator:
+    """Yields (DataFrame, fraction read) chunks from the first sheet, via openpyxl read-only mode."""
+    import pandas as pd
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(fileobj, read_only=True, data_only=True)
+    try:
+        sheet = workbook.worksheets[0]
+        # From the sheet's dimension record; absent in some generated files
+        total = (sheet.max_row or 0) - 1
+        rows = sheet.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = ["" if h is None else str(h).strip() for h in header]
+        buffer = []
+        # Offset of each row below the header, so rejections name the worksheet row
+        # even when blank rows were skipped
+        offsets = []
+
+        def frame():
+            return pd.DataFrame(buffer, columns=columns, dtype=object, index=pd.Index(offsets))
+
+        for seen, row in enumerate(rows, start=1):
+            if not any(v is not None and v != "" for v in row):
+                continue
+            buffer.append(row[:len(columns)])
+            offsets.append(seen - 1)
+            if len(buffer) >= chunk_rows:
+                yield frame(), (min(seen / total, 1.0) if total > 0 else None)
+                buffer = []
+                offsets = []
+        if buffer:
+            yield frame(), 1.0
+    finally:
+        workbook.close()
+
+
+def iter_upload_frames(fileobj: BinaryIO, filename: str, chunk_rows: int = INGEST_CHUNK_ROWS) -> Iterator:
+    """
+    Yields the upload as (DataFrame, fraction read) pairs of at most chunk_rows
+    rows, with row indexes continuing across chunks. The fraction is an
+    estimate for progress reporting and may be None.
+    """
+    import pandas as pd
+
+    if filename.lower().endswith(".csv"):
+        size = fileobj.seek(0, 2)
+        fileobj.seek(0)
+        # Every cell as text; columns are validated and coerced per chunk
+        with pd.read_csv(fileobj, dtype=str, chunksize=chunk_rows) as reader:
+            for df in reader:
+                yield df, (min(fileobj.tell() / size, 1.0) if size else None)
+    else:
+        fileobj.seek(0)
+        yield from _excel_frames(fileobj, chunk_rows)
+
+
+def _next_frame(frames: Iterator):
+    """next() that turns unreadable files into IngestError; None when exhausted."""
+    import zipfile
+    from openpyxl.utils.exceptions import InvalidFileException
+
+    try:
+        return next(frames, None)
+    except (ValueError, UnicodeDecodeError, zipfile.BadZipFile, InvalidFileException) as exc:
+        raise IngestError(f"Could not read upload: {exc}") from exc
+
+
+async def ingest_upload(kind: str, fileobj: BinaryIO, filename: str, recorded_by: str,
+                        result: IngestResult, chunk_rows: Optional[int] = None,
+                        on_chunk: Optional[Callable[[Optional[float]], Awaitable]] = None):
+    """
+    Ingests an uploaded file chunk by chunk. Parsing runs in a worker thread;
+    each chunk is fully written before the next one is read. `on_chunk` is
+    awaited after each chunk with the estimated fraction of the file read.
+    """
+    ingest_frame = INGESTERS[kind]
+    frames = iter_upload_frames(fileobj, filename, chunk_rows or INGEST_CHUNK_ROWS)
+    try:
+        while True:
+            chunk = await asyncio.to_thread(_next_frame, frames)
+            if chunk is None:
+                break
+            df, fraction = chunk
+            await ingest_frame(df, recorded_by, result)
+            if on_chunk:
+                await on_chunk(fraction)
+    finally:
+        frames.close()
+
+
+# ---- Background upload jobs ----
+
+async def stage_upload(fileobj: BinaryIO, filename: str) -> Path:
+    """Copies an upload to the job results directory so a job can ingest it after the request ends."""
+    path = results_dir() / f"upload-{uuid.uuid4()}{Path(filename).suffix.lower()}"
+
+    def copy():
+        fileobj.seek(0)
+        with open(path, "wb") as out:
+            shutil.copyfileobj(fileobj, out, 1024 * 1024)
+
+    await asyncio.to_thread(copy)
+    return path
+
+
+async def _emit_upload_progress(owner_id: str, payload: dict):
+    sid = connected_users.get(owner_id)
+    if sid:
+        await sio.emit("upload_progress", payload, room=sid)
+
+
+async def _after_upload(kind: str, result: IngestResult):
+    """Cache invalidation, version bumps and risk checks for the students the upload touched."""
+    if not result.student_ids:
+        return
+    if kind == "marks":
+        invalidate_cache("marks")
+    await bump_data_versions(student_scope(sid) for sid in result.student_ids)
+    await check_academic_risk_bulk([str(sid) for sid in result.student_ids])
+
+
+async def run_upload_job(job) -> dict:
+    """JobManager handler: ingests a staged upload, then runs the post-write hooks."""
+    kind = job.params["kind"]
+    path = Path(job.params["path"])
+    result = IngestResult()
+    started = time.monotonic()
+
+    def counters(fraction: Optional[float]) -> dict:
+        eta = None
+        if fraction and fraction < 1:
+            elapsed = time.monotonic() - started
+            eta = round(elapsed * (1 - fraction) / fraction, 1)
+        return {
+            "rows_processed": result.written + result.rejected,
+            "rows_rejected": result.rejected,
+            "eta_seconds": eta,
+        }
+
+    async def on_chunk(fraction: Optional[float]):
+        fields = counters(fraction)
+        # Held below 1.0 until the post-write hooks have also finished
+        progress = min(fraction or 0.0, 0.99)
+        if await job.set_progress(progress, **fields):
+            await _emit_upload_progress(job.owner_id, {
+                "job_id": job.id, "kind": kind, "status": "running", "progress": progress, **fields,
+            })
+
+    hooks_ran = False
+    try:
+        with open(path, "rb") as fileobj:
+            await ingest_upload(kind, fileobj, job.params["filename"], job.owner_id, result, on_chunk=on_chunk)
+        hooks_ran = True
+        await _after_upload(kind, result)
+        await log_action(job.owner_id, "UPLOAD", kind, {"count": result.written, "rejected": result.rejected})
+    except Exception as exc:
+        if not hooks_ran:
+            # Chunks written before the failure stay committed; their caches and risk checks still need updating
+            try:
+                await _after_upload(kind, result)
+            except Exception:
+                logger.exception("Post-upload hooks failed for job %s", job.id)
+        await _emit_upload_progress(job.owner_id, {
+            "job_id": job.id, "kind": kind, "status": "failed", "error": str(exc) or exc.__class__.__name__,
+        })
+        raise
+    finally:
+        path.unlink(missing_ok=True)
+
+    summary = {"message": f"Uploaded {result.written} {kind} records", **result.summary()}
+    fields = counters(1.0)
+    await _emit_upload_progress(job.owner_id, {
+        "job_id": job.id, "kind": kind, "status": "completed", "progress": 1.0, **fields, "result": summary,
+    })
+    return {**fields, "result": summary}
@@ -0,0 +1,261 @@
+"""
+Background jobs for work that should not hold an HTTP request open.
+
+    job = await report_jobs.submit("report", current_user["id"], params, run_report_job)
+    # ... later
+    job = await report_jobs.get(job["id"])
+
+Job state lives in the `jobs` collection so any API worker can answer status
+polls. Execution is in-process: each JobManager runs at most `max_concurrent`
+jobs at once and `per_user_limit` queued-or-running jobs per user, and
+rejects extra submissions with 429. Handlers write their output under
+JOB_RESULTS_DIR and return {"result_path", "filename", "media_type"}.
+
+Nothing there is kept forever: `sweep_job_results()` (run at startup and
+every SWEEP_INTERVAL by `sweep_job_results_periodically`) deletes entries
+older than JOB_RESULT_RETENTION_HOURS, and a TTL index on `finished_at`
+(app.core.indexes) expires the job documents on the same schedule. Jobs left
+queued or running by a previous process are marked failed at startup by
+`fail_orphaned_jobs()`, so they expire too and clients stop polling them.
+"""
+import asyncio
+import logging
+import shutil
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from fastapi import HTTPException
+
+from app.db import db
+from app.core.config import settings
+from app.core.metrics import REGISTRY
+from app.models.jobs import Job
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+jobs_total = REGISTRY.counter("jobs_total", "Finished background jobs, by manager and status.", ("jobs", "status"))
+jobs_running = REGISTRY.gauge("jobs_running", "Background jobs currently executing, by manager.", ("jobs",))
+jobs_queued = REGISTRY.gauge("jobs_queued", "Background jobs waiting for a free slot, by manager.", ("jobs",))
+
+# Progress is written to Mongo at most this often per job
+PROGRESS_WRITE_INTERVAL = 1.0
+SWEEP_INTERVAL = 3600
+# Jobs created before this are not ours: only a previous process could have been running them
+PROCESS_STARTED = datetime.now(timezone.utc)
+
+
+def results_dir() -> Path:
+    path = Path(settings.JOB_RESULTS_DIR)
+    if not path.is_absolute():
+        path = BACKEND_DIR / path
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def result_retention_seconds() -> int:
+    return settings.JOB_RESULT_RETENTION_HOURS * 3600
+
+
+def sweep_job_results(max_age: Optional[float] = None) -> int:
+    """Deletes files and directories in JOB_RESULTS_DIR older than max_age seconds; returns how many."""
+    max_age = result_retention_seconds() if max_age is None else max_age
+    cutoff = time.time() - max_age
+    removed = 0
+    for entry in results_dir().iterdir():
+        try:
+            if entry.stat().st_mtime >= cutoff:
+                continue
+            if entry.is_dir():
+                shutil.rmtree(entry)
+            else:
+                entry.unlink()
+            removed += 1
+        except FileNotFoundError:
+            continue
+    return removed
+
+
+async def sweep_job_results_periodically(interval: float = SWEEP_INTERVAL):
+    """Background task: sweeps once at startup, then every `interval` seconds."""
+    while True:
+        try:
+            removed = await asyncio.to_thread(sweep_job_results)
+            if removed:
+                logger.info("Removed %d expired job result(s)", removed)
+        except OSError:
+            logger.exception("Job result sweep failed")
+        await asyncio.sleep(interval)
+
+
+class JobContext:
+    """Handed to job handlers: the job's parameters plus progress reporting."""
+
+    def __init__(self, job: dict):
+        self.job = job
+        self.id = job["id"]
+        self.owner_id = job["owner_id"]
+        self.params = job["params"]
+        self._last_write = 0.0
+
+    def output_path(self, extension: str) -> Path:
+        return results_dir() / f"{self.id}.{extension}"
+
+    async def set_progress(self, fraction: float, force: bool = False, **fields) -> bool:
+        """Records progress (plus any extra status fields); returns False when throttled."""
+        now = time.monotonic()
+        if not force and now - self._last_write < PROGRESS_WRITE_INTERVAL:
+            return False
+        self._last_write = now
+        await db.jobs.update_one(
+            {"id": self.id}, {"$set": {"progress": round(min(max(fraction, 0.0), 1.0), 4), **fields}}
+        )
+        return True
+
+
+Handler = Callable[[JobContext], Awaitable[Dict[str, Any]]]
+
+
+class JobManager:
+    """Runs jobs of one kind on a bounded set of in-process slots."""
+
+    def __init__(self, name: str, max_concurrent: int, per_user_limit: int):
+        self.name = name
+        self.max_concurrent = max(1, max_concurrent)
+        self.per_user_limit = per_user_limit
+        self._active_by_user = Counter()
+        self._tasks = set()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop = None
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    def active_jobs(self, owner_id: str) -> int:
+        return self._active_by_user[owner_id]
+
+    def reserve(self, owner_id: str):
+        """
+        Takes one of the user's job slots, or raises 429. Synchronous, so
+        concurrent submits cannot all pass. Callers that reserve before
+        preparing a job pass reserved=True to submit(), or release() on failure.
+        """
+        if self._active_by_user[owner_id] >= self.per_user_limit:
+            raise HTTPException(
+                status_code=429,
+                detail=f"You already have {self.per_user_limit} jobs in progress. Try again when one finishes.",
+            )
+        self._active_by_user[owner_id] += 1
+
+    def release(self, owner_id: str):
+        self._active_by_user[owner_id] -= 1
+        if self._active_by_user[owner_id] <= 0:
+            del self._active_by_user[owner_id]
+
+    async def submit(self, job_type: str, owner_id: str, params: dict, handler: Handler, reserved: bool = False) -> dict:
+        """
+        Records a queued job and schedules it. Raises 429 when the user is at
+        their limit, unless the slot was already taken with reserve().
+
+        A `path` param names an input file staged for the job; it is deleted
+        when the job ends, however it ends.
+        """
+        if not reserved:
+            self.reserve(owner_id)
+        try:
+            job = Job(type=job_type, owner_id=owner_id, params=params).model_dump()
+            await db.jobs.insert_one(job.copy())
+            task = asyncio.create_task(self._run(job, handler))
+        except BaseException:
+            self.release(owner_id)
+            raise
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    async def _run(self, job: dict, handler: Handler):
+        context = JobContext(job)
+        semaphore = self._get_semaphore()
+        try:
+            jobs_queued.inc(jobs=self.name)
+            try:
+                await semaphore.acquire()
+            except asyncio.CancelledError:
+                await self._finish(context.id, "failed", {"error": "Interrupted by server shutdown"})
+                raise
+            finally:
+                jobs_queued.dec(jobs=self.name)
+
+            jobs_running.inc(jobs=self.name)
+            try:
+                await db.jobs.update_one(
+                    {"id": context.id},
+                    {"$set": {"status": "running", "started_at": datetime.now(timezone.utc)}}
+                )
+                result = await handler(context)
+            except asyncio.CancelledError:
+                await self._finish(context.id, "failed", {"error": "Interrupted by server shutdown"})
+                raise
+            except Exception as exc:
+                logger.exception("Job %s (%s) failed", context.id, job["type"])
+                await self._finish(context.id, "failed", {"error": str(exc) or exc.__class__.__name__})
+            else:
+                await self._finish(context.id, "completed", {"progress": 1.0, **result})
+            finally:
+                jobs_running.dec(jobs=self.name)
+                semaphore.release()
+        finally:
+            self.release(job["owner_id"])
+            if job["params"].get("path"):
+                Path(job["params"]["path"]).unlink(missing_ok=True)
+
+    async def _finish(self, job_id: str, status: str, fields: dict):
+        jobs_total.inc(jobs=self.name, status=status)
+        await db.jobs.update_one(
+            {"id": job_id},
+            {"$set": {"status": status, "finished_at": datetime.now(timezone.utc), **fields}}
+        )
+
+    async def get(self, job_id: str) -> Optional[dict]:
+        return await db.jobs.find_one({"id": job_id}, {"_id": 0})
+
+    async def shutdown(self):
+        """Cancels running jobs; they are marked failed so clients stop polling."""
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+report_jobs = JobManager("reports", settings.REPORT_JOB_WORKERS, settings.REPORT_JOBS_PER_USER)
+upload_jobs = JobManager("uploads", settings.UPLOAD_JOB_WORKERS, settings.UPLOAD_JOBS_PER_USER)
+
+_MANAGERS = [report_jobs, upload_jobs]
+
+
+async def shutdown_job_managers():
+    for manager in _MANAGERS:
+        await manager.shutdown()
+
+
+async def fail_orphaned_jobs() -> int:
+    """Marks jobs that a previous process left queued or running as failed; returns how many."""
+    result = await db.jobs.update_many(
+        {"status": {"$in": ["queued", "running"]}, "created_at": {"$lt": PROCESS_STARTED}},
+        {"$set": {
+            "status": "failed",
+            "error": "Interrupted by server restart",
+            "finished_at": datetime.now(timezone.utc),
+        }},
+    )
+    if result.modified_count:
+        logger.warning("Marked %d interrupted job(s) as failed", result.modified_count)
+    return result.modified_count
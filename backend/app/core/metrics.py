@@ -0,0 +1,348 @@
+"""
+In-process metrics registry rendered in the Prometheus text exposition format.
+
+Keeps a small set of Counter / Gauge / Histogram primitives so that the API,
+MongoDB driver and Socket.IO server can record measurements without an extra
+dependency. Scraped via GET /api/system/metrics.
+"""
+import asyncio
+import logging
+import math
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from pymongo import monitoring
+
+logger = logging.getLogger(__name__)
+
+# Latency buckets (seconds) shared by request and DB histograms
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+PROCESS_START_TIME = time.time()
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labelnames: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(val)}"' for name, val in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """Monotonically increasing value."""
+    type_name = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}" for k, v in items]
+
+
+class Gauge(_Metric):
+    """Value that can go up and down, or be computed at scrape time."""
+    type_name = "gauge"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._function: Optional[Callable[[], float]] = None
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set_function(self, fn: Callable[[], float]):
+        """Computes the (unlabelled) value lazily on every scrape."""
+        self._function = fn
+
+    def value(self, **labels) -> float:
+        if self._function is not None:
+            return self._function()
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self):
+        if self._function is not None:
+            return [f"{self.name} {_format_value(self._function())}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}" for k, v in items]
+
+
+class Histogram(_Metric):
+    """Cumulative bucketed distribution of observed values."""
+    type_name = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # key -> ([per-bucket counts], sum, count)
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = [[0] * len(self.buckets), 0.0, 0]
+                self._values[key] = state
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    def count(self, **labels) -> int:
+        state = self._values.get(self._key(labels))
+        return state[2] if state else 0
+
+    def samples(self):
+        lines = []
+        with self._lock:
+            items = sorted((k, ([*v[0]], v[1], v[2])) for k, v in self._values.items())
+        for key, (buckets, total, count) in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets, buckets):
+                cumulative += n
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Registry:
+    """Holds every metric and renders them for a scrape."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        return "\n".join(m.render() for m in self._metrics.values()) + "\n"
+
+
+REGISTRY = Registry()
+
+CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+
+# --- Process ---
+process_uptime = REGISTRY.gauge("process_uptime_seconds", "Seconds since the API process started.")
+process_uptime.set_function(lambda: time.time() - PROCESS_START_TIME)
+
+# --- HTTP ---
+http_requests_total = REGISTRY.counter(
+    "http_requests_total", "HTTP requests processed, by route template.", ("method", "route", "status")
+)
+http_request_duration = REGISTRY.histogram(
+    "http_request_duration_seconds", "HTTP request latency, by route template.", ("method", "route")
+)
+http_requests_in_flight = REGISTRY.gauge("http_requests_in_flight", "HTTP requests currently being served.")
+
+# --- Event loop ---
+event_loop_lag = REGISTRY.gauge("event_loop_lag_seconds", "Most recent asyncio event-loop scheduling delay.")
+event_loop_lag_histogram = REGISTRY.histogram(
+    "event_loop_lag_distribution_seconds", "Distribution of asyncio event-loop scheduling delay.",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0),
+)
+
+# --- MongoDB (Motor) ---
+mongo_pool_checked_out = REGISTRY.gauge(
+    "mongo_pool_connections_checked_out", "Connections currently checked out of the Motor pool."
+)
+mongo_pool_checkouts_total = REGISTRY.counter(
+    "mongo_pool_checkouts_total", "Connection checkouts from the Motor pool, by outcome.", ("outcome",)
+)
+mongo_pool_connections = REGISTRY.gauge(
+    "mongo_pool_connections_open", "Open connections in the Motor pool."
+)
+mongo_commands_total = REGISTRY.counter(
+    "mongo_commands_total", "MongoDB commands issued, by command and collection.", ("command", "collection")
+)
+mongo_command_duration = REGISTRY.histogram(
+    "mongo_command_duration_seconds", "MongoDB command round-trip latency.", ("command",)
+)
+
+# --- Socket.IO ---
+socketio_connected_clients = REGISTRY.gauge(
+    "socketio_connected_clients", "Socket.IO clients currently connected."
+)
+socketio_emits_total = REGISTRY.counter(
+    "socketio_emits_total", "Socket.IO events emitted by the server, by event name.", ("event",)
+)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording latency and status per route template.
+    Uses the matched route's path (e.g. /api/users/{user_id}) as the label so
+    cardinality stays bounded; unmatched paths are grouped as "unmatched".
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        start = time.perf_counter()
+        http_requests_in_flight.inc()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_requests_in_flight.dec()
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "unmatched"
+            method = scope.get("method", "GET")
+            http_request_duration.observe(time.perf_counter() - start, method=method, route=template)
+            http_requests_total.inc(method=method, route=template, status=str(status_code))
+
+
+async def monitor_event_loop_lag(interval: float = 0.5):
+    """Background task sampling how late the loop wakes up from a fixed sleep."""
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        await asyncio.sleep(interval)
+        lag = max(0.0, loop.time() - started - interval)
+        event_loop_lag.set(lag)
+        event_loop_lag_histogram.observe(lag)
+
+
+class MongoPoolListener(monitoring.ConnectionPoolListener):
+    """Tracks Motor/PyMongo connection-pool checkouts."""
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        mongo_pool_connections.inc()
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        mongo_pool_connections.dec()
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        mongo_pool_checkouts_total.inc(outcome="failed")
+
+    def connection_checked_out(self, event):
+        mongo_pool_checked_out.inc()
+        mongo_pool_checkouts_total.inc(outcome="ok")
+
+    def connection_checked_in(self, event):
+        mongo_pool_checked_out.dec()
+
+
+class MongoCommandListener(monitoring.CommandListener):
+    """Counts commands per collection and records their latency."""
+
+    def started(self, event):
+        collection = event.command.get(event.command_name)
+        if not isinstance(collection, str):
+            collection = "-"
+        mongo_commands_total.inc(command=event.command_name, collection=collection)
+
+    def succeeded(self, event):
+        mongo_command_duration.observe(event.duration_micros / 1_000_000, command=event.command_name)
+
+    def failed(self, event):
+        mongo_command_duration.observe(event.duration_micros / 1_000_000, command=event.command_name)
@@ -1,9 +1,10 @@
-from datetime import datetime, timezone
 from typing import List, Optional
 import uuid
 from app.models.notification import Notification
 from app.db import db
+from app.core.attendance_store import attendance_reads, attendance_totals, attendance_totals_fields
 from app.sio_instance import sio, connected_users
+from app.core.dates import utc_now, to_json
 
 async def create_notification(
     user_id: str,
@@ -24,7 +25,6 @@ async def create_notification(
     )
     
     data = notification.model_dump()
-    data["created_at"] = data["created_at"].isoformat()
     
     # Save to DB
     result = await db.notifications.insert_one(data)
@@ -34,7 +34,7 @@ async def create_notification(
     # Real-time alert via Socket.IO
     sid = connected_users.get(user_id)
     if sid:
-        await sio.emit("new_notification", data, room=sid)
+        await sio.emit("new_notification", to_json(data), room=sid)
         
     return data
 
@@ -53,7 +53,7 @@ async def create_broadcast_notification(
     users = await db.users.find(query, {"id": 1}).to_list(10000)
     
     notifications = []
-    created_at = datetime.now(timezone.utc).isoformat()
+    created_at = utc_now()
     
     for user in users:
         ntf = {
@@ -72,20 +72,50 @@ async def create_broadcast_notification(
         # Real-time (best effort loop)
         sid = connected_users.get(user["id"])
         if sid:
-            await sio.emit("new_notification", ntf, room=sid)
+            await sio.emit("new_notification", to_json(ntf), room=sid)
             
     if notifications:
         await db.notifications.insert_many(notifications)
         
     return len(notifications)
 
+def assess_academic_risk(att_pct: float, avg_pct: float):
+    """Returns (risk_level, reasons) for an attendance % and an average marks %."""
+    risk_level = "low"
+    reasons = []
+    
+    if att_pct < 65:
+        risk_level = "critical"
+        reasons.append(f"Low Attendance ({att_pct:.1f}%)")
+    elif att_pct < 75:
+        risk_level = "warning"
+        reasons.append(f"Borderline Attendance ({att_pct:.1f}%)")
+        
+    if avg_pct < 40:
+        if risk_level != "critical": risk_level = "critical"
+        reasons.append(f"Failing Marks ({avg_pct:.1f}%)")
+    elif avg_pct < 50:
+        if risk_level != "critical": risk_level = "warning"
+        reasons.append(f"Low Marks ({avg_pct:.1f}%)")
+    return risk_level, reasons
+
+def _risk_alert(student_id: str, student_name: str, mentor_id: str, risk_level: str, reasons: List[str]) -> dict:
+    return dict(
+        user_id=mentor_id,
+        title=f"Risk Alert: {student_name}",
+        message=f"{student_name} is at {risk_level.upper()} risk due to: {', '.join(reasons)}.",
+        type="critical" if risk_level == "critical" else "warning",
+        link=f"/mentor/student/{student_id}",
+        metadata={"student_id": student_id, "risk_level": risk_level}
+    )
+
 async def check_academic_risk(student_id: str):
     """
     Analyzes student performance and triggers risk alerts if needed.
     Called after attendance or marks updates.
     """
     # 1. Calculate Attendance %
-    attendance_records = await db.attendance.find(
+    attendance_records = await attendance_reads(db).find(
         {"student_id": student_id}
     ).to_list(1000)
     
@@ -108,22 +138,7 @@ async def check_academic_risk(student_id: str):
         avg_pct = 100 # Default to safe if no data
         
     # 3. Determine Risk
-    risk_level = "low"
-    reasons = []
-    
-    if att_pct < 65:
-        risk_level = "critical"
-        reasons.append(f"Low Attendance ({att_pct:.1f}%)")
-    elif att_pct < 75:
-        risk_level = "warning"
-        reasons.append(f"Borderline Attendance ({att_pct:.1f}%)")
-        
-    if avg_pct < 40:
-        if risk_level != "critical": risk_level = "critical"
-        reasons.append(f"Failing Marks ({avg_pct:.1f}%)")
-    elif avg_pct < 50:
-        if risk_level != "critical": risk_level = "warning"
-        reasons.append(f"Low Marks ({avg_pct:.1f}%)")
+    risk_level, reasons = assess_academic_risk(att_pct, avg_pct)
         
     # 4. Notify Mentor if Risk Detected
     if risk_level in ["warning", "critical"]:
@@ -137,15 +152,73 @@ async def check_academic_risk(student_id: str):
             student = await db.users.find_one({"id": student_id}, {"full_name": 1, "usn": 1})
             s_name = student.get("full_name", "Student")
             
-            title = f"Risk Alert: {s_name}"
-            msg = f"{s_name} is at {risk_level.upper()} risk due to: {', '.join(reasons)}."
-            type_ = "critical" if risk_level == "critical" else "warning"
-            
-            await create_notification(
-                user_id=mentor_id,
-                title=title,
-                message=msg,
-                type=type_,
-                link=f"/mentor/student/{student_id}",
-                metadata={"student_id": student_id, "risk_level": risk_level}
-            )
+            await create_notification(**_risk_alert(student_id, s_name, mentor_id, risk_level, reasons))
+
+async def check_academic_risk_bulk(student_ids: List[str]) -> int:
+    """
+    check_academic_risk for many students with a fixed number of queries:
+    one grouped aggregation each for attendance and marks, one lookup each for
+    mentors and names of the at-risk students, and one insert_many for the alerts.
+    Returns the number of alerts raised.
+    """
+    student_ids = list(dict.fromkeys(student_ids))
+    if not student_ids:
+        return 0
+
+    att_rows = await attendance_totals(db).aggregate([
+        {"$match": {"student_id": {"$in": student_ids}}},
+        {"$group": {"_id": "$student_id", **attendance_totals_fields()}},
+    ]).to_list(None)
+    marks_rows = await db.marks.aggregate([
+        {"$match": {"student_id": {"$in": student_ids}}},
+        {"$group": {
+            "_id": "$student_id",
+            "valid": {"$sum": {"$cond": [{"$gt": ["$max_marks", 0]}, 1, 0]}},
+            "sum_pct": {"$sum": {"$cond": [
+                {"$gt": ["$max_marks", 0]},
+                {"$multiply": [{"$divide": ["$marks_obtained", "$max_marks"]}, 100]},
+                0,
+            ]}},
+        }},
+    ]).to_list(None)
+
+    # Same defaults as check_academic_risk: no attendance / no marks counts as safe
+    att_pct = {r["_id"]: (r["present"] / r["total"] * 100) if r["total"] else 100 for r in att_rows}
+    avg_pct = {r["_id"]: (r["sum_pct"] / r["valid"]) if r["valid"] else 0 for r in marks_rows}
+
+    at_risk = {}
+    for sid in student_ids:
+        risk_level, reasons = assess_academic_risk(att_pct.get(sid, 100), avg_pct.get(sid, 100))
+        if risk_level in ["warning", "critical"]:
+            at_risk[sid] = (risk_level, reasons)
+    if not at_risk:
+        return 0
+
+    assignments = await db.assignments.find(
+        {"student_ids": {"$in": list(at_risk)}}, {"_id": 0, "mentor_id": 1, "student_ids": 1}
+    ).to_list(None)
+    mentors = {}
+    for assignment in assignments:
+        for sid in assignment.get("student_ids", []):
+            if sid in at_risk:
+                mentors.setdefault(sid, assignment["mentor_id"])
+    if not mentors:
+        return 0
+
+    names = {
+        u["id"]: u.get("full_name", "Student")
+        for u in await db.users.find({"id": {"$in": list(mentors)}}, {"_id": 0, "id": 1, "full_name": 1}).to_list(None)
+    }
+
+    notifications = []
+    for sid, mentor_id in mentors.items():
+        risk_level, reasons = at_risk[sid]
+        data = Notification(**_risk_alert(sid, names.get(sid, "Student"), mentor_id, risk_level, reasons)).model_dump()
+        notifications.append(data)
+
+    await db.notifications.insert_many([n.copy() for n in notifications])
+    for data in notifications:
+        sid = connected_users.get(data["user_id"])
+        if sid:
+            await sio.emit("new_notification", to_json(data), room=sid)
+    return len(notifications)
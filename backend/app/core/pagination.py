@@ -0,0 +1,56 @@
+"""
+Keyset (cursor) pagination over a unique sort key.
+
+    sort = [("date", DESCENDING), ("subject", ASCENDING)]
+    query = {**filters, **after_cursor(sort, cursor)}
+    docs = await db.attendance.find(query).sort(sort).limit(limit + 1).to_list(limit + 1)
+    page, next_cursor = split_page(docs, sort, limit)
+
+The cursor is the last returned row's sort values, base64-encoded JSON, so the
+next page is a range scan on the same index instead of a growing skip. The
+sort fields must identify a row uniquely (with the equality filters in front).
+"""
+import base64
+import json
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException
+from pymongo import ASCENDING
+
+MAX_PAGE_SIZE = 1000
+
+
+def encode_cursor(doc: dict, sort: List[Tuple[str, int]]) -> str:
+    values = [doc.get(field) for field, _ in sort]
+    return base64.urlsafe_b64encode(json.dumps(values, default=str).encode()).decode()
+
+
+def decode_cursor(cursor: str, sort: List[Tuple[str, int]]) -> list:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError):
+        values = None
+    if not isinstance(values, list) or len(values) != len(sort):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+def after_cursor(sort: List[Tuple[str, int]], cursor: Optional[str]) -> dict:
+    """Filter for rows strictly after the cursor in `sort` order; {} for the first page."""
+    if not cursor:
+        return {}
+    values = decode_cursor(cursor, sort)
+    branches = []
+    for i, (field, direction) in enumerate(sort):
+        clause = {f: v for (f, _), v in zip(sort[:i], values[:i])}
+        clause[field] = {"$gt" if direction == ASCENDING else "$lt": values[i]}
+        branches.append(clause)
+    return {"$or": branches}
+
+
+def split_page(docs: list, sort: List[Tuple[str, int]], limit: int) -> Tuple[list, Optional[str]]:
+    """Given up to limit + 1 docs, returns the page and the cursor for the next one (None if last)."""
+    if len(docs) <= limit:
+        return docs, None
+    page = docs[:limit]
+    return page, encode_cursor(page[-1], sort)
@@ -0,0 +1,122 @@
+"""
+CPU-bound PDF rendering, run in worker processes.
+
+Everything here takes and returns plain picklable data (strings, lists, bytes)
+and must not import app.db or anything that opens connections, since the
+functions are executed in a separate process by app.core.executors.
+"""
+import io
+
+# Rows per LongTable chunk. Layout cost of a single table grows superlinearly,
+# so large reports are split into many small tables laid out one by one.
+TABLE_CHUNK_ROWS = 200
+
+
+def table_rows(records: list) -> tuple:
+    """Flattens documents into (columns, rows), keeping first-seen key order."""
+    columns = []
+    seen = set()
+    for record in records:
+        for key in record:
+            if key not in seen:
+                seen.add(key)
+                columns.append(key)
+    rows = [["" if record.get(c) is None else record.get(c) for c in columns] for record in records]
+    return columns, rows
+
+
+def _streaming_doc_template():
+    """SimpleDocTemplate that lays out flowables one at a time as they are produced."""
+    from reportlab.platypus import SimpleDocTemplate, Frame, PageTemplate
+
+    class StreamingDocTemplate(SimpleDocTemplate):
+
+        def build_streaming(self, flowables):
+            """Like build(), but consumes an iterator so only one flowable is alive at a time."""
+            self._calc()
+            frame = Frame(self.leftMargin, self.bottomMargin, self.width, self.height, id="normal")
+            self.addPageTemplates([
+                PageTemplate(id="First", frames=frame, pagesize=self.pagesize),
+                PageTemplate(id="Later", frames=frame, pagesize=self.pagesize),
+            ])
+            self._startBuild()
+            self.canv._doctemplate = self
+            try:
+                for flowable in flowables:
+                    # handle_flowable consumes the list, re-inserting split remainders
+                    pending = [flowable]
+                    while pending:
+                        self.clean_hanging()
+                        self.handle_flowable(pending)
+            finally:
+                del self.canv._doctemplate
+            self._endBuild()
+
+    return StreamingDocTemplate
+
+
+def _table_chunks(columns: list, rows: list, table_style: list, available_width: float, available_height: float):
+    """
+    Yields LongTables of TABLE_CHUNK_ROWS rows each, with the header row repeated on every page.
+    Column widths are measured once on the first chunk and reused so chunks line up.
+    """
+    from reportlab.platypus import LongTable, TableStyle
+
+    style = TableStyle(table_style)
+    col_widths = None
+    for start in range(0, len(rows), TABLE_CHUNK_ROWS):
+        data = [columns] + rows[start:start + TABLE_CHUNK_ROWS]
+        table = LongTable(data, colWidths=col_widths, repeatRows=1)
+        table.setStyle(style)
+        if col_widths is None:
+            table.wrap(available_width, available_height)
+            col_widths = table._colWidths
+        yield table
+
+
+def render_table_pdf(title: str, columns: list, rows: list, table_style: list, note: str = None) -> bytes:
+    """
+    Renders a titled table PDF. Rows are laid out in page-sized LongTable chunks
+    built one after another, so cost grows linearly with the row count.
+    """
+    from reportlab.lib.pagesizes import letter
+    from reportlab.platypus import Paragraph, Spacer
+    from reportlab.lib.styles import getSampleStyleSheet
+
+    buffer = io.BytesIO()
+    doc = _streaming_doc_template()(buffer, pagesize=letter)
+    styles = getSampleStyleSheet()
+
+    def flowables():
+        yield Paragraph(title, styles["Title"])
+        if note:
+            yield Paragraph(note, styles["Italic"])
+        yield Spacer(1, 12)
+        yield from _table_chunks(columns, rows, table_style, doc.width, doc.height)
+
+    doc.build_streaming(flowables())
+    return buffer.getvalue()
+
+
+def render_certificate_pdf(name: str) -> bytes:
+    """Renders the certificate of completion for one student."""
+    from reportlab.lib.pagesizes import letter
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+    from reportlab.lib.styles import getSampleStyleSheet
+
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter)
+    elements = []
+    styles = getSampleStyleSheet()
+
+    elements.append(Spacer(1, 100))
+    elements.append(Paragraph("CERTIFICATE OF COMPLETION", styles["Title"]))
+    elements.append(Spacer(1, 50))
+    elements.append(Paragraph("This is to certify that", styles["Normal"]))
+    elements.append(Spacer(1, 20))
+    elements.append(Paragraph(f"<b>{name}</b>", styles["Heading1"]))
+    elements.append(Spacer(1, 20))
+    elements.append(Paragraph("has successfully completed all requirements under the Mentorship Program.", styles["Normal"]))
+
+    doc.build(elements)
+    return buffer.getvalue()
@@ -0,0 +1,116 @@
+"""
+Size-bounded disk cache for rendered report files.
+
+Entries are keyed by (report type, subject id, format, data version), so a
+write that bumps the data version (see app.core.data_versions) makes old
+entries unreachable; they age out through LRU eviction. Recency is tracked
+with file mtimes, which are refreshed on every hit.
+"""
+import asyncio
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import BinaryIO, Optional
+
+from app.core.config import settings
+from app.core.metrics import REGISTRY
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+report_cache_requests_total = REGISTRY.counter(
+    "report_cache_requests_total", "Report file cache lookups, by report type and result.", ("report", "result")
+)
+report_cache_bytes = REGISTRY.gauge("report_cache_bytes", "Bytes held by the report file cache.")
+report_cache_evictions_total = REGISTRY.counter("report_cache_evictions_total", "Report files evicted from the cache.")
+
+
+class ReportFileCache:
+
+    def __init__(self, directory: str, max_bytes: int):
+        path = Path(directory)
+        self.directory = path if path.is_absolute() else BACKEND_DIR / path
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def _filename(report_type: str, subject_id: str, format: str, version: str) -> str:
+        digest = hashlib.sha256(f"{report_type}|{subject_id}|{format}|{version}".encode()).hexdigest()
+        return f"{report_type}-{digest[:32]}.{format}"
+
+    def _lookup(self, filename: str) -> Optional[Path]:
+        path = self.directory / filename
+        try:
+            os.utime(path)  # mark as recently used
+        except FileNotFoundError:
+            return None
+        return path
+
+    def _open(self, filename: str) -> Optional[BinaryIO]:
+        # The open handle keeps the content readable even if a concurrent put() evicts the file
+        path = self._lookup(filename)
+        if path is None:
+            return None
+        try:
+            return open(path, "rb")
+        except FileNotFoundError:
+            return None
+
+    def _store(self, filename: str, content: bytes) -> Path:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / filename
+        # Write then rename, so concurrent readers never see a partial file
+        fd, tmp_name = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                tmp.write(content)
+            os.replace(tmp_name, path)
+        except BaseException:
+            if os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+            raise
+        self._evict(keep=path)
+        return path
+
+    def _evict(self, keep: Path):
+        """Deletes least recently used files until the cache fits in max_bytes."""
+        entries = []
+        total = 0
+        for entry in os.scandir(self.directory):
+            if not entry.is_file() or entry.name.startswith(".tmp-"):
+                continue
+            stat = entry.stat()
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total += stat.st_size
+
+        entries.sort()
+        for _mtime, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if path == str(keep):
+                continue
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            report_cache_evictions_total.inc()
+        report_cache_bytes.set(total)
+
+    async def get(self, report_type: str, subject_id: str, format: str, version: str) -> Optional[Path]:
+        path = await asyncio.to_thread(self._lookup, self._filename(report_type, subject_id, format, version))
+        report_cache_requests_total.inc(report=report_type, result="hit" if path else "miss")
+        return path
+
+    async def open(self, report_type: str, subject_id: str, format: str, version: str) -> Optional[BinaryIO]:
+        """Like get(), but returns the cached file opened for reading; the caller closes it."""
+        fileobj = await asyncio.to_thread(self._open, self._filename(report_type, subject_id, format, version))
+        report_cache_requests_total.inc(report=report_type, result="hit" if fileobj else "miss")
+        return fileobj
+
+    async def put(self, report_type: str, subject_id: str, format: str, version: str, content: bytes) -> Path:
+        return await asyncio.to_thread(
+            self._store, self._filename(report_type, subject_id, format, version), content
+        )
+
+
+report_cache = ReportFileCache(settings.REPORT_CACHE_DIR, settings.REPORT_CACHE_MAX_BYTES)
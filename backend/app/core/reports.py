@@ -1,146 +1,306 @@
+import asyncio
+import csv
 import io
-import pandas as pd
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet
+import json
+import shutil
+import tempfile
+import zipfile
 from app.db import db
+from app.core.attendance_store import attendance_reads
+from app.core.config import settings
+from app.core.analytics import get_mentee_metrics
+from app.core.executors import pdf_executor
+from app.core.pdf_render import table_rows, render_table_pdf, render_certificate_pdf
 from datetime import datetime
 
-async def generate_attendance_report(format: str, student_id: str = None) -> bytes:
-    """Generates attendance report in PDF or Excel."""
-    query = {}
-    if student_id:
-        query["student_id"] = student_id
-        
-    records = await db.attendance.find(query, {"_id": 0}).to_list(10000)
-    
-    if not records:
+# PDFs are rendered by app.core.pdf_render in the pdf_executor process pool, so
+# ReportLab's CPU-bound doc.build() never runs on the event loop.
+# pandas, openpyxl and ReportLab are imported inside the functions that use them.
+# Together they account for most of the API's import time, and only the report
+# endpoints need them, so loading them on first use keeps worker cold starts fast.
+
+# Table styles use ReportLab color names so they can be declared without importing it
+ATTENDANCE_TABLE_STYLE = [
+    ('BACKGROUND', (0, 0), (-1, 0), 'grey'),
+    ('TEXTCOLOR', (0, 0), (-1, 0), 'whitesmoke'),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), 'beige'),
+    ('GRID', (0, 0), (-1, -1), 1, 'black'),
+]
+
+MARKS_TABLE_STYLE = [
+    ('BACKGROUND', (0, 0), (-1, 0), 'blue'),
+    ('TEXTCOLOR', (0, 0), (-1, 0), 'whitesmoke'),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('GRID', (0, 0), (-1, -1), 1, 'black'),
+]
+
+MENTOR_SUMMARY_TABLE_STYLE = [
+    ('BACKGROUND', (0, 0), (-1, 0), 'darkgreen'),
+    ('TEXTCOLOR', (0, 0), (-1, 0), 'whitesmoke'),
+    ('GRID', (0, 0), (-1, -1), 1, 'black'),
+]
+
+EXCEL_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+CSV_MEDIA_TYPE = "text/csv; charset=utf-8"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# Fixed column order for streamed exports; a write-only sheet cannot add columns later
+ATTENDANCE_COLUMNS = ["id", "student_id", "subject", "date", "status", "recorded_by", "created_at"]
+MARKS_COLUMNS = [
+    "id", "student_id", "subject", "semester", "marks_type",
+    "marks_obtained", "max_marks", "recorded_by", "created_at",
+]
+
+# (metric key, column header) for the mentor summary
+MENTOR_SUMMARY_COLUMNS = [
+    ("usn", "USN"), ("full_name", "Name"), ("department", "Department"), ("semester", "Sem"),
+    ("attendance_percentage", "Attendance %"), ("average_marks_percentage", "Marks %"),
+    ("risk_level", "Risk"), ("pending_reviews", "Pending Reviews"), ("latest_feedback", "Last Feedback"),
+]
+
+EXPORT_BATCH_SIZE = 1000
+STREAM_CHUNK_SIZE = 64 * 1024
+
+def _excel_cell(value):
+    """Coerces a Mongo value into something openpyxl can write."""
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, datetime):
+        # Excel has no timezone support
+        return value.replace(tzinfo=None)
+    return str(value)
+
+def _append_rows(sheet, rows: list):
+    for row in rows:
+        sheet.append(row)
+
+async def write_excel_spool(cursor, columns: list, sheet_name: str):
+    """
+    Streams a Motor cursor into a write-only workbook.
+    Returns a SpooledTemporaryFile positioned at the start, or None when the cursor is empty.
+    Only one batch of rows is held in memory; openpyxl buffers the sheet on disk.
+    """
+    from openpyxl import Workbook
+
+    workbook = sheet = None
+    batch = []
+
+    async def flush():
+        nonlocal workbook, sheet, batch
+        if workbook is None:
+            # Created on the first batch so an empty cursor never opens a sheet writer
+            workbook = Workbook(write_only=True)
+            sheet = workbook.create_sheet(sheet_name)
+            sheet.append(columns)
+        await asyncio.to_thread(_append_rows, sheet, batch)
+        batch = []
+
+    async for doc in cursor:
+        batch.append([_excel_cell(doc.get(column)) for column in columns])
+        if len(batch) >= EXPORT_BATCH_SIZE:
+            await flush()
+    if batch:
+        await flush()
+
+    if workbook is None:
+        return None
+
+    spool = tempfile.SpooledTemporaryFile(max_size=settings.REPORT_SPOOL_MAX_BYTES)
+    try:
+        await asyncio.to_thread(workbook.save, spool)
+    except BaseException:
+        spool.close()
+        raise
+    spool.seek(0)
+    return spool
+
+async def iter_file_chunks(fileobj, chunk_size: int = STREAM_CHUNK_SIZE):
+    """Yields a file in chunks for a StreamingResponse, closing it when done."""
+    try:
+        while True:
+            chunk = await asyncio.to_thread(fileobj.read, chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        fileobj.close()
+
+def spool_size(fileobj) -> int:
+    """Size of a spooled export, for the Content-Length header."""
+    position = fileobj.tell()
+    fileobj.seek(0, io.SEEK_END)
+    size = fileobj.tell()
+    fileobj.seek(position)
+    return size
+
+def _text_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+async def open_row_stream(cursor):
+    """
+    Fetches the first document so callers can 404 before starting a response.
+    Returns an async iterator over every document, or None when the cursor is empty.
+    """
+    rows = cursor.__aiter__()
+    try:
+        first = await rows.__anext__()
+    except StopAsyncIteration:
+        return None
+
+    async def chained():
+        yield first
+        while True:
+            try:
+                yield await rows.__anext__()
+            except StopAsyncIteration:
+                return
+
+    return chained()
+
+async def iter_csv(rows, columns: list, chunk_size: int = STREAM_CHUNK_SIZE):
+    """Encodes documents as CSV with a header row, yielding roughly chunk_size bytes at a time."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    # The header goes out straight away so clients see the first byte immediately
+    yield buffer.getvalue().encode()
+    buffer.seek(0)
+    buffer.truncate()
+
+    async for doc in rows:
+        writer.writerow([_text_value(doc.get(column)) for column in columns])
+        if buffer.tell() >= chunk_size:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+async def iter_ndjson(rows, chunk_size: int = STREAM_CHUNK_SIZE):
+    """Encodes documents as newline-delimited JSON, yielding roughly chunk_size bytes at a time."""
+    lines, size, first = [], 0, True
+    async for doc in rows:
+        line = json.dumps(doc, default=_json_default) + "\n"
+        lines.append(line)
+        size += len(line)
+        # Flush the first record on its own so time-to-first-byte does not wait for a full chunk
+        if first or size >= chunk_size:
+            yield "".join(lines).encode()
+            lines, size, first = [], 0, False
+    if lines:
+        yield "".join(lines).encode()
+
+def _report_query(student_id: str = None) -> dict:
+    return {"student_id": student_id} if student_id else {}
+
+def attendance_cursor(student_id: str = None):
+    return attendance_reads(db).find(_report_query(student_id), {"_id": 0}).batch_size(EXPORT_BATCH_SIZE)
+
+def marks_cursor(student_id: str = None):
+    return db.marks.find(_report_query(student_id), {"_id": 0}).batch_size(EXPORT_BATCH_SIZE)
+
+async def export_attendance_excel(student_id: str = None):
+    """Streams attendance rows into a spooled workbook (see write_excel_spool)."""
+    return await write_excel_spool(attendance_cursor(student_id), ATTENDANCE_COLUMNS, "Attendance")
+
+async def export_marks_excel(student_id: str = None):
+    """Streams marks rows into a spooled workbook (see write_excel_spool)."""
+    return await write_excel_spool(marks_cursor(student_id), MARKS_COLUMNS, "Marks")
+
+async def _spool_bytes(spool) -> bytes:
+    if spool is None:
         return b""
-        
+    with spool:
+        return spool.read()
+
+def _excel_bytes(records: list, sheet_name: str) -> bytes:
+    """Writes records to a single-sheet workbook."""
+    import pandas as pd
+
     df = pd.DataFrame(records)
-    
-    if format == "excel":
-        output = io.BytesIO()
-        with pd.ExcelWriter(output, engine="openpyxl") as writer:
-            df.to_excel(writer, index=False, sheet_name="Attendance")
-        return output.getvalue()
-        
-    elif format == "pdf":
-        buffer = io.BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=letter)
-        elements = []
-        styles = getSampleStyleSheet()
-        
-        elements.append(Paragraph("Attendance Report", styles["Title"]))
-        elements.append(Spacer(1, 12))
-        
-        # Table Data
-        data = [df.columns.tolist()] + df.values.tolist()
-        table = Table(data)
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ]))
-        
-        elements.append(table)
-        doc.build(elements)
-        return buffer.getvalue()
-        
-    return b""
+    output = io.BytesIO()
+    with pd.ExcelWriter(output, engine="openpyxl") as writer:
+        df.to_excel(writer, index=False, sheet_name=sheet_name)
+    return output.getvalue()
 
-async def generate_marks_report(format: str, student_id: str = None) -> bytes:
-    """Generates marks report in PDF or Excel."""
-    query = {}
-    if student_id:
-        query["student_id"] = student_id
+async def _table_pdf_bytes(title: str, records: list, table_style: list) -> bytes:
+    """Renders records as a titled table PDF in the PDF worker pool."""
+    columns, rows = table_rows(records)
+    return await pdf_executor.run(render_table_pdf, title, columns, rows, table_style)
 
-    records = await db.marks.find(query, {"_id": 0}).to_list(10000)
+async def _cursor_pdf_bytes(title: str, cursor, columns: list, table_style: list) -> bytes:
+    """
+    Renders a cursor as a table PDF. Rows are collected as plain lists (not dicts)
+    up to REPORT_PDF_MAX_ROWS; past that the PDF says it is truncated.
+    """
+    limit = settings.REPORT_PDF_MAX_ROWS
+    rows = []
+    truncated = False
+    # One extra row tells us whether anything was cut off
+    async for doc in cursor.limit(limit + 1):
+        if len(rows) >= limit:
+            truncated = True
+            break
+        rows.append(["" if doc.get(c) is None else doc.get(c) for c in columns])
 
-    if not records:
+    if not rows:
         return b""
+    note = f"Showing the first {limit:,} rows. Use the Excel, CSV or NDJSON export for the full data set." if truncated else None
+    return await pdf_executor.run(render_table_pdf, title, columns, rows, table_style, note)
 
-    df = pd.DataFrame(records)
+async def generate_attendance_report(format: str, student_id: str = None) -> bytes:
+    """Generates attendance report in PDF or Excel."""
+    if format == "excel":
+        return await _spool_bytes(await export_attendance_excel(student_id))
 
+    if format == "pdf":
+        return await _cursor_pdf_bytes(
+            "Attendance Report", attendance_cursor(student_id), ATTENDANCE_COLUMNS, ATTENDANCE_TABLE_STYLE
+        )
+
+    return b""
+
+async def generate_marks_report(format: str, student_id: str = None) -> bytes:
+    """Generates marks report in PDF or Excel."""
     if format == "excel":
-        output = io.BytesIO()
-        with pd.ExcelWriter(output, engine="openpyxl") as writer:
-            df.to_excel(writer, index=False, sheet_name="Marks")
-        return output.getvalue()
+        return await _spool_bytes(await export_marks_excel(student_id))
 
-    elif format == "pdf":
-        buffer = io.BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=letter)
-        elements = []
-        styles = getSampleStyleSheet()
-
-        elements.append(Paragraph("Marks Report", styles["Title"]))
-        elements.append(Spacer(1, 12))
-
-        data = [df.columns.tolist()] + df.values.tolist()
-        table = Table(data)
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.blue),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ]))
-
-        elements.append(table)
-        doc.build(elements)
-        return buffer.getvalue()
+    if format == "pdf":
+        return await _cursor_pdf_bytes("Marks Report", marks_cursor(student_id), MARKS_COLUMNS, MARKS_TABLE_STYLE)
 
     return b""
 
 async def generate_mentor_summary_report(format: str, mentor_id: str) -> bytes:
-    """Generates a summary report for a mentor's mentees."""
-    # ... logic (fetch students, aggregations) ...
-    # For MVP, let's just dump the list of assigned students
-    assignment = await db.assignments.find_one({"mentor_id": mentor_id})
-    if not assignment:
+    """Generates a per-mentee metrics summary for a mentor, from one aggregation."""
+    assignment = await db.assignments.find_one({"mentor_id": mentor_id}, {"_id": 0, "student_ids": 1})
+    if not assignment or not assignment.get("student_ids"):
         return b""
-        
-    students = await db.users.find(
-        {"id": {"$in": assignment["student_ids"]}}, 
-        {"full_name": 1, "usn": 1, "department": 1, "_id": 0}
-    ).to_list(1000)
-    
-    if not students:
+
+    metrics = await get_mentee_metrics(assignment["student_ids"])
+    if not metrics:
         return b""
-        
-    df = pd.DataFrame(students)
-    
+
+    records = [
+        {label: m[key] for key, label in MENTOR_SUMMARY_COLUMNS}
+        for m in metrics
+    ]
+
     if format == "excel":
-        output = io.BytesIO()
-        with pd.ExcelWriter(output, engine="openpyxl") as writer:
-            df.to_excel(writer, index=False, sheet_name="Mentees")
-        return output.getvalue()
-        
+        return _excel_bytes(records, "Mentees")
+
     elif format == "pdf":
-        buffer = io.BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=letter)
-        elements = []
-        styles = getSampleStyleSheet()
-        
-        elements.append(Paragraph("Mentor Summary: Mentees List", styles["Title"]))
-        elements.append(Spacer(1, 12))
-        
-        data = [df.columns.tolist()] + df.values.tolist()
-        table = Table(data)
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.darkgreen),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ]))
-        
-        doc.build(elements)
-        return buffer.getvalue()
-        
+        return await _table_pdf_bytes("Mentor Summary", records, MENTOR_SUMMARY_TABLE_STYLE)
+
     return b""
 
 async def generate_transcript_report(format: str, student_id: str) -> bytes:
@@ -151,23 +311,204 @@ async def generate_certificate_report(format: str, student_id: str) -> bytes:
     """Generates a dummy certificate of completion."""
     if format != "pdf":
         return b"" # Only PDFs for Certificates
-    
-    student = await db.users.find_one({"id": student_id})
+
+    student = await db.users.find_one({"id": student_id}, {"full_name": 1})
     name = student.get("full_name", "Student") if student else "Student"
-    
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter)
-    elements = []
-    styles = getSampleStyleSheet()
-    
-    elements.append(Spacer(1, 100))
-    elements.append(Paragraph("CERTIFICATE OF COMPLETION", styles["Title"]))
-    elements.append(Spacer(1, 50))
-    elements.append(Paragraph(f"This is to certify that", styles["Normal"]))
-    elements.append(Spacer(1, 20))
-    elements.append(Paragraph(f"<b>{name}</b>", styles["Heading1"]))
-    elements.append(Spacer(1, 20))
-    elements.append(Paragraph("has successfully completed all requirements under the Mentorship Program.", styles["Normal"]))
-    
-    doc.build(elements)
-    return buffer.getvalue()
+
+    return await pdf_executor.run(render_certificate_pdf, name)
+
+# ---- Bulk per-student PDFs as a ZIP ----
+
+BULK_DOCUMENT_KINDS = {"transcript", "certificate"}
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only, unseekable buffer that ZipFile streams into; drained after each entry."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data, self._chunks = b"".join(self._chunks), []
+        return data
+
+def bulk_students_cursor(kind: str, department: str, semester: int = None):
+    """
+    One aggregation returning every matching student, with their marks
+    joined in for transcripts, instead of a lookup per student.
+    """
+    match = {"role": "student", "department": department}
+    if semester is not None:
+        match["semester"] = semester
+    pipeline = [
+        {"$match": match},
+        {"$project": {"_id": 0, "id": 1, "full_name": 1, "usn": 1}},
+        {"$sort": {"usn": 1}},
+    ]
+    if kind == "transcript":
+        pipeline.append({"$lookup": {"from": "marks", "localField": "id", "foreignField": "student_id", "as": "marks"}})
+    return db.users.aggregate(pipeline, batchSize=EXPORT_BATCH_SIZE)
+
+def _bulk_entry_name(kind: str, student: dict) -> str:
+    label = student.get("usn") or student["id"]
+    safe = "".join(ch if ch.isalnum() or ch in "-_" else "_" for ch in label)
+    return f"{kind}_{safe}.pdf"
+
+async def _render_student_document(kind: str, student: dict) -> bytes:
+    name = student.get("full_name") or "Student"
+    if kind == "certificate":
+        return await pdf_executor.run(render_certificate_pdf, name)
+
+    rows = [
+        ["" if mark.get(c) is None else mark.get(c) for c in MARKS_COLUMNS]
+        for mark in student.get("marks", [])
+    ]
+    if not rows:
+        return b""
+    title = f"Transcript: {name} ({student.get('usn') or student['id']})"
+    return await pdf_executor.run(render_table_pdf, title, MARKS_COLUMNS, rows, MARKS_TABLE_STYLE)
+
+async def iter_bulk_documents_zip(kind: str, students):
+    """
+    Renders one PDF per student on the PDF process pool and yields a ZIP archive
+    as renders finish. At most a few renders per worker are in flight, so memory
+    stays bounded however many students match. Students whose PDF could not be
+    produced are listed in errors.txt at the end of the archive.
+    """
+    window = pdf_executor.max_workers * 2
+    sink = _ChunkSink()
+    pending = {}
+    errors = []
+
+    def add_finished(done):
+        for task in done:
+            entry = pending.pop(task)
+            try:
+                content = task.result()
+            except Exception as exc:
+                errors.append(f"{entry}: {exc or exc.__class__.__name__}")
+                continue
+            if not content:
+                errors.append(f"{entry}: no data")
+                continue
+            archive.writestr(entry, content)
+
+    # PDF page streams are already compressed, so entries are stored as-is
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_STORED) as archive:
+        try:
+            async for student in students:
+                task = asyncio.ensure_future(_render_student_document(kind, student))
+                pending[task] = _bulk_entry_name(kind, student)
+                if len(pending) >= window:
+                    done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    add_finished(done)
+                    yield sink.drain()
+
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                add_finished(done)
+                yield sink.drain()
+
+            if errors:
+                archive.writestr("errors.txt", "\n".join(errors) + "\n")
+        finally:
+            # Client went away mid-download: stop outstanding renders
+            for task in pending:
+                task.cancel()
+    yield sink.drain()
+
+# ---- Background report jobs (see app.core.jobs) ----
+
+REPORT_JOB_TYPES = {"attendance", "marks", "mentor-summary", "transcript", "certificate"}
+REPORT_JOB_FORMATS = {
+    "attendance": {"pdf", "excel", "csv", "ndjson"},
+    "marks": {"pdf", "excel", "csv", "ndjson"},
+    "mentor-summary": {"pdf", "excel"},
+    "transcript": {"pdf", "excel"},
+    "certificate": {"pdf"},
+}
+FORMAT_EXTENSIONS = {"pdf": "pdf", "excel": "xlsx", "csv": "csv", "ndjson": "ndjson"}
+FORMAT_MEDIA_TYPES = {
+    "pdf": "application/pdf",
+    "excel": EXCEL_MEDIA_TYPE,
+    "csv": CSV_MEDIA_TYPE,
+    "ndjson": NDJSON_MEDIA_TYPE,
+}
+
+async def _with_progress(rows, total: int, job):
+    """Passes documents through while reporting progress to the job."""
+    done = 0
+    async for doc in rows:
+        done += 1
+        if total:
+            await job.set_progress(done / total)
+        yield doc
+
+def _write_chunk(fileobj, chunk: bytes):
+    fileobj.write(chunk)
+
+async def _stream_to_file(job, format: str, collection: str, columns: list, student_id: str = None):
+    """Writes a streamed export straight to the job's output file."""
+    query = _report_query(student_id)
+    source = attendance_reads(db) if collection == "attendance" else db[collection]
+    total = await source.count_documents(query)
+    if not total:
+        raise ValueError(f"No {collection} data found")
+
+    cursor = source.find(query, {"_id": 0}).batch_size(EXPORT_BATCH_SIZE)
+    rows = _with_progress(cursor, total, job)
+    path = job.output_path(FORMAT_EXTENSIONS[format])
+
+    if format == "excel":
+        spool = await write_excel_spool(rows, columns, collection.capitalize())
+        with spool, open(path, "wb") as out:
+            await asyncio.to_thread(shutil.copyfileobj, spool, out)
+        return path
+
+    chunks = iter_csv(rows, columns) if format == "csv" else iter_ndjson(rows)
+    with open(path, "wb") as out:
+        async for chunk in chunks:
+            await asyncio.to_thread(_write_chunk, out, chunk)
+    return path
+
+async def run_report_job(job) -> dict:
+    """
+    JobManager handler. job.params holds type, format and the resolved
+    student_id / mentor_id (authorization is checked when the job is submitted).
+    """
+    report_type = job.params["type"]
+    format = job.params["format"]
+    student_id = job.params.get("student_id")
+    basename = report_type.replace("-", "_")
+
+    if report_type in ("attendance", "marks") and format != "pdf":
+        columns = ATTENDANCE_COLUMNS if report_type == "attendance" else MARKS_COLUMNS
+        path = await _stream_to_file(job, format, report_type, columns, student_id)
+    else:
+        if report_type == "attendance":
+            content = await generate_attendance_report(format, student_id)
+        elif report_type == "marks":
+            content = await generate_marks_report(format, student_id)
+        elif report_type == "mentor-summary":
+            content = await generate_mentor_summary_report(format, job.params["mentor_id"])
+        elif report_type == "transcript":
+            content = await generate_transcript_report(format, student_id)
+        else:
+            content = await generate_certificate_report(format, student_id)
+
+        if not content:
+            raise ValueError(f"No {report_type.replace('-', ' ')} data found")
+        path = job.output_path(FORMAT_EXTENSIONS[format])
+        await asyncio.to_thread(path.write_bytes, content)
+
+    return {
+        "result_path": str(path),
+        "filename": f"{basename}_report.{FORMAT_EXTENSIONS[format]}",
+        "media_type": FORMAT_MEDIA_TYPES[format],
+    }
@@ -7,6 +7,7 @@ import os
 from pathlib import Path
 from dotenv import load_dotenv
 from motor.motor_asyncio import AsyncIOMotorClient
+from app.core.metrics import MongoPoolListener, MongoCommandListener
 
 # Load env HERE (central place)
 # Load .env ONLY for local development
@@ -20,5 +21,10 @@ DB_NAME = os.getenv("DB_NAME", "testdb")
 if not MONGO_URL:
     raise RuntimeError("MONGO_URL not set in environment (.env)")
 
-client = AsyncIOMotorClient(MONGO_URL)
+# tz_aware: dates come back as UTC-aware datetimes, comparable with parsed ISO strings
+client = AsyncIOMotorClient(
+    MONGO_URL,
+    tz_aware=True,
+    event_listeners=[MongoPoolListener(), MongoCommandListener()],
+)
 db = client[DB_NAME]
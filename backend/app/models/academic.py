@@ -1,6 +1,6 @@
 import uuid
-from datetime import datetime, timezone
-from typing import Optional
+from datetime import date, datetime, timezone
+from typing import List, Optional
 from pydantic import BaseModel, Field, ConfigDict
 
 class AttendanceCreate(BaseModel):
@@ -9,6 +9,16 @@ class AttendanceCreate(BaseModel):
     date: str
     status: str  # present, absent, leave
 
+class AttendanceBulkEntry(BaseModel):
+    student_id: str
+    status: str  # present, absent, leave
+
+class AttendanceBulkCreate(BaseModel):
+    """Payload schema for marking a whole class for one subject and date."""
+    subject: str
+    date: date
+    records: List[AttendanceBulkEntry] = Field(..., min_length=1, max_length=1000)
+
 class AttendanceRecord(BaseModel):
     """Schema for an individual attendance record."""
     model_config = ConfigDict(extra="ignore")
@@ -0,0 +1,32 @@
+import uuid
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any, List
+from pydantic import BaseModel, Field, ConfigDict
+
+class Job(BaseModel):
+    """Schema for a background job (report export, bulk import)."""
+    model_config = ConfigDict(extra="ignore")
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    type: str
+    owner_id: str
+    status: str = "queued"  # queued, running, completed, failed
+    progress: float = 0.0  # 0..1
+    params: Dict[str, Any] = Field(default_factory=dict)
+    error: Optional[str] = None
+    result_path: Optional[str] = None
+    filename: Optional[str] = None
+    media_type: Optional[str] = None
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+class ReportJobCreate(BaseModel):
+    """Payload schema for requesting a report export job."""
+    type: str  # attendance, marks, mentor-summary, transcript, certificate
+    format: str  # pdf, excel, csv, ndjson
+    filters: Dict[str, Any] = Field(default_factory=dict)  # e.g. {"student_id": "..."}
+
+class AnalyticsExportCreate(BaseModel):
+    """Payload schema for an admin Parquet analytics export."""
+    collections: Optional[List[str]] = None  # default: every supported collection
+    partition_by: Optional[str] = "department"  # department, semester or None
@@ -4,6 +4,7 @@ Modularized, decentralized architecture.
 """
 import os
 import uuid
+import asyncio
 import logging
 from pathlib import Path
 from dotenv import load_dotenv
@@ -19,6 +20,11 @@ import app.sio_events # Register Socket.IO handlers
 # Import the centralized router
 from app.api.v1.routes import router as api_v1_router
 from app.core.config import settings
+from app.core.metrics import MetricsMiddleware, monitor_event_loop_lag
+from app.core.executors import shutdown_executors
+from app.core.jobs import fail_orphaned_jobs, shutdown_job_managers, sweep_job_results_periodically
+from app.core.indexes import ensure_indexes
+from app.core.attendance_store import ensure_sessions_view
 
 ROOT_DIR = Path(__file__).resolve().parent.parent
 load_dotenv(ROOT_DIR / ".env")
@@ -43,8 +49,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],  # read by paginated academic record lists
 )
 
+# Request latency / in-flight metrics (outermost, so CORS preflights are counted too)
+app.add_middleware(MetricsMiddleware)
+
 # Include Centralized API Router
 app.include_router(api_v1_router)
 
@@ -56,6 +66,30 @@ app.mount("/uploads", StaticFiles(directory=str(uploads_dir)), name="uploads")
 # Wrap with Socket.IO ASGI application
 socket_app = socketio.ASGIApp(sio, app)
 
+@app.on_event("startup")
+async def create_indexes():
+    await ensure_indexes()
+    await ensure_sessions_view()
+    await fail_orphaned_jobs()
+
+@app.on_event("startup")
+async def start_background_monitors():
+    app.state.loop_lag_task = asyncio.create_task(monitor_event_loop_lag())
+    app.state.job_sweep_task = asyncio.create_task(sweep_job_results_periodically())
+
+@app.on_event("shutdown")
+async def stop_background_monitors():
+    for name in ("loop_lag_task", "job_sweep_task"):
+        task = getattr(app.state, name, None)
+        if task:
+            task.cancel()
+
+@app.on_event("shutdown")
+async def stop_worker_pools():
+    await shutdown_job_managers()
+    # Joining worker processes blocks, so do it off the loop
+    await asyncio.to_thread(shutdown_executors)
+
 @app.get("/")
 async def root():
     return {
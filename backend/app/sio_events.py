@@ -1,7 +1,8 @@
-from datetime import datetime, timezone
 import uuid
 from app.sio_instance import sio, connected_users
 from app.db import db
+from app.core.metrics import socketio_connected_clients
+from app.core.dates import utc_now, to_json
 
 # ==================== Socket.IO Events ====================
 
@@ -9,6 +10,7 @@ from app.db import db
 async def connect(sid, environ):
     """Handles new client connections."""
     print(f"Client connected: {sid}")
+    socketio_connected_clients.inc()
     
     # Extract user_id from query params: /socket.io/?user_id=123
     # Note: Logic here handles the auto-connect if query param is present
@@ -29,6 +31,7 @@ async def connect(sid, environ):
 async def disconnect(sid):
     """Handles client disconnections."""
     print(f"Client disconnected: {sid}")
+    socketio_connected_clients.dec()
     # Remove from connected users
     for user_id, user_sid in list(connected_users.items()):
         if user_sid == sid:
@@ -64,16 +67,18 @@ async def send_message(sid, data):
         "receiver_id": receiver_id,
         "content": content,
         "is_read": False,
-        "created_at": datetime.now(timezone.utc).isoformat(),
+        "created_at": utc_now(),
     }
 
     # Save to database
     await db.messages.insert_one(message_data)
+    message_data.pop("_id", None)
+    payload = to_json(message_data)
 
     # Emit to receiver if online
     receiver_sid = connected_users.get(receiver_id)
     if receiver_sid:
-        await sio.emit("new_message", message_data, room=receiver_sid)
+        await sio.emit("new_message", payload, room=receiver_sid)
 
     # Emit back to sender (confirmation/update UI)
-    await sio.emit("message_sent", message_data, room=sid)
+    await sio.emit("message_sent", payload, room=sid)
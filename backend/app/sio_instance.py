@@ -1,8 +1,18 @@
 import socketio
 from typing import Dict
+from app.core.metrics import socketio_emits_total
+
+
+class InstrumentedAsyncServer(socketio.AsyncServer):
+    """AsyncServer that counts every emitted event for the metrics endpoint."""
+
+    async def emit(self, event, *args, **kwargs):
+        socketio_emits_total.inc(event=event)
+        return await super().emit(event, *args, **kwargs)
+
 
 # Socket.IO setup
-sio = socketio.AsyncServer(async_mode="asgi", cors_allowed_origins="*")
+sio = InstrumentedAsyncServer(async_mode="asgi", cors_allowed_origins="*")
 sio_app = socketio.ASGIApp(sio)
 
 # In-memory store for connected users: user_id -> sid
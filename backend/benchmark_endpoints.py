@@ -0,0 +1,239 @@
+"""
+Endpoint benchmark runner.
+
+Runs the FastAPI app in-process (no network hop) against the database
+configured by MONGO_URL / DB_NAME, hits every stats, report and portfolio
+endpoint as the synthetic admin / mentor / student created by
+seed_scale_data.py, and records p50/p95 latency plus peak RSS to JSON.
+
+The "login" group posts to /api/auth/login as distinct synthetic students,
+--concurrency at a time, and also reports logins per second, which is the
+number to size PASSWORD_VERIFY_WORKERS against.
+
+Examples:
+    python benchmark_endpoints.py --iterations 10 --output benchmarks/baseline.json
+    python benchmark_endpoints.py --only stats --compare benchmarks/baseline.json
+    python benchmark_endpoints.py --only login --iterations 200 --concurrency 50
+"""
+import argparse
+import asyncio
+import json
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+
+from app.db import db
+from app.core.auth import create_access_token
+
+ROOT_DIR = Path(__file__).resolve().parent
+
+# (group, role, path template). {student_id} resolves to a mentee of the benchmarked mentor.
+ENDPOINTS = [
+    ("stats", "admin", "/api/stats/admin"),
+    ("stats", "admin", "/api/stats/admin/mentor-load"),
+    ("stats", "admin", "/api/stats/admin/students-by-department"),
+    ("stats", "admin", "/api/stats/admin/user-growth"),
+    ("stats", "mentor", "/api/stats/mentor"),
+    ("stats", "mentor", "/api/stats/mentor/mentees-performance"),
+    ("stats", "mentor", "/api/stats/mentor/dashboard-overview"),
+    ("stats", "student", "/api/stats/student"),
+    ("stats", "student", "/api/stats/student/performance"),
+    ("reports", "student", "/api/reports/attendance?format=pdf"),
+    ("reports", "student", "/api/reports/attendance?format=excel"),
+    ("reports", "student", "/api/reports/marks?format=pdf"),
+    ("reports", "student", "/api/reports/marks?format=excel"),
+    ("reports", "admin", "/api/reports/attendance?format=excel"),
+    ("reports", "mentor", "/api/reports/mentor-summary?format=pdf"),
+    ("reports", "mentor", "/api/reports/mentor-summary?format=excel"),
+    ("reports", "student", "/api/reports/transcript?format=pdf"),
+    ("reports", "student", "/api/reports/certificate?format=pdf"),
+    ("portfolio", "mentor", "/api/portfolio/analysis/{student_id}"),
+    ("portfolio", "mentor", "/api/portfolio/stats/peer-comparison/{student_id}"),
+    ("portfolio", "mentor", "/api/portfolio/certifications/{student_id}"),
+    ("portfolio", "mentor", "/api/portfolio/projects/{student_id}"),
+    ("portfolio", "admin", "/api/portfolio/analysis/batch/all"),
+]
+
+LOGIN_PATH = "/api/auth/login"
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process (the app runs in-process)."""
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    return round(usage / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def percentile(samples, pct: float) -> float:
+    if len(samples) == 1:
+        return samples[0]
+    return statistics.quantiles(samples, n=100, method="inclusive")[int(pct) - 1]
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, text=True).strip()
+    except Exception:
+        return "unknown"
+
+
+async def resolve_actors():
+    """Picks the synthetic admin, the first synthetic mentor with mentees, and one of its students."""
+    admin = await db.users.find_one({"id": "syn-admin"}, {"id": 1})
+    assignment = await db.assignments.find_one(
+        {"synthetic": True, "student_ids.0": {"$exists": True}}, {"mentor_id": 1, "student_ids": 1}
+    )
+    if not admin or not assignment:
+        raise SystemExit("No synthetic dataset found. Run seed_scale_data.py first.")
+    return {
+        "admin": admin["id"],
+        "mentor": assignment["mentor_id"],
+        "student": assignment["student_ids"][0],
+    }
+
+
+async def dataset_summary() -> dict:
+    names = ["users", "assignments", "attendance", "marks", "certifications", "projects",
+             "letters", "messages", "notifications"]
+    counts = {}
+    for name in names:
+        counts[name] = await db[name].estimated_document_count()
+    return counts
+
+
+async def time_endpoint(client, path, token, iterations, concurrency, send=None):
+    """Latency stats for `iterations` requests; `send(i)` replaces the default authenticated GET."""
+    latencies, errors, status_codes = [], 0, set()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            if send:
+                response = await send(i)
+            else:
+                response = await client.get(path, headers={"Authorization": f"Bearer {token}"})
+            # Drain streamed bodies so the full response cost is measured
+            await response.aread()
+            latencies.append((time.perf_counter() - started) * 1000)
+            status_codes.add(response.status_code)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(iterations)))
+    elapsed = time.perf_counter() - started
+    return {
+        "p50_ms": round(percentile(sorted(latencies), 50), 2),
+        "p95_ms": round(percentile(sorted(latencies), 95), 2),
+        "mean_ms": round(statistics.fmean(latencies), 2),
+        "max_ms": round(max(latencies), 2),
+        "iterations": iterations,
+        "errors": errors,
+        "status_codes": sorted(status_codes),
+        "requests_per_second": round(iterations / elapsed, 1) if elapsed else None,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+async def time_logins(client, iterations, concurrency, password):
+    """Login latency as distinct synthetic students, so no response is served from a warm user."""
+    students = await db.users.find(
+        {"synthetic": True, "role": "student"}, {"_id": 0, "email": 1}
+    ).limit(iterations).to_list(iterations)
+    if not students:
+        raise SystemExit("No synthetic students found. Run seed_scale_data.py first.")
+
+    def send(i):
+        return client.post(LOGIN_PATH, json={"email": students[i % len(students)]["email"], "password": password})
+
+    await send(0)
+    return await time_endpoint(client, LOGIN_PATH, None, iterations, concurrency, send)
+
+
+def compare(results: dict, baseline_path: Path, tolerance: float) -> int:
+    """Prints p95 deltas against a previous run; returns the number of regressions."""
+    baseline = json.loads(baseline_path.read_text())["endpoints"]
+    regressions = 0
+    print(f"\nComparison against {baseline_path} (tolerance {tolerance:.0%}):")
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        ratio = current["p95_ms"] / previous["p95_ms"] if previous["p95_ms"] else 1.0
+        flag = "REGRESSION" if ratio > 1 + tolerance else ""
+        regressions += bool(flag)
+        print(f"  {name:<70} {previous['p95_ms']:>9.1f} -> {current['p95_ms']:>9.1f} ms  x{ratio:4.2f} {flag}")
+    return regressions
+
+
+async def run(args) -> int:
+    from app.server import app  # imported late so --help works without a database
+
+    actors = await resolve_actors()
+    tokens = {role: create_access_token(data={"sub": uid}) for role, uid in actors.items()}
+    endpoints = [e for e in ENDPOINTS if not args.only or e[0] in args.only]
+    include_login = not args.only or "login" in args.only
+
+    results = {}
+    # Failing endpoints are recorded as errors instead of aborting the whole run
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+        for group, role, template in endpoints:
+            path = template.format(student_id=actors["student"])
+            name = f"{role} GET {template}"
+            # One warm-up request so connection setup is not counted
+            await client.get(path, headers={"Authorization": f"Bearer {tokens[role]}"})
+            stats = await time_endpoint(client, path, tokens[role], args.iterations, args.concurrency)
+            results[name] = stats
+            print(f"  {name:<70} p50 {stats['p50_ms']:>9.1f} ms  p95 {stats['p95_ms']:>9.1f} ms  "
+                  f"rss {stats['peak_rss_mb']:>7.1f} MB  errors {stats['errors']}")
+        if include_login:
+            name = f"student POST {LOGIN_PATH}"
+            stats = await time_logins(client, args.iterations, args.concurrency, args.password)
+            results[name] = stats
+            print(f"  {name:<70} p50 {stats['p50_ms']:>9.1f} ms  p95 {stats['p95_ms']:>9.1f} ms  "
+                  f"{stats['requests_per_second']:>7.1f} logins/s  errors {stats['errors']}")
+
+    report = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "iterations": args.iterations,
+        "concurrency": args.concurrency,
+        "dataset": await dataset_summary(),
+        "endpoints": results,
+    }
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"\nWrote {output}")
+
+    if args.compare:
+        return 1 if compare(results, Path(args.compare), args.tolerance) else 0
+    return 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=1, help="Concurrent requests per endpoint")
+    parser.add_argument("--only", nargs="*", choices=sorted({e[0] for e in ENDPOINTS} | {"login"}),
+                        help="Restrict to these endpoint groups")
+    parser.add_argument("--output", default=str(ROOT_DIR / "benchmarks" / "baseline.json"))
+    parser.add_argument("--compare", help="Previous JSON result to diff p95 latencies against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed p95 slowdown before flagging")
+    parser.add_argument("--password", default="pass123", help="Synthetic users' password (seed_scale_data.py --password)")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(run(parse_args())))
@@ -0,0 +1,45 @@
+"""
+Removes duplicate attendance and marks records left by earlier re-uploads,
+keeping the most recently created record for each natural key, then builds
+the unique indexes that keep them from coming back.
+
+    python dedupe_academic_records.py            # report only
+    python dedupe_academic_records.py --apply    # delete duplicates and create indexes
+"""
+import argparse
+import asyncio
+
+from app.db import db
+from app.core.indexes import ensure_indexes
+from app.core.ingest import NATURAL_KEYS
+
+
+async def dedupe(collection: str, apply: bool) -> int:
+    key = NATURAL_KEYS[collection]
+    pipeline = [
+        {"$sort": {"created_at": -1}},
+        {"$group": {"_id": {k: f"${k}" for k in key}, "ids": {"$push": "$_id"}, "count": {"$sum": 1}}},
+        {"$match": {"count": {"$gt": 1}}},
+    ]
+    removed = 0
+    async for group in db[collection].aggregate(pipeline, allowDiskUse=True):
+        extra = group["ids"][1:]
+        removed += len(extra)
+        if apply:
+            await db[collection].delete_many({"_id": {"$in": extra}})
+    return removed
+
+
+async def main(apply: bool):
+    for collection in NATURAL_KEYS:
+        removed = await dedupe(collection, apply)
+        print(f"{collection}: {removed} duplicate record(s) {'removed' if apply else 'found'}")
+    if apply:
+        await ensure_indexes()
+        print("Unique indexes ensured.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--apply", action="store_true", help="Delete duplicates (default: report only)")
+    asyncio.run(main(parser.parse_args().apply))
@@ -0,0 +1,60 @@
+"""
+Copies per-class attendance records into monthly documents
+(see app/core/attendance_store.py).
+
+    python migrate_attendance_monthly.py            # report only
+    python migrate_attendance_monthly.py --apply    # write attendance_monthly
+
+Records are streamed from `attendance` and written with the same upserts the
+app uses, so re-running is harmless and records added meanwhile are picked up
+by running it again. Set ATTENDANCE_STORAGE=monthly once it has finished; the
+`attendance` collection is left in place and can be dropped after checking
+the new totals.
+"""
+import argparse
+import asyncio
+
+from app.db import db
+from app.core.attendance_store import MONTHLY_COLLECTION, STATUS_CODES, WRITE_BATCH_SIZE, session_date, upsert_months
+from app.core.indexes import ensure_indexes
+
+
+async def main(apply: bool):
+    records = await db.attendance.estimated_document_count()
+    months = await db.attendance.aggregate([
+        {"$group": {"_id": {"student_id": "$student_id", "subject": "$subject", "month": {"$substrCP": ["$date", 0, 7]}}}},
+        {"$count": "months"},
+    ], allowDiskUse=True).to_list(1)
+    print(f"attendance: {records} record(s) -> {months[0]['months'] if months else 0} monthly document(s)")
+    if not apply:
+        return
+
+    await ensure_indexes()
+    copied = skipped = 0
+    batch = []
+    cursor = db.attendance.find({}, {"_id": 0, "student_id": 1, "subject": 1, "date": 1, "status": 1,
+                                     "recorded_by": 1, "created_at": 1})
+    async for record in cursor.batch_size(WRITE_BATCH_SIZE):
+        try:
+            session_date(record)
+        except (KeyError, ValueError):
+            skipped += 1
+            continue
+        if record.get("status") not in STATUS_CODES:
+            skipped += 1
+            continue
+        batch.append(record)
+        if len(batch) >= WRITE_BATCH_SIZE:
+            await upsert_months(db[MONTHLY_COLLECTION], batch)
+            copied += len(batch)
+            batch = []
+    if batch:
+        await upsert_months(db[MONTHLY_COLLECTION], batch)
+        copied += len(batch)
+    print(f"{copied} record(s) copied, {skipped} skipped (unparseable date or status)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--apply", action="store_true", help="Write monthly documents (default: report only)")
+    asyncio.run(main(parser.parse_args().apply))
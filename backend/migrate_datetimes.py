@@ -0,0 +1,75 @@
+"""
+Converts timestamps stored as ISO-8601 strings to native BSON dates.
+
+    python migrate_datetimes.py            # report only
+    python migrate_datetimes.py --apply    # convert in place
+
+The conversion runs server-side ($dateFromString in an update pipeline), in
+batches of _ids so each update stays short. A value that does not parse is
+left untouched. Readers accept both forms (see app/core/dates.py), so the app
+can keep running while this is in progress, and re-running it is harmless.
+"""
+import argparse
+import asyncio
+
+from app.db import db
+
+BATCH_SIZE = 5000
+
+# collection -> string timestamp fields to convert
+FIELDS = {
+    "users": ["created_at"],
+    "assignments": ["created_at", "updated_at"],
+    "appointments": ["created_at", "updated_at"],
+    "attendance": ["created_at"],
+    "marks": ["created_at"],
+    "subjects": ["created_at"],
+    "certifications": ["created_at"],
+    "projects": ["created_at"],
+    "sports": ["created_at"],
+    "cultural": ["created_at"],
+    "letters": ["created_at", "submitted_date"],
+    "feedback": ["created_at"],
+    "circulars": ["created_at"],
+    "ratings": ["created_at"],
+    "messages": ["created_at"],
+    "notifications": ["created_at"],
+}
+
+
+def _convert(field: str) -> dict:
+    return {"$dateFromString": {"dateString": f"${field}", "onError": f"${field}"}}
+
+
+async def migrate_field(collection: str, field: str, apply: bool) -> int:
+    query = {field: {"$type": "string"}}
+    if not apply:
+        return await db[collection].count_documents(query)
+
+    converted = 0
+    last_id = None
+    while True:
+        # Walk _id order so strings that fail to parse are not fetched again
+        page = query if last_id is None else {**query, "_id": {"$gt": last_id}}
+        cursor = db[collection].find(page, {"_id": 1}).sort("_id", 1).limit(BATCH_SIZE)
+        batch = [doc["_id"] async for doc in cursor]
+        if not batch:
+            return converted
+        result = await db[collection].update_many(
+            {"_id": {"$in": batch}, **query}, [{"$set": {field: _convert(field)}}]
+        )
+        converted += result.modified_count
+        last_id = batch[-1]
+
+
+async def main(apply: bool):
+    for collection, fields in FIELDS.items():
+        for field in fields:
+            count = await migrate_field(collection, field, apply)
+            print(f"{collection}.{field}: {count} string value(s) {'converted' if apply else 'found'}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--apply", action="store_true", help="Convert values (default: report only)")
+    asyncio.run(main(parser.parse_args().apply))
@@ -0,0 +1,307 @@
+"""
+Scale-realistic synthetic dataset generator.
+
+Bulk-inserts a parameterized institution (students, mentors, assignments,
+subjects, attendance, marks, portfolio items, messages, notifications) so
+stats / analytics / report endpoints can be exercised at production volume.
+
+Every generated document carries `"synthetic": True` and deterministic ids
+(`syn-student-000042`, `syn-mentor-0007`, `syn-admin`), so the dataset can be
+removed with --drop and targeted by benchmark_endpoints.py.
+
+Examples:
+    python seed_scale_data.py --students 2000 --mentors 40 --attendance-days 60
+    python seed_scale_data.py --students 20000 --mentors 400 --attendance-days 100   # ~10M attendance rows
+"""
+import argparse
+import asyncio
+import random
+import time
+import uuid
+from datetime import datetime, timezone, timedelta
+from typing import Dict, Iterable, List
+
+from app.db import db
+from app.core.auth import get_password_hash
+
+SYNTHETIC = {"synthetic": True}
+COLLECTIONS = [
+    "users", "assignments", "subjects", "attendance", "marks", "certifications",
+    "projects", "letters", "sports", "cultural", "feedback", "messages", "notifications",
+]
+DEPARTMENTS = [
+    "Computer Science", "Information Science", "Electronics", "Mechanical",
+    "Civil", "Electrical", "Biotechnology", "Chemical",
+]
+MARKS_TYPES = [("IA1", 30), ("IA2", 30), ("IA3", 30), ("Assignment", 10), ("VTU", 100)]
+ATTENDANCE_STATUSES = ("present", "absent", "leave")
+SKILLS = ["Cloud", "AI", "Web", "Data", "Security", "Mobile"]
+
+
+def student_id(i: int) -> str:
+    return f"syn-student-{i:06d}"
+
+
+def mentor_id(i: int) -> str:
+    return f"syn-mentor-{i:04d}"
+
+
+def _batched(docs: Iterable[dict], size: int) -> Iterable[List[dict]]:
+    batch = []
+    for doc in docs:
+        batch.append(doc)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def bulk_insert(collection: str, docs: Iterable[dict], batch_size: int, concurrency: int) -> int:
+    """Inserts `docs` in unordered batches with up to `concurrency` batches in flight."""
+    semaphore = asyncio.Semaphore(concurrency)
+    pending = set()
+    inserted = 0
+    started = time.perf_counter()
+
+    async def insert(batch):
+        nonlocal inserted
+        try:
+            await db[collection].insert_many(batch, ordered=False)
+            inserted += len(batch)
+        finally:
+            semaphore.release()
+
+    for batch in _batched(docs, batch_size):
+        await semaphore.acquire()
+        task = asyncio.create_task(insert(batch))
+        pending.add(task)
+        task.add_done_callback(pending.discard)
+    if pending:
+        await asyncio.gather(*pending)
+
+    elapsed = time.perf_counter() - started
+    rate = inserted / elapsed if elapsed else inserted
+    print(f"  {collection:<15} {inserted:>12,} docs  {elapsed:8.1f}s  ({rate:,.0f}/s)")
+    return inserted
+
+
+class SyntheticInstitution:
+    """Deterministic (seeded) description of the generated dataset."""
+
+    def __init__(self, args):
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.now = datetime.now(timezone.utc)
+        self.departments = DEPARTMENTS[: args.departments]
+        self.password_hash = get_password_hash(args.password)
+        # Per-department, per-semester subject names
+        self.subjects: Dict[tuple, List[str]] = {
+            (dept, sem): [f"{dept[:3].upper()}{sem}0{k + 1} Subject {k + 1}" for k in range(args.subjects)]
+            for dept in self.departments for sem in range(1, 9)
+        }
+
+    def student_profile(self, i: int) -> dict:
+        rng = random.Random(self.args.seed * 1_000_003 + i)
+        return {
+            "department": self.departments[i % len(self.departments)],
+            "semester": rng.randint(1, 8),
+            # A per-student "ability" keeps attendance and marks correlated, so risk buckets are realistic
+            "ability": min(max(rng.gauss(0.72, 0.15), 0.2), 0.99),
+        }
+
+    def users(self) -> Iterable[dict]:
+        yield {
+            **SYNTHETIC, "id": "syn-admin", "email": "admin@synthetic.local", "full_name": "Synthetic Admin",
+            "role": "admin", "password_hash": self.password_hash, "created_at": self.now, "settings": {},
+        }
+        for m in range(self.args.mentors):
+            yield {
+                **SYNTHETIC, "id": mentor_id(m), "email": f"mentor{m}@synthetic.local",
+                "full_name": f"Mentor {m}", "role": "mentor",
+                "department": self.departments[m % len(self.departments)],
+                "employee_id": f"EMP{m:05d}", "password_hash": self.password_hash,
+                "created_at": self.now - timedelta(days=self.rng.randint(0, 720)), "settings": {},
+            }
+        for i in range(self.args.students):
+            profile = self.student_profile(i)
+            yield {
+                **SYNTHETIC, "id": student_id(i), "email": f"student{i}@synthetic.local",
+                "full_name": f"Student {i}", "role": "student",
+                "department": profile["department"], "semester": profile["semester"],
+                "usn": f"1SY{i:07d}", "password_hash": self.password_hash,
+                "created_at": self.now - timedelta(days=self.rng.randint(0, 720)), "settings": {},
+            }
+
+    def assignments(self) -> Iterable[dict]:
+        per_mentor: Dict[int, List[str]] = {}
+        for i in range(self.args.students):
+            per_mentor.setdefault(i % max(self.args.mentors, 1), []).append(student_id(i))
+        for m, ids in per_mentor.items():
+            yield {**SYNTHETIC, "id": str(uuid.uuid4()), "mentor_id": mentor_id(m),
+                   "student_ids": ids, "created_at": self.now}
+
+    def subject_docs(self) -> Iterable[dict]:
+        for (dept, sem), names in self.subjects.items():
+            for k, name in enumerate(names):
+                yield {**SYNTHETIC, "id": str(uuid.uuid4()), "code": f"{dept[:3].upper()}{sem}0{k + 1}",
+                       "name": name, "department": dept, "semester": sem, "credits": 4,
+                       "created_by": "syn-admin", "created_at": self.now}
+
+    def attendance(self) -> Iterable[dict]:
+        start = self.now - timedelta(days=self.args.attendance_days * 7 // 5 + 1)
+        for i in range(self.args.students):
+            profile = self.student_profile(i)
+            rng = random.Random(i)
+            present_w = min(profile["ability"] + 0.1, 0.98)
+            weights = [present_w, (1 - present_w) * 0.8, (1 - present_w) * 0.2]
+            subjects = self.subjects[(profile["department"], profile["semester"])]
+            day, sessions = start, 0
+            while sessions < self.args.attendance_days:
+                day += timedelta(days=1)
+                if day.weekday() >= 5:
+                    continue
+                sessions += 1
+                date = day.strftime("%Y-%m-%d")
+                for subject in subjects:
+                    yield {
+                        **SYNTHETIC, "id": str(uuid.uuid4()), "student_id": student_id(i),
+                        "subject": subject, "date": date,
+                        "status": rng.choices(ATTENDANCE_STATUSES, weights)[0],
+                        "recorded_by": mentor_id(i % max(self.args.mentors, 1)),
+                        "created_at": day,
+                    }
+
+    def marks(self) -> Iterable[dict]:
+        for i in range(self.args.students):
+            profile = self.student_profile(i)
+            rng = random.Random(i + 7)
+            for sem in range(1, profile["semester"] + 1):
+                for subject in self.subjects[(profile["department"], sem)]:
+                    for marks_type, max_marks in MARKS_TYPES:
+                        score = min(max(rng.gauss(profile["ability"], 0.1), 0), 1) * max_marks
+                        yield {
+                            **SYNTHETIC, "id": str(uuid.uuid4()), "student_id": student_id(i),
+                            "subject": subject, "semester": sem, "marks_type": marks_type,
+                            "marks_obtained": round(score, 1), "max_marks": float(max_marks),
+                            "recorded_by": mentor_id(i % max(self.args.mentors, 1)),
+                            "created_at": self.now - timedelta(days=(8 - sem) * 180 + rng.randint(0, 150)),
+                        }
+
+    def portfolio(self, collection: str) -> Iterable[dict]:
+        per_student = self.args.portfolio_items
+        for i in range(self.args.students):
+            rng = random.Random(f"{collection}-{i}")
+            for k in range(rng.randint(0, per_student)):
+                base = {**SYNTHETIC, "id": str(uuid.uuid4()), "student_id": student_id(i),
+                        "created_at": self.now - timedelta(days=rng.randint(0, 700))}
+                if collection == "certifications":
+                    base.update(certificate_name=f"Certificate {k}", platform="Coursera",
+                                completion_date=self.now.strftime("%Y-%m-%d"),
+                                skill_category=rng.choice(SKILLS), is_verified=rng.random() < 0.6)
+                elif collection == "projects":
+                    base.update(title=f"Project {k}", description="Synthetic project",
+                                tech_stack=rng.sample(SKILLS, 2), role="Developer",
+                                project_type=rng.choice(["Mini", "Major", "Hackathon"]),
+                                mentor_score=round(rng.uniform(4, 10), 1) if rng.random() < 0.5 else None)
+                elif collection == "letters":
+                    base.update(letter_type=rng.choice(["Apology", "Improvement"]), reason="Synthetic",
+                                content="Synthetic letter", submitted_date=base["created_at"],
+                                status=rng.choice(["pending", "accepted", "rejected"]))
+                elif collection == "sports":
+                    base.update(sport_name=rng.choice(["Cricket", "Football", "Chess"]),
+                                level=rng.choice(["College", "State"]))
+                elif collection == "cultural":
+                    base.update(activity_name="Fest", activity_type=rng.choice(["Dance", "Music", "Drama"]))
+                yield base
+
+    def feedback(self) -> Iterable[dict]:
+        for i in range(self.args.students):
+            rng = random.Random(f"fb-{i}")
+            for _ in range(rng.randint(0, 4)):
+                yield {**SYNTHETIC, "id": str(uuid.uuid4()), "mentor_id": mentor_id(i % max(self.args.mentors, 1)),
+                       "student_id": student_id(i), "feedback_text": "Keep it up.",
+                       "created_at": self.now - timedelta(days=rng.randint(0, 365))}
+
+    def messages(self) -> Iterable[dict]:
+        for k in range(self.args.messages):
+            i = self.rng.randrange(max(self.args.students, 1))
+            mentor, student = mentor_id(i % max(self.args.mentors, 1)), student_id(i)
+            sender, receiver = (mentor, student) if k % 2 else (student, mentor)
+            yield {**SYNTHETIC, "id": str(uuid.uuid4()), "sender_id": sender, "receiver_id": receiver,
+                   "content": f"Synthetic message {k}", "is_read": self.rng.random() < 0.7,
+                   "created_at": self.now - timedelta(minutes=self.rng.randint(0, 525_600))}
+
+    def notifications(self) -> Iterable[dict]:
+        for i in range(self.args.students):
+            rng = random.Random(f"ntf-{i}")
+            for k in range(self.args.notifications_per_user):
+                yield {**SYNTHETIC, "id": str(uuid.uuid4()), "user_id": student_id(i),
+                       "title": f"Notification {k}", "message": "Synthetic notification",
+                       "type": rng.choice(["info", "warning", "success"]), "link": None,
+                       "read": rng.random() < 0.5, "metadata": {},
+                       "created_at": self.now - timedelta(hours=rng.randint(0, 8760))}
+
+
+async def drop_synthetic():
+    print("Removing previous synthetic data...")
+    for collection in COLLECTIONS:
+        result = await db[collection].delete_many(SYNTHETIC)
+        if result.deleted_count:
+            print(f"  {collection:<15} {result.deleted_count:>12,} removed")
+
+
+async def seed(args):
+    if args.drop:
+        await drop_synthetic()
+
+    inst = SyntheticInstitution(args)
+    expected_attendance = args.students * args.subjects * args.attendance_days
+    print(
+        f"Seeding {args.students:,} students, {args.mentors:,} mentors, "
+        f"~{expected_attendance:,} attendance rows (batch={args.batch_size}, concurrency={args.concurrency})"
+    )
+
+    started = time.perf_counter()
+    plan = [
+        ("users", inst.users()),
+        ("assignments", inst.assignments()),
+        ("subjects", inst.subject_docs()),
+        ("marks", inst.marks()),
+        ("certifications", inst.portfolio("certifications")),
+        ("projects", inst.portfolio("projects")),
+        ("letters", inst.portfolio("letters")),
+        ("sports", inst.portfolio("sports")),
+        ("cultural", inst.portfolio("cultural")),
+        ("feedback", inst.feedback()),
+        ("messages", inst.messages()),
+        ("notifications", inst.notifications()),
+        ("attendance", inst.attendance()),
+    ]
+    for collection, docs in plan:
+        await bulk_insert(collection, docs, args.batch_size, args.concurrency)
+
+    print(f"Done in {time.perf_counter() - started:.1f}s")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=2000)
+    parser.add_argument("--mentors", type=int, default=40)
+    parser.add_argument("--departments", type=int, default=4, choices=range(1, len(DEPARTMENTS) + 1))
+    parser.add_argument("--subjects", type=int, default=5, help="Subjects per department and semester")
+    parser.add_argument("--attendance-days", type=int, default=60,
+                        help="Teaching days per student; rows = students x subjects x days")
+    parser.add_argument("--portfolio-items", type=int, default=3, help="Max items per student per portfolio type")
+    parser.add_argument("--messages", type=int, default=50_000)
+    parser.add_argument("--notifications-per-user", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=4, help="insert_many batches in flight")
+    parser.add_argument("--password", default="pass123", help="Password shared by every synthetic user")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--drop", action="store_true", help="Delete existing synthetic documents first")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    asyncio.run(seed(parse_args()))
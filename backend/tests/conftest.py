@@ -0,0 +1,167 @@
+"""
+Shared pytest fixtures.
+
+`count_queries` wraps a db handle so tests can assert how many MongoDB
+operations an endpoint performs (per collection) while it is exercised
+through FastAPI's TestClient, catching N+1 query regressions.
+"""
+import sys
+import os
+from collections import Counter
+from typing import Dict, Optional
+from unittest.mock import MagicMock, AsyncMock
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+# Mock DB before importing app modules (same convention as the unittest modules)
+if not isinstance(sys.modules.get("app.db"), MagicMock):
+    sys.modules["app.db"] = MagicMock()
+    sys.modules["app.db"].db = MagicMock()
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+# Collection methods that result in a round-trip to the server
+COLLECTION_OPERATIONS = {
+    "find", "find_one", "aggregate", "count_documents", "estimated_document_count",
+    "distinct", "insert_one", "insert_many", "update_one", "update_many",
+    "replace_one", "delete_one", "delete_many", "bulk_write",
+    "find_one_and_update", "find_one_and_replace", "find_one_and_delete",
+}
+
+# Database-level methods that also count as a query
+DATABASE_OPERATIONS = {"command"}
+
+
+class _CountingCollection:
+    """Proxy for a collection that records each operation before delegating."""
+
+    def __init__(self, counter: "QueryCounter", name: str, collection):
+        self._counter = counter
+        self._name = name
+        self._collection = collection
+
+    def __getattr__(self, attr):
+        target = getattr(self._collection, attr)
+        if attr not in COLLECTION_OPERATIONS:
+            return target
+
+        def _record(*args, **kwargs):
+            self._counter.calls[(self._name, attr)] += 1
+            return target(*args, **kwargs)
+
+        return _record
+
+
+class QueryCounter:
+    """Wraps a Motor-like db handle and counts operations per collection."""
+
+    def __init__(self, db):
+        self._db = db
+        self.calls: Counter = Counter()
+
+    def __getattr__(self, name):
+        target = getattr(self._db, name)
+        if name in DATABASE_OPERATIONS:
+            def _record(*args, **kwargs):
+                self.calls[("$db", name)] += 1
+                return target(*args, **kwargs)
+            return _record
+        return _CountingCollection(self, name, target)
+
+    def __getitem__(self, name):
+        return _CountingCollection(self, name, self._db[name])
+
+    def count(self, collection: Optional[str] = None, operation: Optional[str] = None) -> int:
+        """Number of recorded operations, optionally filtered by collection and/or operation."""
+        return sum(
+            n for (coll, op), n in self.calls.items()
+            if (collection is None or coll == collection) and (operation is None or op == operation)
+        )
+
+    @property
+    def total(self) -> int:
+        return self.count()
+
+    def by_collection(self) -> Dict[str, int]:
+        totals: Counter = Counter()
+        for (coll, _), n in self.calls.items():
+            totals[coll] += n
+        return dict(totals)
+
+    def reset(self):
+        self.calls.clear()
+
+
+def make_collection_mock(documents=()) -> MagicMock:
+    """A collection mock whose query methods are awaitable and return empty results by default."""
+    coll = MagicMock()
+    for op in ("find_one", "find_one_and_update", "find_one_and_delete", "find_one_and_replace"):
+        setattr(coll, op, AsyncMock(return_value=None))
+    for op in ("count_documents", "estimated_document_count"):
+        setattr(coll, op, AsyncMock(return_value=0))
+    for op in ("insert_one", "insert_many", "update_one", "update_many", "replace_one",
+               "delete_one", "delete_many", "bulk_write"):
+        setattr(coll, op, AsyncMock())
+    coll.distinct = AsyncMock(return_value=[])
+    cursor = coll.find.return_value
+    cursor.to_list = AsyncMock(return_value=list(documents))
+    cursor.sort.return_value = cursor
+    cursor.skip.return_value = cursor
+    cursor.limit.return_value = cursor
+    coll.aggregate.return_value.to_list = AsyncMock(return_value=[])
+    return coll
+
+
+class MockDatabase:
+    """Lazily creates a `make_collection_mock()` per collection name."""
+
+    def __init__(self):
+        self._collections: Dict[str, MagicMock] = {}
+        self.command = AsyncMock(return_value={"ok": 1})
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        if name not in self._collections:
+            self._collections[name] = make_collection_mock()
+        return self._collections[name]
+
+    def __getitem__(self, name):
+        return getattr(self, name)
+
+
+@pytest.fixture
+def mock_db() -> MockDatabase:
+    return MockDatabase()
+
+
+@pytest.fixture
+def count_queries(monkeypatch):
+    """
+    Returns `install(db, *modules) -> QueryCounter`, which swaps the `db`
+    global of every given module for a counting wrapper around `db`.
+    """
+    def install(db, *modules) -> QueryCounter:
+        counter = QueryCounter(db)
+        for module in modules:
+            monkeypatch.setattr(module, "db", counter)
+        return counter
+
+    return install
+
+
+@pytest.fixture
+def api_client():
+    """Returns `make(router, user) -> TestClient` with authentication overridden to `user`."""
+    from app.core.auth import get_current_user
+
+    def make(router, user: dict) -> TestClient:
+        app = FastAPI()
+        app.include_router(router)
+        app.dependency_overrides[get_current_user] = lambda: user
+        return TestClient(app)
+
+    return make
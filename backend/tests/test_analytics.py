@@ -8,7 +8,9 @@ sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
 sys.modules["app.db"] = MagicMock()
 sys.modules["app.db"].db = MagicMock()
 
-from app.core.analytics import get_system_risk_distribution, get_department_performance, predict_student_outcome
+from app.core.analytics import (
+    get_system_risk_distribution, get_department_performance, predict_student_outcome, get_mentee_metrics,
+)
 
 class TestAnalytics(unittest.IsolatedAsyncioTestCase):
     
@@ -56,5 +58,35 @@ class TestAnalytics(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(result["prediction"], "Outstanding (Distinction)")
         self.assertAlmostEqual(result["projected_percentage"], 85.0)
 
+    @patch("app.core.analytics.db")
+    async def test_mentee_metrics_single_aggregation(self, mock_db):
+        mock_db.users.aggregate.return_value.to_list = AsyncMock(return_value=[
+            {
+                "id": "s1", "full_name": "A", "usn": "1A", "department": "CSE", "semester": 5,
+                "attendance": [{"_id": None, "total": 10, "present": 5}],
+                "marks": [{"_id": None, "obtained": 90, "max": 100}],
+                "certifications": [{"_id": None, "count": 2}],
+                "letters": [{"_id": None, "count": 1}],
+                "feedback": [{"_id": None, "latest": "2024-03-05T10:00:00+00:00"}],
+            },
+            {
+                "id": "s2", "full_name": "B", "usn": "1B",
+                "attendance": [], "marks": [], "certifications": [], "letters": [], "feedback": [],
+            },
+        ])
+
+        metrics = await get_mentee_metrics(["s1", "s2"])
+
+        mock_db.users.aggregate.assert_called_once()
+        for collection in ("attendance", "marks", "certifications", "letters", "feedback"):
+            mock_db[collection].find.assert_not_called()
+        self.assertEqual(metrics[0]["attendance_percentage"], 50.0)
+        self.assertEqual(metrics[0]["average_marks_percentage"], 90.0)
+        self.assertEqual(metrics[0]["risk_level"], "high")
+        self.assertEqual(metrics[0]["pending_reviews"], 3)
+        self.assertEqual(metrics[0]["latest_feedback"], "2024-03-05")
+        self.assertEqual(metrics[1]["pending_reviews"], 0)
+        self.assertIsNone(metrics[1]["latest_feedback"])
+
 if __name__ == "__main__":
     unittest.main()
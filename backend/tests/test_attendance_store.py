@@ -0,0 +1,133 @@
+import unittest
+from unittest.mock import MagicMock, AsyncMock, patch
+import sys
+import os
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+sys.modules["app.db"] = MagicMock()
+sys.modules["app.db"].db = MagicMock()
+
+from fastapi import HTTPException
+
+from app.api import academic
+from app.core import attendance_store
+from app.core.attendance_store import (
+    EMPTY_MONTH, attendance_reads, attendance_totals_fields, expand_month, month_update, upsert_months,
+)
+from app.core.ingest import write_records
+from app.models.academic import AttendanceCreate
+
+def evaluate(expr, doc):
+    """Evaluates the aggregation operators month_update uses against a plain dict."""
+    if isinstance(expr, str) and expr.startswith("$"):
+        return doc.get(expr[1:])
+    if isinstance(expr, list):
+        return [evaluate(e, doc) for e in expr]
+    if not isinstance(expr, dict):
+        return expr
+    (op, args), = expr.items()
+    if op == "$literal":
+        return args
+    values = evaluate(args, doc)
+    if op == "$ifNull":
+        return values[0] if values[0] is not None else values[1]
+    if op == "$substrCP":
+        return values[0][values[1]:values[1] + values[2]]
+    if op == "$concat":
+        return "".join(values)
+    if op == "$add":
+        return sum(values)
+    if op == "$eq":
+        return values[0] == values[1]
+    if op == "$cond":
+        return values[1] if values[0] else values[2]
+    raise NotImplementedError(op)
+
+def apply_update(doc, pipeline):
+    doc = dict(doc)
+    for stage in pipeline:
+        if "$set" in stage:
+            doc.update({field: evaluate(expr, doc) for field, expr in stage["$set"].items()})
+        else:
+            doc.pop(stage["$unset"])
+    return doc
+
+def record(date, status):
+    return {"student_id": "s1", "subject": "Math", "date": date, "status": status, "recorded_by": "m1"}
+
+class TestMonthlyDocuments(unittest.TestCase):
+
+    def test_updates_set_days_and_keep_counters_in_step(self):
+        doc = {}
+        for date, status in [("2024-02-01", "present"), ("2024-02-03", "absent"),
+                             ("2024-02-29", "leave"), ("2024-02-03", "present")]:
+            key, pipeline = month_update(record(date, status))
+            doc = apply_update({**key, **doc}, pipeline)
+
+        self.assertEqual(key, {"student_id": "s1", "subject": "Math", "month": "2024-02"})
+        self.assertEqual(doc["days"], "P-P" + "-" * 25 + "L--")
+        self.assertEqual((doc["present"], doc["absent"], doc["leave"], doc["total"]), (2, 0, 1, 3))
+        self.assertEqual([(s["date"], s["status"]) for s in expand_month(doc)], [
+            ("2024-02-01", "present"), ("2024-02-03", "present"), ("2024-02-29", "leave"),
+        ])
+        self.assertEqual(expand_month(doc)[0]["id"], "s1:Math:2024-02-01")
+
+    def test_bad_dates_are_rejected(self):
+        with self.assertRaises(ValueError):
+            month_update(record("01/02/2024", "present"))
+
+class TestStorageModes(unittest.IsolatedAsyncioTestCase):
+
+    def test_readers_follow_the_setting(self):
+        db = MagicMock()
+        self.assertIs(attendance_reads(db), db.attendance)
+        self.assertEqual(attendance_totals_fields()["total"], {"$sum": 1})
+        with patch.object(attendance_store.settings, "ATTENDANCE_STORAGE", "monthly"):
+            self.assertIs(attendance_reads(db), db.__getitem__.return_value)
+            db.__getitem__.assert_called_with("attendance_sessions")
+            self.assertEqual(attendance_totals_fields(), {"total": {"$sum": "$total"}, "present": {"$sum": "$present"}})
+
+    async def test_monthly_writes_count_sessions_with_one_read_per_batch(self):
+        db = MagicMock()
+        monthly = db.__getitem__.return_value
+        days = list(EMPTY_MONTH)
+        days[4] = "A"
+        monthly.find.return_value.to_list = AsyncMock(return_value=[
+            {"student_id": "s1", "subject": "Math", "month": "2024-03", "days": "".join(days)},
+        ])
+        monthly.bulk_write = AsyncMock()
+
+        with patch.object(attendance_store.settings, "ATTENDANCE_STORAGE", "monthly"):
+            inserted, updated = await write_records(db, "attendance", [
+                record("2024-03-05", "present"), record("2024-03-06", "present"), record("2024-04-01", "absent"),
+            ])
+
+        db.__getitem__.assert_called_with("attendance_monthly")
+        self.assertEqual((inserted, updated), (2, 1))
+        monthly.find.assert_called_once()
+        ops = monthly.bulk_write.call_args[0][0]
+        self.assertEqual([op._filter["month"] for op in ops], ["2024-03", "2024-03", "2024-04"])
+        self.assertTrue(all(op._upsert for op in ops))
+
+    @patch.object(academic, "log_action", new_callable=AsyncMock)
+    @patch.object(academic, "check_academic_risk", new_callable=AsyncMock)
+    @patch.object(academic, "bump_data_versions", new_callable=AsyncMock)
+    @patch.object(academic, "write_records", new_callable=AsyncMock)
+    async def test_single_record_status_is_normalized_or_rejected(self, write, *_):
+        mentor = {"id": "m1", "role": "mentor"}
+        with patch.object(attendance_store.settings, "ATTENDANCE_STORAGE", "monthly"):
+            saved = await academic.create_attendance(
+                AttendanceCreate(student_id="s1", subject="Math", date="2024-03-05", status=" Present "), mentor,
+            )
+            with self.assertRaises(HTTPException) as ctx:
+                await academic.create_attendance(
+                    AttendanceCreate(student_id="s1", subject="Math", date="2024-03-05", status="late"), mentor,
+                )
+
+        self.assertEqual(saved["status"], "present")
+        self.assertEqual(ctx.exception.status_code, 400)
+        write.assert_awaited_once()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+import unittest
+from unittest.mock import patch
+import asyncio
+import sys
+import os
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from app.core.cache import AsyncTTLCache, cached, invalidate
+
+class TestAsyncCache(unittest.IsolatedAsyncioTestCase):
+
+    async def test_concurrent_calls_share_one_computation(self):
+        calls = 0
+
+        @cached(ttl=60)
+        async def slow_aggregate():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return {"total": 42}
+
+        results = await asyncio.gather(*(slow_aggregate() for _ in range(20)))
+
+        self.assertEqual(calls, 1)
+        self.assertTrue(all(r == {"total": 42} for r in results))
+        # Served from cache afterwards
+        await slow_aggregate()
+        self.assertEqual(calls, 1)
+
+    async def test_entries_expire_after_ttl(self):
+        cache = AsyncTTLCache("ttl-test", ttl=10)
+        calls = 0
+
+        async def compute():
+            nonlocal calls
+            calls += 1
+            return calls
+
+        with patch("app.core.cache.time.monotonic", return_value=100.0):
+            self.assertEqual(await cache.get_or_compute("k", compute), 1)
+            self.assertEqual(await cache.get_or_compute("k", compute), 1)
+        with patch("app.core.cache.time.monotonic", return_value=111.0):
+            self.assertEqual(await cache.get_or_compute("k", compute), 2)
+
+    async def test_lru_eviction(self):
+        @cached(ttl=60, maxsize=2)
+        async def square(x):
+            return x * x
+
+        await square(1)
+        await square(2)
+        await square(1)  # 1 becomes most recently used
+        await square(3)  # evicts 2
+
+        keys = list(square.cache._entries)
+        self.assertEqual(keys, [(1,), (3,)])
+
+    async def test_tag_invalidation(self):
+        calls = 0
+
+        @cached(ttl=60, tags=("test-users",))
+        async def count_users():
+            nonlocal calls
+            calls += 1
+            return calls
+
+        self.assertEqual(await count_users(), 1)
+        invalidate("test-users")
+        self.assertEqual(await count_users(), 2)
+
+    async def test_errors_are_not_cached(self):
+        attempts = 0
+
+        @cached(ttl=60)
+        async def flaky():
+            nonlocal attempts
+            attempts += 1
+            if attempts == 1:
+                raise RuntimeError("db down")
+            return "ok"
+
+        with self.assertRaises(RuntimeError):
+            await flaky()
+        self.assertEqual(await flaky(), "ok")
+
+    async def test_cancelled_leader_does_not_cancel_waiters(self):
+        calls = 0
+
+        @cached(ttl=60)
+        async def slow_aggregate():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return calls
+
+        leader = asyncio.create_task(slow_aggregate())
+        await asyncio.sleep(0)
+        waiters = [asyncio.create_task(slow_aggregate()) for _ in range(3)]
+        await asyncio.sleep(0)
+        leader.cancel()
+
+        results = await asyncio.gather(*waiters)
+        self.assertTrue(leader.cancelled())
+        # One waiter recomputes and the others share its result
+        self.assertEqual(results, [2, 2, 2])
+        self.assertEqual(calls, 2)
+
+    async def test_cancelled_waiter_is_still_cancelled(self):
+        @cached(ttl=60)
+        async def slow_aggregate():
+            await asyncio.sleep(0.01)
+            return "ok"
+
+        leader = asyncio.create_task(slow_aggregate())
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(slow_aggregate())
+        await asyncio.sleep(0)
+        waiter.cancel()
+
+        self.assertEqual(await leader, "ok")
+        with self.assertRaises(asyncio.CancelledError):
+            await waiter
+
+if __name__ == "__main__":
+    unittest.main()
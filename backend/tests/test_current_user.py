@@ -0,0 +1,78 @@
+import unittest
+from unittest.mock import MagicMock, AsyncMock, patch
+import asyncio
+import sys
+import os
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+sys.modules["app.db"] = MagicMock()
+sys.modules["app.db"].db = MagicMock()
+
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+
+from app.core.auth import USER_PROJECTION, _load_user, create_access_token, get_current_user, invalidate_user
+from app.core.cache import cache_requests_total
+
+def bearer(user_id):
+    return HTTPAuthorizationCredentials(scheme="Bearer", credentials=create_access_token({"sub": user_id}))
+
+class TestCurrentUserCache(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        _load_user.invalidate()
+
+    @patch("app.core.auth.db")
+    async def test_repeat_requests_skip_the_database(self, mock_db):
+        mock_db.users.find_one = AsyncMock(return_value={"id": "u1", "role": "student", "settings": {"dark": False}})
+        hits = cache_requests_total.value(cache="current_user", result="hit")
+
+        first = await get_current_user(bearer("u1"))
+        first["settings"]["dark"] = True  # handlers may mutate what they receive
+        second = await get_current_user(bearer("u1"))
+
+        mock_db.users.find_one.assert_awaited_once_with({"id": "u1"}, USER_PROJECTION)
+        self.assertEqual(USER_PROJECTION["password_hash"], 0)
+        self.assertEqual(second["settings"], {"dark": False})
+        self.assertEqual(cache_requests_total.value(cache="current_user", result="hit"), hits + 1)
+
+    @patch("app.core.auth.db")
+    async def test_invalidation_reloads_and_deleted_users_are_rejected(self, mock_db):
+        mock_db.users.find_one = AsyncMock(return_value={"id": "u1", "role": "student"})
+        await get_current_user(bearer("u1"))
+
+        mock_db.users.find_one = AsyncMock(return_value=None)
+        await get_current_user(bearer("u1"))  # still cached
+        invalidate_user("u1")
+
+        with self.assertRaises(HTTPException) as ctx:
+            await get_current_user(bearer("u1"))
+        self.assertEqual(ctx.exception.status_code, 401)
+        mock_db.users.find_one.assert_awaited_once()
+
+    @patch("app.core.auth.db")
+    async def test_lookup_in_flight_during_invalidation_is_not_cached(self, mock_db):
+        started, release = asyncio.Event(), asyncio.Event()
+        current = {"id": "u1", "role": "mentor"}
+
+        async def slow_find_one(query, projection):
+            snapshot = dict(current)  # read before the write below
+            started.set()
+            await release.wait()
+            return snapshot
+
+        mock_db.users.find_one = AsyncMock(side_effect=slow_find_one)
+        stale = asyncio.create_task(get_current_user(bearer("u1")))
+        await started.wait()
+
+        current["role"] = "student"  # e.g. update_user_profile demotes the user...
+        invalidate_user("u1")        # ...and invalidates while the lookup is still running
+        release.set()
+        self.assertEqual((await stale)["role"], "mentor")
+
+        self.assertEqual((await get_current_user(bearer("u1")))["role"], "student")
+        self.assertEqual(mock_db.users.find_one.await_count, 2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+from unittest.mock import MagicMock, AsyncMock, patch
+import sys
+import os
+from datetime import datetime, timezone
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+sys.modules["app.db"] = MagicMock()
+sys.modules["app.db"].db = MagicMock()
+
+from app.core.dates import as_datetime, month_start, time_range, to_json
+from app.api.activity import get_recent_activity
+
+class TestDates(unittest.TestCase):
+
+    def test_as_datetime_reads_both_forms(self):
+        native = datetime(2024, 1, 2, 12, 0, tzinfo=timezone.utc)
+        self.assertEqual(as_datetime(native), native)
+        self.assertEqual(as_datetime(native.replace(tzinfo=None)), native)
+        self.assertEqual(as_datetime("2024-01-02T12:00:00Z"), native)
+        self.assertEqual(as_datetime("2024-01-02T12:00:00"), native)
+        self.assertIsNone(as_datetime("not a date"))
+        self.assertIsNone(as_datetime(None))
+
+    def test_time_range_matches_dates_and_strings(self):
+        start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        query = time_range("created_at", start)
+        self.assertEqual(query, {"$or": [
+            {"created_at": {"$gte": start}},
+            {"created_at": {"$gte": "2024-01-01T00:00:00+00:00"}},
+        ]})
+        self.assertEqual(time_range("created_at"), {"created_at": {"$exists": True}})
+
+    def test_month_start_counts_back_whole_months(self):
+        now = datetime(2024, 3, 15, 9, 30, tzinfo=timezone.utc)
+        self.assertEqual(month_start(now), datetime(2024, 3, 1, tzinfo=timezone.utc))
+        self.assertEqual(month_start(now, 11), datetime(2023, 4, 1, tzinfo=timezone.utc))
+        self.assertEqual(month_start(datetime(2024, 12, 31, tzinfo=timezone.utc), 11), datetime(2024, 1, 1, tzinfo=timezone.utc))
+
+    def test_to_json_serializes_datetimes(self):
+        payload = to_json({"id": "n1", "created_at": datetime(2024, 1, 2, tzinfo=timezone.utc)})
+        self.assertEqual(payload, {"id": "n1", "created_at": "2024-01-02T00:00:00+00:00"})
+
+class TestMixedTimestamps(unittest.IsolatedAsyncioTestCase):
+
+    @patch("app.api.activity.db")
+    async def test_feed_sorts_native_and_legacy_values_together(self, mock_db):
+        legacy = {"title": "Old", "created_at": "2024-01-01T12:00:00Z"}
+        native = {"title": "New", "created_at": datetime(2024, 3, 1, tzinfo=timezone.utc)}
+        mock_db.circulars.find.return_value.sort.return_value.limit.return_value.to_list = AsyncMock(return_value=[legacy, native])
+        mock_db.users.find.return_value.sort.return_value.limit.return_value.to_list = AsyncMock(return_value=[])
+
+        results = await get_recent_activity(current_user={"id": "a1", "role": "admin"}, limit=10, skip=0)
+
+        self.assertEqual([r["title"] for r in results], ["New", "Old"])
+
+if __name__ == "__main__":
+    unittest.main()
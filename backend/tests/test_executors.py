@@ -0,0 +1,70 @@
+import unittest
+import asyncio
+import threading
+import time
+import sys
+import os
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from app.core.executors import BoundedExecutor, executor_queue_depth
+from app.core.pdf_render import render_table_pdf, table_rows
+from app.core.hashing import hash_batch, pwd_context
+
+class TestBoundedExecutor(unittest.IsolatedAsyncioTestCase):
+
+    async def test_concurrency_is_bounded_and_queue_depth_reported(self):
+        executor = BoundedExecutor("test-threads", kind="thread", max_workers=2)
+        self.addCleanup(executor.shutdown)
+        running, peak = 0, 0
+        lock = threading.Lock()
+
+        def work():
+            nonlocal running, peak
+            with lock:
+                running += 1
+                peak = max(peak, running)
+            time.sleep(0.05)
+            with lock:
+                running -= 1
+
+        tasks = [asyncio.create_task(executor.run(work)) for _ in range(6)]
+        await asyncio.sleep(0.01)
+        self.assertEqual(executor.queue_depth, 4)
+        self.assertEqual(executor_queue_depth.value(executor="test-threads"), 4)
+
+        await asyncio.gather(*tasks)
+        self.assertEqual(peak, 2)
+        self.assertEqual(executor.queue_depth, 0)
+
+    async def test_event_loop_stays_responsive(self):
+        executor = BoundedExecutor("test-blocking", kind="thread", max_workers=1)
+        self.addCleanup(executor.shutdown)
+
+        task = asyncio.create_task(executor.run(time.sleep, 0.2))
+        started = time.perf_counter()
+        await asyncio.sleep(0.01)
+        self.assertLess(time.perf_counter() - started, 0.1)
+        await task
+
+    async def test_pdf_renders_in_worker_process(self):
+        executor = BoundedExecutor("test-pdf", kind="process", max_workers=1)
+        self.addCleanup(executor.shutdown)
+
+        columns, rows = table_rows([{"student_id": "s1", "status": "present"}, {"student_id": "s2"}])
+        self.assertEqual(rows, [["s1", "present"], ["s2", ""]])
+
+        pdf_bytes = await executor.run(render_table_pdf, "Attendance", columns, rows, [])
+        self.assertTrue(pdf_bytes.startswith(b"%PDF"))
+
+    async def test_passwords_hash_in_worker_process(self):
+        executor = BoundedExecutor("test-hash", kind="process", max_workers=1)
+        self.addCleanup(executor.shutdown)
+
+        hashes = await executor.run(hash_batch, ["first", "second"])
+
+        self.assertTrue(pwd_context.verify("first", hashes[0]))
+        self.assertTrue(pwd_context.verify("second", hashes[1]))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.join(os.path.dirname(__file__), "..")
+
+# Modules that must only be loaded on first use (report/upload endpoints)
+HEAVY_MODULES = {"pandas", "numpy", "openpyxl", "reportlab", "pyarrow"}
+
+# Cumulative import budget for the whole application, in seconds.
+# Override with IMPORT_TIME_BUDGET on slow machines.
+IMPORT_TIME_BUDGET = float(os.environ.get("IMPORT_TIME_BUDGET", "3.0"))
+
+
+def _import_profile(module: str):
+    """Runs `python -X importtime -c 'import <module>'` and parses its report."""
+    env = {**os.environ, "MONGO_URL": os.environ.get("MONGO_URL", "mongodb://localhost:27017")}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, timeout=120,
+    )
+    if result.returncode != 0:
+        raise AssertionError(f"import {module} failed:\n{result.stderr[-2000:]}")
+
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _self_us, cumulative_us, name = [part.strip() for part in line[len("import time:"):].split("|")]
+        timings[name] = int(cumulative_us)
+    return timings
+
+
+class TestImportTime(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.timings = _import_profile("app.server")
+
+    def test_heavy_dependencies_are_lazy(self):
+        loaded = {name.split(".")[0] for name in self.timings}
+        self.assertEqual(loaded & HEAVY_MODULES, set())
+
+    def test_import_time_budget(self):
+        cumulative_seconds = self.timings["app.server"] / 1_000_000
+        self.assertLess(
+            cumulative_seconds, IMPORT_TIME_BUDGET,
+            f"app.server took {cumulative_seconds:.2f}s to import (budget {IMPORT_TIME_BUDGET}s)",
+        )
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,279 @@
+import unittest
+from unittest.mock import MagicMock, AsyncMock, patch
+import sys
+import os
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+sys.modules["app.db"] = MagicMock()
+sys.modules["app.db"].db = MagicMock()
+
+import io
+import tempfile
+from pathlib import Path
+import pandas as pd
+
+from app.core import ingest
+from app.core.ingest import IngestError, IngestResult, ingest_attendance_frame, ingest_upload, run_upload_job
+from app.core.jobs import JobContext
+
+def upsert_mock(existing=0):
+    """bulk_write stand-in reporting the first `existing` ops of each call as matches."""
+    async def bulk_write(ops, ordered=True):
+        matched = min(existing, len(ops))
+        return MagicMock(upserted_count=len(ops) - matched, matched_count=matched)
+    return AsyncMock(side_effect=bulk_write)
+
+def route_collections(mock_db):
+    """Makes db["name"] return the same mock as db.name."""
+    mock_db.__getitem__.side_effect = lambda name: getattr(mock_db, name)
+
+def written(collection_mock):
+    """(filter, $set) of every upsert sent to a collection mock."""
+    return [(op._filter, op._doc["$set"]) for call in collection_mock.bulk_write.call_args_list for op in call[0][0]]
+
+class TestAttendanceIngest(unittest.IsolatedAsyncioTestCase):
+
+    @patch("app.core.ingest.db")
+    async def test_one_usn_lookup_and_row_rejections(self, mock_db):
+        route_collections(mock_db)
+        mock_db.users.find.return_value.to_list = AsyncMock(return_value=[
+            {"id": "s1", "usn": "1A"}, {"id": "s2", "usn": "1B"},
+        ])
+        mock_db.attendance.bulk_write = upsert_mock()
+        df = pd.DataFrame({
+            "student_usn": ["1A", " 1B", "ZZ", "1A", "1B"],
+            "subject": ["Math", "Math", "Math", "", "Math"],
+            "date": ["2024-01-01", "2024/01/02", "2024-01-03", "2024-01-04", "not a date"],
+            "status": ["Present", "absent", "present", "present", "present"],
+        }, dtype=str)
+        result = IngestResult()
+
+        await ingest_attendance_frame(df, "u1", result)
+
+        mock_db.users.find.assert_called_once()
+        self.assertEqual(mock_db.users.find.call_args[0][0]["usn"], {"$in": ["1A", "1B", "ZZ"]})
+        self.assertEqual(written(mock_db.attendance), [
+            ({"student_id": "s1", "subject": "Math", "date": "2024-01-01"}, {"status": "present", "recorded_by": "u1"}),
+            ({"student_id": "s2", "subject": "Math", "date": "2024-01-02"}, {"status": "absent", "recorded_by": "u1"}),
+        ])
+        self.assertEqual(result.inserted, 2)
+        self.assertEqual(result.rejections, [
+            {"row": 4, "reason": "unknown student USN"},
+            {"row": 5, "reason": "missing subject"},
+            {"row": 6, "reason": "invalid date"},
+        ])
+        self.assertEqual(result.student_ids, {"s1", "s2"})
+
+    @patch("app.core.ingest.db")
+    async def test_upserts_are_batched(self, mock_db):
+        route_collections(mock_db)
+        mock_db.users.find.return_value.to_list = AsyncMock(return_value=[{"id": "s1", "usn": "1A"}])
+        mock_db.attendance.bulk_write = upsert_mock()
+        rows = ingest.WRITE_BATCH_SIZE * 2 + 1
+        dates = pd.date_range("2020-01-01", periods=rows).strftime("%Y-%m-%d")
+        df = pd.DataFrame({"student_usn": ["1A"] * rows, "subject": ["Math"] * rows,
+                           "date": dates, "status": ["present"] * rows})
+
+        result = IngestResult()
+        await ingest_attendance_frame(df, "u1", result)
+
+        self.assertEqual(mock_db.attendance.bulk_write.await_count, 3)
+        self.assertEqual(mock_db.attendance.bulk_write.call_args.kwargs, {"ordered": False})
+        self.assertEqual(result.inserted, rows)
+
+    @patch("app.core.ingest.db")
+    async def test_reupload_updates_instead_of_duplicating(self, mock_db):
+        route_collections(mock_db)
+        mock_db.users.find.return_value.to_list = AsyncMock(return_value=[{"id": "s1", "usn": "1A"}])
+        mock_db.attendance.bulk_write = upsert_mock(existing=1)
+        df = pd.DataFrame({"student_usn": ["1A", "1A"], "subject": ["Math", "Math"],
+                           "date": ["2024-01-01", "2024-01-01"], "status": ["absent", "present"]})
+
+        result = IngestResult()
+        await ingest_attendance_frame(df, "u1", result)
+
+        # The repeated key collapses to its last row and updates the existing record
+        ops = mock_db.attendance.bulk_write.call_args[0][0]
+        self.assertEqual(len(ops), 1)
+        self.assertTrue(ops[0]._upsert)
+        self.assertEqual(ops[0]._doc["$set"]["status"], "present")
+        self.assertEqual(set(ops[0]._doc["$setOnInsert"]), {"id", "created_at"})
+        self.assertEqual((result.inserted, result.updated), (0, 1))
+
+    async def test_missing_column(self):
+        with self.assertRaises(IngestError):
+            await ingest_attendance_frame(pd.DataFrame({"student_usn": ["1A"]}), "u1", IngestResult())
+
+class TestChunkedUpload(unittest.IsolatedAsyncioTestCase):
+
+    def _marks_rows(self, count):
+        return [["1A", f"Subject {i}", "5", "IA1", str(i), "20"] for i in range(count)]
+
+    @patch("app.core.ingest.db")
+    async def test_csv_is_ingested_chunk_by_chunk(self, mock_db):
+        route_collections(mock_db)
+        mock_db.users.find.return_value.to_list = AsyncMock(return_value=[{"id": "s1", "usn": "1A"}])
+        mock_db.marks.bulk_write = upsert_mock()
+        lines = ["student_usn,subject,semester,marks_type,marks_obtained,max_marks"]
+        lines += [",".join(r) for r in self._marks_rows(25)]
+        upload = io.BytesIO("\n".join(lines).encode())
+
+        result = IngestResult()
+        await ingest_upload("marks", upload, "marks.csv", "u1", result, chunk_rows=10)
+
+        # One USN lookup and one insert per chunk of 10 rows
+        self.assertEqual(mock_db.users.find.call_count, 3)
+        self.assertEqual(result.inserted, 21)
+        # 21..24 out of 20 are rejected, numbered across chunks
+        self.assertEqual([r["row"] for r in result.rejections], [23, 24, 25, 26])
+        key, fields = written(mock_db.marks)[0]
+        self.assertEqual(key, {"student_id": "s1", "subject": "Subject 0", "semester": 5, "marks_type": "IA1"})
+        self.assertIsInstance(key["semester"], int)
+        self.assertEqual((fields["marks_obtained"], fields["max_marks"]), (0.0, 20.0))
+
+    @patch("app.core.ingest.db")
+    async def test_excel_is_read_in_row_chunks(self, mock_db):
+        from openpyxl import Workbook
+        route_collections(mock_db)
+        mock_db.users.find.return_value.to_list = AsyncMock(return_value=[{"id": "s1", "usn": "1A"}])
+        mock_db.marks.bulk_write = upsert_mock()
+        wb = Workbook()
+        ws = wb.active
+        ws.append(["student_usn", "subject", "semester", "marks_type", "marks_obtained", "max_marks"])
+        for row in self._marks_rows(12):
+            ws.append(["1A", row[1], 5, "IA1", int(row[4]), 20])
+        upload = io.BytesIO()
+        wb.save(upload)
+
+        result = IngestResult()
+        await ingest_upload("marks", upload, "marks.xlsx", "u1", result, chunk_rows=5)
+
+        self.assertEqual(mock_db.users.find.call_count, 3)
+        self.assertEqual(result.inserted, 12)
+
+    @patch("app.core.ingest.db")
+    async def test_excel_rejections_name_the_worksheet_row(self, mock_db):
+        from openpyxl import Workbook
+        route_collections(mock_db)
+        mock_db.users.find.return_value.to_list = AsyncMock(return_value=[{"id": "s1", "usn": "1A"}])
+        mock_db.marks.bulk_write = upsert_mock()
+        wb = Workbook()
+        ws = wb.active
+        ws.append(["student_usn", "subject", "semester", "marks_type", "marks_obtained", "max_marks"])
+        ws.append(["1A", "Math", 5, "IA1", 10, 20])
+        ws.append([])
+        ws.append([])
+        ws.append(["1A", "Physics", 5, "IA1", 10, 20])
+        ws.append(["1A", "Chemistry", 5, "IA1", 30, 20])  # row 6
+        upload = io.BytesIO()
+        wb.save(upload)
+
+        result = IngestResult()
+        await ingest_upload("marks", upload, "marks.xlsx", "u1", result, chunk_rows=2)
+
+        self.assertEqual(result.inserted, 2)
+        self.assertEqual([r["row"] for r in result.rejections], [6])
+
+    async def test_unreadable_file(self):
+        with self.assertRaises(IngestError):
+            await ingest_upload("marks", io.BytesIO(b"not a workbook"), "marks.xlsx", "u1", IngestResult())
+
+class TestUploadJob(unittest.IsolatedAsyncioTestCase):
+
+    @patch("app.core.ingest.check_academic_risk_bulk", new_callable=AsyncMock)
+    @patch("app.core.ingest.bump_data_versions", new_callable=AsyncMock)
+    @patch("app.core.ingest.log_action", new_callable=AsyncMock)
+    @patch("app.core.ingest.sio")
+    @patch("app.core.jobs.db")
+    @patch("app.core.ingest.db")
+    async def test_job_reports_progress_and_runs_hooks(self, mock_db, jobs_db, mock_sio, *_hooks):
+        route_collections(mock_db)
+        mock_db.users.find.return_value.to_list = AsyncMock(return_value=[{"id": "s1", "usn": "1A"}])
+        mock_db.attendance.bulk_write = upsert_mock()
+        jobs_db.jobs.update_one = AsyncMock()
+        mock_sio.emit = AsyncMock()
+        lines = ["student_usn,subject,date,status"] + [f"1A,Math,2024-01-{d:02d},present" for d in range(1, 29)]
+        lines.append("ZZ,Math,2024-02-01,present")
+
+        with tempfile.TemporaryDirectory() as tmp, \
+                patch("app.core.ingest.INGEST_CHUNK_ROWS", 10), \
+                patch.dict("app.core.ingest.connected_users", {"u1": "sid1"}):
+            path = Path(tmp) / "upload.csv"
+            path.write_text("\n".join(lines))
+            job = JobContext({"id": "j1", "owner_id": "u1", "params": {
+                "kind": "attendance", "path": str(path), "filename": "attendance.csv",
+            }})
+
+            outcome = await run_upload_job(job)
+
+            self.assertFalse(path.exists())
+
+        self.assertEqual(outcome["rows_processed"], 29)
+        self.assertEqual(outcome["rows_rejected"], 1)
+        self.assertEqual(outcome["result"]["inserted"], 28)
+        # The first chunk's progress write goes through; later ones are throttled
+        progress = jobs_db.jobs.update_one.call_args_list[0].args[1]["$set"]
+        self.assertEqual((progress["rows_processed"], progress["rows_rejected"]), (10, 0))
+        self.assertIn("eta_seconds", progress)
+        events = [c.args[1]["status"] for c in mock_sio.emit.call_args_list if c.args[0] == "upload_progress"]
+        self.assertEqual(events, ["running", "completed"])
+        _hooks[-1].assert_awaited_once_with(["s1"])
+
+    @patch("app.core.ingest.check_academic_risk_bulk", new_callable=AsyncMock)
+    @patch("app.core.ingest.bump_data_versions", new_callable=AsyncMock)
+    @patch("app.core.ingest.invalidate_cache")
+    @patch("app.core.ingest.log_action", new_callable=AsyncMock)
+    @patch("app.core.ingest.sio")
+    @patch("app.core.jobs.db")
+    @patch("app.core.ingest.db")
+    async def test_hooks_run_for_chunks_written_before_a_failure(self, mock_db, jobs_db, mock_sio, log, invalidate, bump, risk):
+        route_collections(mock_db)
+        mock_db.users.find.return_value.to_list = AsyncMock(return_value=[
+            {"id": "s1", "usn": "1A"}, {"id": "s2", "usn": "2B"},
+        ])
+        written = upsert_mock()
+        mock_db.marks.bulk_write = AsyncMock(side_effect=[await written([None] * 2), RuntimeError("db down")])
+        jobs_db.jobs.update_one = AsyncMock()
+        mock_sio.emit = AsyncMock()
+        lines = ["student_usn,subject,semester,marks_type,marks_obtained,max_marks"]
+        lines += ["1A,Math,5,IA1,10,20", "1A,Physics,5,IA1,10,20", "2B,Math,5,IA1,10,20"]
+
+        with tempfile.TemporaryDirectory() as tmp, patch("app.core.ingest.INGEST_CHUNK_ROWS", 2):
+            path = Path(tmp) / "upload.csv"
+            path.write_text("\n".join(lines))
+            job = JobContext({"id": "j2", "owner_id": "u1", "params": {
+                "kind": "marks", "path": str(path), "filename": "marks.csv",
+            }})
+
+            with self.assertRaises(RuntimeError):
+                await run_upload_job(job)
+
+        invalidate.assert_called_once_with("marks")
+        self.assertEqual(sorted(bump.call_args.args[0]), ["student:s1", "student:s2"])
+        self.assertEqual(sorted(risk.call_args.args[0]), ["s1", "s2"])
+        log.assert_not_awaited()
+
+    @patch("app.api.academic.stage_upload", new_callable=AsyncMock)
+    async def test_users_at_their_limit_are_rejected_before_staging(self, stage):
+        from fastapi import HTTPException
+        from app.api import academic
+        from app.core.jobs import JobManager
+
+        manager = JobManager("uploads", max_concurrent=1, per_user_limit=1)
+        manager.reserve("u1")
+        upload = MagicMock(file=io.BytesIO(b"data"), filename="attendance.csv")
+
+        with patch.object(academic, "upload_jobs", manager), self.assertRaises(HTTPException) as ctx:
+            await academic._queue_upload("attendance", upload, {"id": "u1"})
+
+        self.assertEqual(ctx.exception.status_code, 429)
+        stage.assert_not_awaited()
+
+        stage.side_effect = OSError("disk full")
+        with patch.object(academic, "upload_jobs", manager), self.assertRaises(OSError):
+            await academic._queue_upload("attendance", upload, {"id": "u2"})
+        self.assertEqual(manager.active_jobs("u2"), 0)
+
+if __name__ == "__main__":
+    unittest.main()
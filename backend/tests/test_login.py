@@ -0,0 +1,50 @@
+"""Login verifies passwords on the bounded thread pool and sheds load when it backs up."""
+import threading
+from unittest.mock import AsyncMock
+
+from app.core.hashing import pwd_context
+
+USER = {"id": "u1", "email": "s@example.com", "full_name": "Student", "role": "student",
+        "password_hash": pwd_context.hash("secret")}
+
+
+def _client(mock_db, api_client, monkeypatch):
+    from app.api.v1 import auth
+
+    mock_db.users.find_one = AsyncMock(return_value=dict(USER))
+    monkeypatch.setattr(auth, "db", mock_db)
+    monkeypatch.setattr(auth, "log_action", AsyncMock())
+    return auth, api_client(auth.router, {})
+
+
+def test_password_checked_off_the_event_loop(mock_db, api_client, monkeypatch):
+    auth, client = _client(mock_db, api_client, monkeypatch)
+    threads = []
+    verify = pwd_context.verify
+
+    def recording_verify(password, password_hash):
+        threads.append(threading.current_thread().name)
+        return verify(password, password_hash)
+
+    monkeypatch.setattr(pwd_context, "verify", recording_verify)
+
+    ok = client.post("/api/auth/login", json={"email": "s@example.com", "password": "secret"})
+    wrong = client.post("/api/auth/login", json={"email": "s@example.com", "password": "nope"})
+
+    assert ok.status_code == 200
+    assert ok.json()["user"]["id"] == "u1"
+    assert wrong.status_code == 401
+    assert len(threads) == 2
+    assert all(name.startswith("password_verify") for name in threads)
+
+
+def test_logins_rejected_when_verification_backlog_is_full(mock_db, api_client, monkeypatch):
+    auth, client = _client(mock_db, api_client, monkeypatch)
+    monkeypatch.setattr(auth, "login_backlog", lambda: auth.settings.LOGIN_MAX_PENDING)
+    before = auth.logins_rejected.value()
+
+    response = client.post("/api/auth/login", json={"email": "s@example.com", "password": "secret"})
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    assert auth.logins_rejected.value() == before + 1
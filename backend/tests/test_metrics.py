@@ -0,0 +1,73 @@
+import unittest
+from unittest.mock import MagicMock
+import sys
+import os
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+sys.modules["app.db"] = MagicMock()
+sys.modules["app.db"].db = MagicMock()
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.core.metrics import (
+    Registry,
+    MetricsMiddleware,
+    http_requests_total,
+    http_request_duration,
+)
+
+class TestMetrics(unittest.TestCase):
+
+    def test_render_prometheus_text(self):
+        registry = Registry()
+        counter = registry.counter("jobs_total", "Jobs run.", ("kind",))
+        gauge = registry.gauge("queue_depth", "Items waiting.")
+        histogram = registry.histogram("job_seconds", "Job latency.", buckets=(0.1, 1.0))
+
+        counter.inc(kind="pdf")
+        counter.inc(2, kind="pdf")
+        gauge.set(4)
+        histogram.observe(0.05)
+        histogram.observe(0.5)
+        histogram.observe(3)
+
+        text = registry.render()
+        self.assertIn("# TYPE jobs_total counter", text)
+        self.assertIn('jobs_total{kind="pdf"} 3', text)
+        self.assertIn("queue_depth 4", text)
+        # Buckets are cumulative and end with +Inf
+        self.assertIn('job_seconds_bucket{le="0.1"} 1', text)
+        self.assertIn('job_seconds_bucket{le="1"} 2', text)
+        self.assertIn('job_seconds_bucket{le="+Inf"} 3', text)
+        self.assertIn("job_seconds_count 3", text)
+
+    def test_rejects_wrong_labels(self):
+        registry = Registry()
+        counter = registry.counter("things_total", "Things.", ("kind",))
+        with self.assertRaises(ValueError):
+            counter.inc(other="x")
+
+    def test_middleware_labels_by_route_template(self):
+        app = FastAPI()
+        app.add_middleware(MetricsMiddleware)
+
+        @app.get("/api/items/{item_id}")
+        async def read_item(item_id: str):
+            return {"id": item_id}
+
+        client = TestClient(app)
+        before = http_request_duration.count(method="GET", route="/api/items/{item_id}")
+        client.get("/api/items/1")
+        client.get("/api/items/2")
+        client.get("/does-not-exist")
+
+        self.assertEqual(
+            http_request_duration.count(method="GET", route="/api/items/{item_id}"), before + 2
+        )
+        self.assertGreaterEqual(
+            http_requests_total.value(method="GET", route="unmatched", status="404"), 1
+        )
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+"""Keyset pagination of student attendance and marks."""
+from unittest.mock import AsyncMock
+
+from pymongo import ASCENDING, DESCENDING
+
+from app.core.pagination import after_cursor, encode_cursor, split_page
+
+STUDENT = {"id": "s1", "role": "student"}
+SORT = [("date", DESCENDING), ("subject", ASCENDING)]
+
+
+def _matches(doc, query):
+    """Evaluates the subset of query operators that after_cursor produces."""
+    for field, cond in query.items():
+        if field == "$or":
+            if not any(_matches(doc, branch) for branch in cond):
+                return False
+        elif isinstance(cond, dict):
+            if "$gt" in cond and not doc[field] > cond["$gt"]:
+                return False
+            if "$lt" in cond and not doc[field] < cond["$lt"]:
+                return False
+        elif doc[field] != cond:
+            return False
+    return True
+
+
+def test_pages_cover_every_row_once():
+    rows = [
+        {"date": f"2024-03-{day:02d}", "subject": subject}
+        for day in range(1, 8) for subject in ("Math", "Physics", "Chemistry")
+    ]
+    ordered = sorted(rows, key=lambda r: r["subject"])
+    ordered = sorted(ordered, key=lambda r: r["date"], reverse=True)
+
+    seen, cursor = [], None
+    while True:
+        candidates = [r for r in ordered if _matches(r, after_cursor(SORT, cursor))][:5]
+        page, cursor = split_page(candidates, SORT, 4)
+        seen.extend(page)
+        if cursor is None:
+            break
+
+    assert seen == ordered
+
+
+def test_attendance_filters_and_next_cursor(mock_db, api_client, monkeypatch):
+    from app.api import academic
+
+    rows = [{"student_id": "s1", "date": f"2024-03-0{d}", "subject": "Math"} for d in (5, 4, 3)]
+    mock_db.attendance.find.return_value.to_list = AsyncMock(return_value=rows)
+    monkeypatch.setattr(academic, "db", mock_db)
+
+    response = api_client(academic.router, STUDENT).get(
+        "/api/attendance/student/s1", params={"from": "2024-03-01", "to": "2024-03-05", "subject": "Math", "limit": 2}
+    )
+
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+    assert response.headers["X-Next-Cursor"] == encode_cursor(rows[1], SORT)
+    query = mock_db.attendance.find.call_args[0][0]
+    assert query == {"student_id": "s1", "subject": "Math", "date": {"$gte": "2024-03-01", "$lt": "2024-03-06"}}
+    mock_db.attendance.find.return_value.limit.assert_called_with(3)
+
+
+def test_marks_last_page_has_no_cursor(mock_db, api_client, monkeypatch):
+    from app.api import academic
+
+    mock_db.marks.find.return_value.to_list = AsyncMock(return_value=[{"semester": 5, "subject": "Math"}])
+    monkeypatch.setattr(academic, "db", mock_db)
+    client = api_client(academic.router, STUDENT)
+
+    response = client.get("/api/marks/student/s1", params={"semester": 5})
+
+    assert response.status_code == 200
+    assert "X-Next-Cursor" not in response.headers
+    assert mock_db.marks.find.call_args[0][0] == {"student_id": "s1", "semester": 5}
+    assert client.get("/api/marks/student/s1", params={"cursor": "not-a-cursor"}).status_code == 400
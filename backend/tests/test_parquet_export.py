@@ -0,0 +1,78 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import importlib.util
+import tempfile
+import sys
+import os
+from pathlib import Path
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+sys.modules["app.db"] = MagicMock()
+sys.modules["app.db"].db = MagicMock()
+
+from app.core.parquet_export import export_collection, _coerce
+
+HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
+
+def async_cursor(docs):
+    cursor = MagicMock()
+    cursor.batch_size.return_value = cursor
+    cursor.__aiter__.return_value = docs
+    return cursor
+
+class TestCoercion(unittest.TestCase):
+
+    def test_loosely_typed_values(self):
+        self.assertEqual(_coerce("5", "int"), 5)
+        self.assertIsNone(_coerce("n/a", "float"))
+        self.assertEqual(_coerce("2024-01-01T10:00:00", "timestamp").tzinfo is not None, True)
+        self.assertEqual(_coerce("React", "string_list"), ["React"])
+        self.assertIsNone(_coerce("", "string"))
+
+    def test_bool_strings_are_parsed(self):
+        self.assertIs(_coerce("false", "bool"), False)
+        self.assertIs(_coerce(" True ", "bool"), True)
+        self.assertIs(_coerce("0", "bool"), False)
+        self.assertIs(_coerce(1, "bool"), True)
+        self.assertIs(_coerce(False, "bool"), False)
+        self.assertIsNone(_coerce("maybe", "bool"))
+        self.assertIsNone(_coerce(2, "bool"))
+
+@unittest.skipUnless(HAS_PYARROW, "pyarrow not installed")
+class TestParquetExport(unittest.IsolatedAsyncioTestCase):
+
+    @patch("app.core.parquet_export.db")
+    async def test_marks_partitioned_by_department_in_row_groups(self, mock_db):
+        import pyarrow.dataset as ds
+        import pyarrow.parquet as pq
+
+        docs = [
+            {"id": f"m{i}", "student_id": f"s{i % 3}", "subject": "Math", "semester": "5",
+             "marks_obtained": 40 + i % 10, "max_marks": 50, "created_at": "2024-01-01T00:00:00+00:00"}
+            for i in range(250)
+        ]
+        mock_db.__getitem__.return_value.find.return_value = async_cursor(docs)
+        profiles = {
+            "s0": {"department": "Computer Science", "semester": 5},
+            "s1": {"department": "Civil", "semester": 5},
+        }
+
+        with tempfile.TemporaryDirectory() as tmp:
+            counts = await export_collection("marks", Path(tmp), profiles, "department", batch_size=40)
+
+            self.assertEqual(counts, {
+                "department=Computer_Science": 84, "department=Civil": 83, "department=__unknown__": 83,
+            })
+            part = Path(tmp) / "marks" / "department=Computer_Science" / "part-0.parquet"
+            metadata = pq.ParquetFile(part).metadata
+            self.assertEqual(metadata.num_row_groups, 3)  # 40 + 40 + 4
+
+            table = ds.dataset(Path(tmp) / "marks", partitioning="hive").to_table()
+            self.assertEqual(table.num_rows, 250)
+            self.assertEqual(str(table.schema.field("semester").type), "int32")
+            self.assertEqual(str(table.schema.field("marks_obtained").type), "double")
+            self.assertEqual(str(table.schema.field("created_at").type), "timestamp[us, tz=UTC]")
+
+if __name__ == "__main__":
+    unittest.main()
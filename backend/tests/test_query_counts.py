@@ -0,0 +1,168 @@
+"""
+Query-count regression tests: endpoints must issue a bounded number of
+MongoDB operations regardless of how much data they cover.
+"""
+import json
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.api import stats
+
+MENTOR = {"id": "m1", "role": "mentor", "full_name": "Mentor"}
+
+
+def _seed_mentees(mock_db, count: int):
+    student_ids = [f"s{i}" for i in range(count)]
+    mock_db.assignments.find_one = AsyncMock(return_value={"mentor_id": "m1", "student_ids": student_ids})
+    mock_db.users.find.return_value.to_list = AsyncMock(return_value=[
+        {"id": sid, "full_name": f"Student {sid}"} for sid in student_ids
+    ])
+    mock_db.attendance.aggregate.return_value.to_list = AsyncMock(return_value=[
+        {"_id": sid, "total_classes": 10, "present_classes": 9} for sid in student_ids
+    ])
+    mock_db.marks.aggregate.return_value.to_list = AsyncMock(return_value=[
+        {"_id": sid, "total_obtained": 85, "total_max": 100} for sid in student_ids
+    ])
+    return student_ids
+
+
+@pytest.mark.parametrize("mentee_count", [1, 10, 60])
+def test_mentees_performance_query_bound(mentee_count, mock_db, count_queries, api_client):
+    _seed_mentees(mock_db, mentee_count)
+    counter = count_queries(mock_db, stats)
+
+    response = api_client(stats.router, MENTOR).get("/api/stats/mentor/mentees-performance")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert len(body) == mentee_count
+    assert body[0]["attendance_percentage"] == 90.0
+    assert body[0]["risk_level"] == "low"
+    assert counter.total <= 4, counter.by_collection()
+    assert counter.count("attendance") == 1
+    assert counter.count("marks") == 1
+
+
+@pytest.mark.parametrize("mentee_count", [1, 10, 60])
+def test_mentor_dashboard_query_bound(mentee_count, mock_db, count_queries, api_client):
+    student_ids = _seed_mentees(mock_db, mentee_count)
+    mock_db.attendance.aggregate.return_value.to_list = AsyncMock(return_value=[{
+        "by_subject": [{"_id": "Math", "total_classes": 10, "present_classes": 5}],
+        "by_student": [{"_id": sid, "total_classes": 10, "present_classes": 5} for sid in student_ids],
+    }])
+    mock_db.marks.aggregate.return_value.to_list = AsyncMock(return_value=[{
+        "by_subject": [{"_id": "Math", "avg_marks": 70}],
+        "by_student": [{"_id": sid, "total_obtained": 70, "total_max": 100} for sid in student_ids],
+    }])
+    counter = count_queries(mock_db, stats)
+
+    response = api_client(stats.router, MENTOR).get("/api/stats/mentor/dashboard-overview")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["insights"]["high_risk_count"] == mentee_count
+    assert counter.total <= 6, counter.by_collection()
+
+
+@pytest.mark.parametrize("class_size", [1, 60])
+def test_bulk_attendance_query_bound(class_size, mock_db, count_queries, api_client, monkeypatch):
+    from app.api import academic
+    from app.core import data_versions, notifications
+
+    student_ids = [f"s{i}" for i in range(class_size)]
+    mock_db.users.find.return_value.to_list = AsyncMock(return_value=[{"id": sid} for sid in student_ids])
+    # Everyone below the attendance threshold, so every student raises an alert
+    mock_db.attendance.aggregate.return_value.to_list = AsyncMock(return_value=[
+        {"_id": sid, "total": 10, "present": 5} for sid in student_ids
+    ])
+    mock_db.assignments.find.return_value.to_list = AsyncMock(return_value=[
+        {"mentor_id": "m1", "student_ids": student_ids}
+    ])
+    mock_db.attendance.bulk_write.return_value.upserted_count = class_size
+    mock_db.attendance.bulk_write.return_value.matched_count = 0
+    monkeypatch.setattr(academic, "log_action", AsyncMock())
+    counter = count_queries(mock_db, academic, data_versions, notifications)
+
+    response = api_client(academic.router, MENTOR).post("/api/attendance/bulk", json={
+        "subject": "Math", "date": "2024-03-01",
+        "records": [{"student_id": sid, "status": "absent"} for sid in student_ids],
+    })
+
+    assert response.status_code == 200, response.text
+    assert response.json()["inserted"] == class_size
+    assert counter.count("attendance", "bulk_write") == 1
+    assert counter.count("notifications", "insert_many") == 1
+    assert counter.total <= 8, counter.by_collection()
+    academic.log_action.assert_awaited_once()
+
+
+def test_bulk_attendance_rejects_invalid_records(mock_db, count_queries, api_client):
+    from app.api import academic
+
+    mock_db.users.find.return_value.to_list = AsyncMock(return_value=[{"id": "s1"}, {"id": "s2"}])
+    counter = count_queries(mock_db, academic)
+
+    response = api_client(academic.router, MENTOR).post("/api/attendance/bulk", json={
+        "subject": "Math", "date": "2024-03-01",
+        "records": [
+            {"student_id": "s1", "status": "present"},
+            {"student_id": "s1", "status": "absent"},
+            {"student_id": "s2", "status": "late"},
+            {"student_id": "s9", "status": "present"},
+        ],
+    })
+
+    assert response.status_code == 400
+    assert [e["index"] for e in response.json()["detail"]["errors"]] == [1, 2, 3]
+    assert counter.count("attendance") == 0
+
+
+def test_bulk_user_import_query_bound(mock_db, count_queries, api_client, monkeypatch):
+    from app.api import user
+
+    rows = [{"email": f"s{i}@example.com", "full_name": f"Student {i}"} for i in range(1200)]
+    rows.append({"email": "s0@example.com", "full_name": "Duplicate"})
+    mock_db.users.find.return_value.to_list = AsyncMock(return_value=[{"email": "s1@example.com"}])
+    mock_db.users.insert_many = AsyncMock(side_effect=lambda docs, ordered: MagicMock(inserted_ids=[d["id"] for d in docs]))
+    monkeypatch.setattr(user, "hash_passwords", AsyncMock(side_effect=lambda pws: [f"hash:{p}" for p in pws]))
+    monkeypatch.setattr(user, "log_action", AsyncMock())
+    counter = count_queries(mock_db, user)
+
+    response = api_client(user.router, {"id": "a1", "role": "admin"}).post(
+        "/api/users/bulk", files={"file": ("users.json", json.dumps(rows), "application/json")}
+    )
+
+    assert response.status_code == 200, response.text
+    assert response.json()["inserted"] == 1199
+    assert len(response.json()["errors"]) == 2
+    assert counter.count("users", "find") == 1
+    assert counter.count("users", "insert_many") == 3
+    assert counter.count("users", "find_one") == 0
+    user.hash_passwords.assert_awaited_once()
+
+
+def test_bulk_user_import_rejects_non_string_passwords(mock_db, api_client, monkeypatch):
+    from app.api import user
+
+    rows = [
+        {"email": "a@example.com", "full_name": "A"},
+        {"email": "b@example.com", "full_name": "B", "password": "s3cret"},
+        {"email": "c@example.com", "full_name": "C", "password": None},
+        {"email": "d@example.com", "full_name": "D", "password": 1234},
+        {"email": "e@example.com", "full_name": "E", "password": ""},
+    ]
+    mock_db.users.find.return_value.to_list = AsyncMock(return_value=[])
+    mock_db.users.insert_many = AsyncMock(side_effect=lambda docs, ordered: MagicMock(inserted_ids=[d["id"] for d in docs]))
+    monkeypatch.setattr(user, "db", mock_db)
+    monkeypatch.setattr(user, "hash_passwords", AsyncMock(side_effect=lambda pws: [f"hash:{p}" for p in pws]))
+    monkeypatch.setattr(user, "log_action", AsyncMock())
+
+    response = api_client(user.router, {"id": "a1", "role": "admin"}).post(
+        "/api/users/bulk", files={"file": ("users.json", json.dumps(rows), "application/json")}
+    )
+
+    assert response.status_code == 200, response.text
+    assert response.json()["inserted"] == 2
+    assert len(response.json()["errors"]) == 3
+    user.hash_passwords.assert_awaited_once_with(["password123", "s3cret"])
@@ -0,0 +1,114 @@
+import unittest
+from unittest.mock import MagicMock, AsyncMock, patch
+import os
+import tempfile
+import time
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+sys.modules["app.db"] = MagicMock()
+sys.modules["app.db"].db = MagicMock()
+
+from app.core.report_cache import ReportFileCache
+from app.core.data_versions import bump_data_versions, get_data_version
+
+class TestReportFileCache(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    async def test_hit_after_put_and_miss_on_new_version(self):
+        cache = ReportFileCache(self.tmp.name, max_bytes=1024)
+
+        self.assertIsNone(await cache.get("transcript", "s1", "pdf", "student:s1=1"))
+        path = await cache.put("transcript", "s1", "pdf", "student:s1=1", b"%PDF-1")
+
+        hit = await cache.get("transcript", "s1", "pdf", "student:s1=1")
+        self.assertEqual(hit, path)
+        self.assertEqual(hit.read_bytes(), b"%PDF-1")
+        self.assertIsNone(await cache.get("transcript", "s1", "pdf", "student:s1=2"))
+        self.assertIsNone(await cache.get("transcript", "s2", "pdf", "student:s1=1"))
+
+    async def test_least_recently_used_files_are_evicted(self):
+        cache = ReportFileCache(self.tmp.name, max_bytes=250)
+
+        first = await cache.put("transcript", "s1", "pdf", "v1", b"a" * 100)
+        second = await cache.put("transcript", "s2", "pdf", "v1", b"b" * 100)
+        # Backdate both, then touch the first so the second becomes least recently used
+        for path in (first, second):
+            os.utime(path, (time.time() - 60, time.time() - 60))
+        await cache.get("transcript", "s1", "pdf", "v1")
+
+        await cache.put("transcript", "s3", "pdf", "v1", b"c" * 100)
+
+        self.assertTrue(first.exists())
+        self.assertFalse(second.exists())
+        self.assertIsNone(await cache.get("transcript", "s2", "pdf", "v1"))
+
+    async def test_opened_hit_survives_eviction(self):
+        cache = ReportFileCache(self.tmp.name, max_bytes=150)
+        path = await cache.put("transcript", "s1", "pdf", "v1", b"a" * 100)
+
+        cached = await cache.open("transcript", "s1", "pdf", "v1")
+        os.utime(path, (time.time() - 60, time.time() - 60))
+        await cache.put("transcript", "s2", "pdf", "v1", b"b" * 100)  # evicts the first file
+
+        self.assertFalse(path.exists())
+        with cached:
+            self.assertEqual(cached.read(), b"a" * 100)
+        self.assertIsNone(await cache.open("transcript", "s1", "pdf", "v1"))
+
+    async def test_entry_larger_than_budget_is_still_served(self):
+        cache = ReportFileCache(self.tmp.name, max_bytes=10)
+        path = await cache.put("mentor-summary", "m1", "xlsx", "v1", b"x" * 100)
+        self.assertTrue(path.exists())
+
+class TestCachedReportResponse(unittest.IsolatedAsyncioTestCase):
+
+    async def test_miss_renders_once_then_hits_stream_from_cache(self):
+        from app.api import reporting
+
+        with tempfile.TemporaryDirectory() as tmp, \
+                patch.object(reporting, "report_cache", ReportFileCache(tmp, max_bytes=1024)), \
+                patch.object(reporting, "get_data_version", AsyncMock(return_value="v1")):
+            generate = AsyncMock(return_value=b"%PDF-1")
+            args = ("transcript", "s1", "pdf", ["student:s1"], generate, "application/pdf", "t.pdf", "none")
+
+            miss = await reporting._cached_report(*args)
+            hit = await reporting._cached_report(*args)
+            body = b"".join([chunk async for chunk in hit.body_iterator])
+
+        generate.assert_awaited_once()
+        self.assertEqual(miss.body, b"%PDF-1")
+        self.assertEqual(body, b"%PDF-1")
+        self.assertEqual(hit.headers["content-length"], "6")
+        self.assertEqual(hit.headers["content-disposition"], "attachment; filename=t.pdf")
+
+class TestDataVersions(unittest.IsolatedAsyncioTestCase):
+
+    @patch("app.core.data_versions.db")
+    async def test_version_string_defaults_missing_scopes_to_zero(self, mock_db):
+        mock_db.data_versions.find.return_value.to_list = AsyncMock(return_value=[
+            {"scope": "users", "version": 7}
+        ])
+        self.assertEqual(await get_data_version("users", "assignments"), "assignments=0;users=7")
+
+    @patch("app.core.data_versions.db")
+    async def test_bump_is_one_bulk_write(self, mock_db):
+        mock_db.data_versions.bulk_write = AsyncMock()
+        await bump_data_versions(["student:s1", "student:s2", "student:s1"])
+
+        mock_db.data_versions.bulk_write.assert_awaited_once()
+        ops = mock_db.data_versions.bulk_write.call_args.args[0]
+        self.assertEqual(len(ops), 2)
+
+    @patch("app.core.data_versions.db")
+    async def test_bump_nothing(self, mock_db):
+        mock_db.data_versions.bulk_write = AsyncMock()
+        await bump_data_versions([])
+        mock_db.data_versions.bulk_write.assert_not_awaited()
+
+if __name__ == "__main__":
+    unittest.main()
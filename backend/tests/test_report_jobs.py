@@ -0,0 +1,239 @@
+import unittest
+from unittest.mock import MagicMock, AsyncMock, patch
+import asyncio
+import tempfile
+import time
+import sys
+import os
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+sys.modules["app.db"] = MagicMock()
+sys.modules["app.db"].db = MagicMock()
+
+from fastapi import HTTPException
+from app.core.jobs import PROCESS_STARTED, JobManager, JobContext, fail_orphaned_jobs, sweep_job_results
+from app.core.reports import run_report_job
+
+def async_cursor(docs):
+    cursor = MagicMock()
+    cursor.batch_size.return_value = cursor
+    cursor.__aiter__.return_value = docs
+    return cursor
+
+def job_updates(mock_db, job_id):
+    """The $set payloads written for one job, in order."""
+    return [c.args[1]["$set"] for c in mock_db.jobs.update_one.call_args_list if c.args[0] == {"id": job_id}]
+
+class TestJobManager(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        patcher = patch("app.core.jobs.db")
+        self.mock_db = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.mock_db.jobs.insert_one = AsyncMock()
+        self.mock_db.jobs.update_one = AsyncMock()
+
+    async def test_job_runs_and_records_result(self):
+        manager = JobManager("test", max_concurrent=2, per_user_limit=2)
+
+        async def handler(job):
+            await job.set_progress(0.5, force=True)
+            return {"result_path": "/tmp/x.csv", "filename": "x.csv", "media_type": "text/csv"}
+
+        job = await manager.submit("report", "u1", {"type": "marks"}, handler)
+        self.assertEqual(job["status"], "queued")
+        self.mock_db.jobs.insert_one.assert_awaited_once()
+
+        await asyncio.gather(*manager._tasks)
+        updates = job_updates(self.mock_db, job["id"])
+        self.assertEqual(updates[0]["status"], "running")
+        self.assertEqual(updates[1], {"progress": 0.5})
+        self.assertEqual(updates[-1]["status"], "completed")
+        self.assertEqual(updates[-1]["filename"], "x.csv")
+        self.assertEqual(manager.active_jobs("u1"), 0)
+
+    async def test_failed_job_records_error(self):
+        manager = JobManager("test", max_concurrent=1, per_user_limit=1)
+
+        async def handler(job):
+            raise ValueError("No marks data found")
+
+        job = await manager.submit("report", "u1", {}, handler)
+        await asyncio.gather(*manager._tasks)
+
+        final = job_updates(self.mock_db, job["id"])[-1]
+        self.assertEqual(final["status"], "failed")
+        self.assertEqual(final["error"], "No marks data found")
+
+    async def test_per_user_limit(self):
+        manager = JobManager("test", max_concurrent=4, per_user_limit=1)
+        release = asyncio.Event()
+
+        async def handler(job):
+            await release.wait()
+            return {}
+
+        await manager.submit("report", "u1", {}, handler)
+        with self.assertRaises(HTTPException) as ctx:
+            await manager.submit("report", "u1", {}, handler)
+        self.assertEqual(ctx.exception.status_code, 429)
+
+        # Other users are unaffected
+        await manager.submit("report", "u2", {}, handler)
+
+        release.set()
+        await asyncio.gather(*manager._tasks)
+        await manager.submit("report", "u1", {}, handler)
+        await asyncio.gather(*manager._tasks)
+
+    async def test_concurrent_submits_respect_per_user_limit(self):
+        manager = JobManager("test", max_concurrent=4, per_user_limit=2)
+        release = asyncio.Event()
+
+        async def slow_insert(doc):
+            await asyncio.sleep(0.01)  # every submit is suspended here at once
+
+        self.mock_db.jobs.insert_one = AsyncMock(side_effect=slow_insert)
+
+        async def handler(job):
+            await release.wait()
+            return {}
+
+        results = await asyncio.gather(
+            *(manager.submit("report", "u1", {}, handler) for _ in range(5)), return_exceptions=True
+        )
+        self.assertEqual(sum(isinstance(r, dict) for r in results), 2)
+        self.assertTrue(all(r.status_code == 429 for r in results if isinstance(r, HTTPException)))
+        self.assertEqual(manager.active_jobs("u1"), 2)
+
+        release.set()
+        await asyncio.gather(*manager._tasks)
+        self.assertEqual(manager.active_jobs("u1"), 0)
+
+    async def test_failed_insert_releases_the_slot(self):
+        manager = JobManager("test", max_concurrent=1, per_user_limit=1)
+        self.mock_db.jobs.insert_one = AsyncMock(side_effect=RuntimeError("db down"))
+
+        with self.assertRaises(RuntimeError):
+            await manager.submit("report", "u1", {}, AsyncMock(return_value={}))
+        self.assertEqual(manager.active_jobs("u1"), 0)
+
+    async def test_reserved_slot_is_used_by_submit(self):
+        manager = JobManager("test", max_concurrent=1, per_user_limit=1)
+        manager.reserve("u1")
+        with self.assertRaises(HTTPException):
+            manager.reserve("u1")
+
+        await manager.submit("upload", "u1", {}, AsyncMock(return_value={}), reserved=True)
+        self.assertEqual(manager.active_jobs("u1"), 1)
+        await asyncio.gather(*manager._tasks)
+        self.assertEqual(manager.active_jobs("u1"), 0)
+
+    async def test_staged_input_removed_when_job_is_cancelled_while_queued(self):
+        manager = JobManager("test", max_concurrent=1, per_user_limit=2)
+        release = asyncio.Event()
+
+        async def handler(job):
+            await release.wait()
+            return {}
+
+        with tempfile.NamedTemporaryFile(delete=False) as staged:
+            pass
+        await manager.submit("upload", "u1", {}, handler)
+        await manager.submit("upload", "u1", {"path": staged.name}, handler)
+        await asyncio.sleep(0)
+
+        await manager.shutdown()
+        self.assertFalse(os.path.exists(staged.name))
+        self.assertEqual(job_updates(self.mock_db, self.mock_db.jobs.insert_one.call_args[0][0]["id"])[-1]["status"], "failed")
+
+    async def test_jobs_left_by_a_previous_process_are_failed(self):
+        self.mock_db.jobs.update_many = AsyncMock(return_value=MagicMock(modified_count=2))
+
+        self.assertEqual(await fail_orphaned_jobs(), 2)
+
+        query, update = self.mock_db.jobs.update_many.call_args.args
+        self.assertEqual(query, {"status": {"$in": ["queued", "running"]}, "created_at": {"$lt": PROCESS_STARTED}})
+        self.assertEqual(update["$set"]["status"], "failed")
+        self.assertIn("finished_at", update["$set"])
+
+    async def test_global_concurrency_limit(self):
+        manager = JobManager("test", max_concurrent=1, per_user_limit=5)
+        running, peak = 0, 0
+
+        async def handler(job):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return {}
+
+        for user in ("u1", "u2", "u3"):
+            await manager.submit("report", user, {}, handler)
+        await asyncio.gather(*manager._tasks)
+        self.assertEqual(peak, 1)
+
+class TestReportJobHandler(unittest.IsolatedAsyncioTestCase):
+
+    @patch("app.core.jobs.db")
+    @patch("app.core.reports.db")
+    async def test_csv_report_written_to_results_dir(self, mock_db, mock_jobs_db):
+        mock_jobs_db.jobs.update_one = AsyncMock()
+        docs = [{"id": f"m{i}", "student_id": "s1", "subject": "Math", "marks_obtained": 50} for i in range(3)]
+        mock_db.__getitem__.return_value.count_documents = AsyncMock(return_value=3)
+        mock_db.__getitem__.return_value.find.return_value = async_cursor(docs)
+
+        with tempfile.TemporaryDirectory() as tmp, patch("app.core.jobs.settings.JOB_RESULTS_DIR", tmp):
+            job = JobContext({"id": "job1", "owner_id": "s1", "params": {"type": "marks", "format": "csv", "student_id": "s1"}})
+            result = await run_report_job(job)
+
+            self.assertEqual(result["filename"], "marks_report.csv")
+            self.assertEqual(result["media_type"], "text/csv; charset=utf-8")
+            with open(result["result_path"]) as f:
+                lines = f.read().splitlines()
+            self.assertEqual(len(lines), 4)
+            self.assertTrue(lines[1].startswith("m0,s1,Math"))
+
+    @patch("app.core.jobs.db")
+    @patch("app.core.reports.db")
+    async def test_attendance_export_reads_sessions_in_monthly_mode(self, mock_db, mock_jobs_db):
+        mock_jobs_db.jobs.update_one = AsyncMock()
+        collections = {name: MagicMock() for name in ("attendance", "attendance_sessions")}
+        mock_db.__getitem__.side_effect = collections.__getitem__
+        mock_db.attendance = collections["attendance"]
+        sessions = collections["attendance_sessions"]
+        docs = [{"id": f"s1:Math:2024-03-0{d}", "student_id": "s1", "subject": "Math",
+                 "date": f"2024-03-0{d}", "status": "present"} for d in range(1, 3)]
+        sessions.count_documents = AsyncMock(return_value=2)
+        sessions.find.return_value = async_cursor(docs)
+
+        with tempfile.TemporaryDirectory() as tmp, patch("app.core.jobs.settings.JOB_RESULTS_DIR", tmp), \
+                patch("app.core.attendance_store.settings.ATTENDANCE_STORAGE", "monthly"):
+            job = JobContext({"id": "job2", "owner_id": "s1", "params": {"type": "attendance", "format": "ndjson", "student_id": "s1"}})
+            result = await run_report_job(job)
+            with open(result["result_path"]) as f:
+                self.assertEqual(len(f.read().splitlines()), 2)
+
+        sessions.count_documents.assert_awaited_once_with({"student_id": "s1"})
+        collections["attendance"].find.assert_not_called()
+
+class TestJobResultSweep(unittest.TestCase):
+
+    def test_only_expired_results_are_removed(self):
+        with tempfile.TemporaryDirectory() as tmp, patch("app.core.jobs.settings.JOB_RESULTS_DIR", tmp):
+            old_file, old_dir, fresh = (os.path.join(tmp, name) for name in ("a.pdf", "b", "c.csv"))
+            open(old_file, "w").close()
+            os.mkdir(old_dir)
+            open(os.path.join(old_dir, "part.csv"), "w").close()
+            open(fresh, "w").close()
+            stale = time.time() - 2 * 3600
+            os.utime(old_file, (stale, stale))
+            os.utime(old_dir, (stale, stale))
+
+            self.assertEqual(sweep_job_results(max_age=3600), 2)
+            self.assertEqual(os.listdir(tmp), ["c.csv"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,19 +2,32 @@ import unittest
 from unittest.mock import MagicMock, AsyncMock, patch
 import sys
 import os
+import io
 
 sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
 
 sys.modules["app.db"] = MagicMock()
 sys.modules["app.db"].db = MagicMock()
 
-from app.core.reports import generate_attendance_report, generate_marks_report
+from app.core.reports import (
+    generate_attendance_report, generate_marks_report, export_attendance_excel,
+    iter_file_chunks, ATTENDANCE_COLUMNS, open_row_stream, iter_csv, iter_ndjson,
+    bulk_students_cursor, iter_bulk_documents_zip, generate_mentor_summary_report,
+)
+
+def async_cursor(docs):
+    """Mimics a Motor cursor: chainable batch_size() and async iteration."""
+    cursor = MagicMock()
+    cursor.batch_size.return_value = cursor
+    cursor.limit.return_value = cursor
+    cursor.__aiter__.return_value = docs
+    return cursor
 
 class TestReports(unittest.IsolatedAsyncioTestCase):
     
     @patch("app.core.reports.db")
     async def test_generate_attendance_pdf(self, mock_db):
-        mock_db.attendance.find.return_value.to_list = AsyncMock(return_value=[
+        mock_db.attendance.find.return_value = async_cursor([
             {"student_id": "s1", "status": "present", "date": "2024-01-01"},
             {"student_id": "s1", "status": "absent",  "date": "2024-01-02"}
         ])
@@ -25,9 +38,9 @@ class TestReports(unittest.IsolatedAsyncioTestCase):
 
     @patch("app.core.reports.db")
     async def test_generate_marks_excel(self, mock_db):
-        mock_db.marks.find.return_value.to_list = AsyncMock(return_value=[
-            {"student_id": "s1", "subject": "Math", "marks": 90},
-            {"student_id": "s1", "subject": "Science", "marks": 80}
+        mock_db.marks.find.return_value = async_cursor([
+            {"student_id": "s1", "subject": "Math", "marks_obtained": 90},
+            {"student_id": "s1", "subject": "Science", "marks_obtained": 80}
         ])
         
         excel_bytes = await generate_marks_report("excel", "s1")
@@ -35,5 +48,151 @@ class TestReports(unittest.IsolatedAsyncioTestCase):
         # Excel files (zip) usually start with PK
         self.assertTrue(excel_bytes.startswith(b"PK"))
 
+    @patch("app.core.reports.get_mentee_metrics")
+    @patch("app.core.reports.db")
+    async def test_mentor_summary_includes_metrics(self, mock_db, mock_metrics):
+        import openpyxl
+        mock_db.assignments.find_one = AsyncMock(return_value={"student_ids": ["s1"]})
+        mock_metrics.return_value = [{
+            "student_id": "s1", "full_name": "A", "usn": "1A", "department": "CSE", "semester": 5,
+            "attendance_percentage": 80.0, "average_marks_percentage": 70.0, "risk_level": "low",
+            "pending_reviews": 2, "latest_feedback": "2024-03-05",
+        }]
+
+        xlsx = await generate_mentor_summary_report("excel", "m1")
+
+        mock_metrics.assert_awaited_once_with(["s1"])
+        rows = list(openpyxl.load_workbook(io.BytesIO(xlsx)).active.values)
+        self.assertEqual(rows[0][4:], ("Attendance %", "Marks %", "Risk", "Pending Reviews", "Last Feedback"))
+        self.assertEqual(rows[1][4:], (80, 70, "low", 2, "2024-03-05"))
+
+    @patch("app.core.reports.db")
+    async def test_attendance_excel_streams_every_row(self, mock_db):
+        from openpyxl import load_workbook
+        import io
+
+        # More rows than the old to_list(10000) cap, spanning several write batches
+        docs = [
+            {"id": f"a{i}", "student_id": "s1", "subject": "Math", "date": "2024-01-01", "status": "present"}
+            for i in range(12000)
+        ]
+        mock_db.attendance.find.return_value = async_cursor(docs)
+
+        spool = await export_attendance_excel()
+        content = b"".join([chunk async for chunk in iter_file_chunks(spool, chunk_size=4096)])
+
+        self.assertTrue(spool.closed)
+        sheet = load_workbook(io.BytesIO(content), read_only=True)["Attendance"]
+        rows = list(sheet.iter_rows(values_only=True))
+        self.assertEqual(list(rows[0]), ATTENDANCE_COLUMNS)
+        self.assertEqual(len(rows), 12001)
+        self.assertEqual(rows[-1][0], "a11999")
+
+    @patch("app.core.reports.db")
+    async def test_empty_excel_export_returns_none(self, mock_db):
+        mock_db.attendance.find.return_value = async_cursor([])
+        self.assertIsNone(await export_attendance_excel("s1"))
+
+    async def test_csv_stream_chunks_rows(self):
+        import csv
+        import io
+
+        docs = [{"id": f"a{i}", "student_id": "s1", "status": "present"} for i in range(5000)]
+        rows = await open_row_stream(async_cursor(docs))
+        chunks = [chunk async for chunk in iter_csv(rows, ATTENDANCE_COLUMNS, chunk_size=1024)]
+
+        # Header is flushed on its own, the rest in bounded chunks
+        self.assertEqual(chunks[0], (",".join(ATTENDANCE_COLUMNS) + "\r\n").encode())
+        self.assertTrue(all(len(chunk) < 1024 + 200 for chunk in chunks))
+        parsed = list(csv.reader(io.StringIO(b"".join(chunks).decode())))
+        self.assertEqual(len(parsed), 5001)
+        self.assertEqual(parsed[-1][0], "a4999")
+
+    async def test_ndjson_stream(self):
+        import json
+        from datetime import datetime
+
+        docs = [{"id": "a1", "created_at": datetime(2024, 1, 1)}, {"id": "a2"}]
+        rows = await open_row_stream(async_cursor(docs))
+        body = b"".join([chunk async for chunk in iter_ndjson(rows)]).decode()
+
+        lines = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual(lines, [{"id": "a1", "created_at": "2024-01-01T00:00:00"}, {"id": "a2"}])
+
+    async def test_empty_row_stream(self):
+        self.assertIsNone(await open_row_stream(async_cursor([])))
+
+    @patch("app.core.reports.settings.REPORT_PDF_MAX_ROWS", 100)
+    @patch("app.core.reports.pdf_executor.run", new_callable=AsyncMock)
+    @patch("app.core.reports.db")
+    async def test_attendance_pdf_row_cap(self, mock_db, mock_run):
+        mock_run.return_value = b"%PDF-"
+        cursor = async_cursor([{"id": f"a{i}", "student_id": "s1"} for i in range(101)])
+        mock_db.attendance.find.return_value = cursor
+
+        await generate_attendance_report("pdf")
+
+        cursor.limit.assert_called_once_with(101)
+        _fn, _title, columns, rows, _style, note = mock_run.call_args.args
+        self.assertEqual(columns, ATTENDANCE_COLUMNS)
+        self.assertEqual(len(rows), 100)
+        self.assertIn("first 100 rows", note)
+
+    def test_large_table_pdf_is_chunked_with_aligned_columns(self):
+        from app.core import pdf_render
+
+        columns = ["id", "status"]
+        rows = [[f"row-{i}", "present"] for i in range(2 * pdf_render.TABLE_CHUNK_ROWS + 5)]
+        chunks = list(pdf_render._table_chunks(columns, rows, [], 468, 648))
+
+        self.assertEqual(len(chunks), 3)
+        self.assertTrue(all(chunk.repeatRows == 1 for chunk in chunks))
+        self.assertEqual(chunks[1]._argW, chunks[0]._colWidths)
+
+        pdf_bytes = pdf_render.render_table_pdf("Attendance Report", columns, rows, [])
+        self.assertTrue(pdf_bytes.startswith(b"%PDF"))
+        self.assertGreater(pdf_bytes.count(b"/Type /Page\n"), 5)
+
+    @patch("app.core.reports.db")
+    def test_bulk_transcripts_use_one_aggregation(self, mock_db):
+        bulk_students_cursor("transcript", "CSE", 5)
+
+        mock_db.users.aggregate.assert_called_once()
+        pipeline = mock_db.users.aggregate.call_args.args[0]
+        self.assertEqual(pipeline[0]["$match"], {"role": "student", "department": "CSE", "semester": 5})
+        self.assertEqual(pipeline[-1]["$lookup"]["from"], "marks")
+
+    @patch("app.core.reports.pdf_executor.run", new_callable=AsyncMock)
+    async def test_bulk_zip_streams_entries_and_reports_failures(self, mock_run):
+        import io
+        import zipfile
+
+        async def fake_render(fn, title, *args):
+            if "Broken" in title:
+                raise RuntimeError("render failed")
+            return b"%PDF-" + title.encode()
+        mock_run.side_effect = fake_render
+
+        students = [
+            {"id": "s1", "usn": "1CS001", "full_name": "Asha", "marks": [{"subject": "Math", "marks_obtained": 90}]},
+            {"id": "s2", "usn": "1CS002", "full_name": "Broken", "marks": [{"subject": "Math"}]},
+            {"id": "s3", "usn": "1CS/003", "full_name": "No Marks", "marks": []},
+        ] + [
+            {"id": f"x{i}", "usn": f"1CS1{i:02d}", "full_name": f"S{i}", "marks": [{"subject": "Math"}]}
+            for i in range(10)
+        ]
+        rows = await open_row_stream(async_cursor(students))
+        chunks = [chunk async for chunk in iter_bulk_documents_zip("transcript", rows)]
+
+        # Entries are flushed while rendering continues, not only at the end
+        self.assertGreater(len([c for c in chunks if c]), 2)
+        archive = zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+        names = archive.namelist()
+        self.assertIn("transcript_1CS001.pdf", names)
+        self.assertEqual(len([n for n in names if n.endswith(".pdf")]), 11)
+        errors = archive.read("errors.txt").decode()
+        self.assertIn("transcript_1CS002.pdf: render failed", errors)
+        self.assertIn("transcript_1CS_003.pdf: no data", errors)
+
 if __name__ == "__main__":
     unittest.main()
@@ -1,9 +1,10 @@
 // src/services/attendance.js
 
 import api from "./api";
+import { waitForUpload } from "./uploads";
 
 // Upload attendance from CSV/Excel
-export async function uploadAttendance(file) {
+export async function uploadAttendance(file, onProgress) {
   const formData = new FormData();
   formData.append("file", file);
 
@@ -13,8 +14,8 @@ export async function uploadAttendance(file) {
     },
   });
 
-  // Backend returns: { "message": "Uploaded X attendance records" }
-  return res.data;
+  // Backend queues the file and returns { job_id, status_url }; wait for the result
+  return waitForUpload(res.data.job_id, onProgress);
 }
 
 // Create a single manual attendance record
@@ -24,8 +25,23 @@ export async function createAttendanceRecord(payload) {
   return res.data;
 }
 
-// Get all attendance records for a student
-export async function getStudentAttendance(studentId) {
-  const res = await api.get(`/api/attendance/student/${studentId}`);
-  return res.data; // array of records
+// Mark a whole class for one subject and date in a single request
+// payload: { subject, date, records: [{ student_id, status }] }
+export async function createAttendanceBulk(payload) {
+  const res = await api.post("/api/attendance/bulk", payload);
+  return res.data; // { message, inserted, updated }
+}
+
+// Get a student's attendance records, newest first
+// filters: { from, to, subject } (dates as YYYY-MM-DD, inclusive)
+export async function getStudentAttendance(studentId, filters = {}) {
+  const { records } = await getStudentAttendancePage(studentId, filters);
+  return records; // array of records
+}
+
+// One page of attendance records; pass the returned nextCursor back as `cursor` for the next page
+// params: { from, to, subject, limit, cursor }
+export async function getStudentAttendancePage(studentId, params = {}) {
+  const res = await api.get(`/api/attendance/student/${studentId}`, { params });
+  return { records: res.data, nextCursor: res.headers["x-next-cursor"] || null };
 }
@@ -1,8 +1,9 @@
 // src/services/marks.js
 import api from "./api";
+import { waitForUpload } from "./uploads";
 
 // Upload marks from CSV/Excel
-export async function uploadMarks(file) {
+export async function uploadMarks(file, onProgress) {
   const formData = new FormData();
   formData.append("file", file);
 
@@ -12,7 +13,8 @@ export async function uploadMarks(file) {
     },
   });
 
-  return res.data; // { message: "Uploaded X marks records" }
+  // Backend queues the file and returns { job_id, status_url }; wait for the result
+  return waitForUpload(res.data.job_id, onProgress); // { message: "Uploaded X marks records", ... }
 }
 
 // Create a single manual marks record
@@ -22,8 +24,16 @@ export async function createMarksRecord(payload) {
   return res.data;
 }
 
-// Get all marks records for a student
-export async function getStudentMarks(studentId) {
-  const res = await api.get(`/api/marks/student/${studentId}`);
-  return res.data; // array
+// Get a student's marks records, ordered by semester and subject
+// filters: { semester, subject }
+export async function getStudentMarks(studentId, filters = {}) {
+  const { records } = await getStudentMarksPage(studentId, filters);
+  return records; // array
+}
+
+// One page of marks records; pass the returned nextCursor back as `cursor` for the next page
+// params: { semester, subject, limit, cursor }
+export async function getStudentMarksPage(studentId, params = {}) {
+  const res = await api.get(`/api/marks/student/${studentId}`, { params });
+  return { records: res.data, nextCursor: res.headers["x-next-cursor"] || null };
 }
@@ -0,0 +1,23 @@
+// src/services/uploads.js
+import api from "./api";
+
+const POLL_INTERVAL_MS = 1000;
+
+// Poll a queued attendance/marks upload until it finishes.
+// Resolves with the ingestion result ({ message, inserted, updated, rejected, rejections });
+// rejects with an axios-shaped error ({ response: { data: { detail } } }) if the job fails.
+export async function waitForUpload(jobId, onProgress) {
+  for (;;) {
+    const res = await api.get(`/api/uploads/${jobId}`);
+    const job = res.data;
+    if (onProgress) onProgress(job);
+
+    if (job.status === "completed") return job.result;
+    if (job.status === "failed") {
+      const error = new Error(job.error || "Upload failed");
+      error.response = { data: { detail: job.error || "Upload failed" } };
+      throw error;
+    }
+    await new Promise((resolve) => setTimeout(resolve, POLL_INTERVAL_MS));
+  }
+}